@@ -1,90 +1,79 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, abort, request, jsonify, send_from_directory, send_file, stream_with_context
+from werkzeug.datastructures import FileStorage
+from werkzeug.middleware.proxy_fix import ProxyFix
+import hmac
 import os
+from io import BytesIO
 import json
 import random
-from utils.resume_parser import parse_resume
-from utils.voice_processor import speech_to_text, text_to_speech
+import re
+from utils.admission import (
+    MAX_AUDIO_BYTES, MAX_REQUEST_BYTES, MAX_RESUME_BYTES, MAX_TTS_CHARS, Rejected, create_admission_controller
+)
+from utils.answer_analysis import answer_analyzer
+from utils.audio_uploads import SpoolingRequest, UploadTooLarge
+from utils.resume_parser import load_document_libraries, parse_resume, resume_cache
+from utils.resume_batch import expand_uploads, parse_batch
+from utils.interview_content import ContentError, create_content_store
+from utils.metrics import install_metrics, registry, stage
+from utils.question_bank import QUERY_TURNS
+from utils.executors import Overloaded, TaskTimeout, tts_executor, resume_executor
+from utils.session_store import ConversationFull, create_session_store
+from utils.speech_to_text import SpeechToTextError, get_recognizer, iter_file_chunks
+from utils.sse import sse_response
+from utils.static_assets import DEFAULT_SOURCE_DIR, load_static_assets
+from utils.transcript_archive import create_transcript_archive
+from utils.transcripts import conversation_dicts
+from utils.tts_engines import audio_mimetype
+from utils.voice_processor import (
+    speech_to_text, speech_to_text_stream, prepare_speech, get_audio, transcode_pool, tts_cache, tts_synthesizer
+)
 
-app = Flask(__name__, static_folder='../frontend', static_url_path='')
+# Frontend files are served by serve_index/serve_static below, not Flask's static route
+app = Flask(__name__, static_folder=None)
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+# Uploaded files are spooled to size-capped temp files instead of memory
+app.request_class = SpoolingRequest
+
+# Behind a reverse proxy, take the client IP (used for rate limiting) from X-Forwarded-For
+proxy_hops = int(os.environ.get('PROXY_HOPS', 0))
+if proxy_hops:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
 
 # No CORS needed since we're serving everything from same origin
 
-# Store interview sessions
-interview_sessions = {}
+# Latency histograms for every /api/* route, served at /api/metrics
+install_metrics(app)
+
+# Rate limits and load shedding for the expensive endpoints (see utils/admission.py)
+admission = create_admission_controller()
+
+# Store interview sessions (backend chosen by SESSION_STORE, see utils/session_store.py)
+session_store = create_session_store()
+
+# Finished interviews are moved here for analytics (see utils/transcript_archive.py)
+transcript_archive = create_transcript_archive()
 
 class FreeInterviewAgent:
-    def __init__(self):
-        self.role_questions = {
-            'Software Engineer': [
-                "Tell me about your experience with programming languages.",
-                "Describe a challenging technical problem you solved.",
-                "How do you approach code testing and debugging?",
-                "What's your experience with version control systems?",
-                "Tell me about a project you're particularly proud of.",
-                "How do you stay updated with new technologies?",
-                "Describe your experience with agile development."
-            ],
-            'Data Scientist': [
-                "What machine learning algorithms are you most comfortable with?",
-                "Describe a data analysis project from start to finish.",
-                "How do you handle missing or incomplete data?",
-                "What's your experience with data visualization?",
-                "Tell me about a time you used statistics to solve a problem.",
-                "How do you validate your models?",
-                "What Python libraries are you familiar with for data science?"
-            ],
-            'Sales Representative': [
-                "Describe your sales process from lead to close.",
-                "How do you handle customer objections?",
-                "What's your experience with CRM software?",
-                "Tell me about a challenging sale you made.",
-                "How do you build relationships with clients?",
-                "What strategies do you use for prospecting?",
-                "How do you measure your sales performance?"
-            ],
-            'Marketing Manager': [
-                "Describe a successful marketing campaign you led.",
-                "How do you measure marketing ROI?",
-                "What's your experience with digital marketing channels?",
-                "How do you develop a marketing strategy?",
-                "Tell me about a time you had to work with a tight budget.",
-                "How do you analyze market trends?",
-                "What tools do you use for marketing analytics?"
-            ],
-            'Product Manager': [
-                "How do you prioritize features in a product roadmap?",
-                "Describe a product you managed from concept to launch.",
-                "How do you gather and analyze customer requirements?",
-                "What metrics do you track for product success?",
-                "How do you handle conflicts between engineering and design teams?",
-                "Tell me about a time you had to make a tough product decision."
-            ],
-            'UX Designer': [
-                "Walk me through your design process.",
-                "How do you conduct user research?",
-                "What tools do you use for prototyping?",
-                "Describe a design challenge you faced and how you solved it.",
-                "How do you measure the success of your designs?",
-                "How do you incorporate user feedback into your designs?"
-            ]
-        }
-        
-        self.follow_up_questions = [
-            "Can you give me a specific example?",
-            "What was the outcome of that?",
-            "What did you learn from that experience?",
-            "How would you approach that differently now?",
-            "What was the most challenging part?",
-            "How did you measure success in that situation?",
-            "What feedback did you receive?",
-            "How did that experience prepare you for this role?"
-        ]
+    def __init__(self, content_store):
+        # Questions and follow-up rules are versioned content, reloaded live (see utils/interview_content.py)
+        self.content_store = content_store
+    
+    def all_question_texts(self):
+        """Every fixed question string the agent can ask (used for TTS pre-rendering)"""
+        return self.content_store.current.all_question_texts()
     
-    def generate_question(self, role, conversation_history, resume_data=None):
+    def generate_question(self, role, conversation_history, resume_data=None, last_answer_index=None, content=None,
+                          asked=None):
+        # The whole turn uses one snapshot: the session's pinned one, else the current one
+        content = content or self.content_store.current
+        question_bank = content.question_bank
+        
         # If no questions asked yet, start with role-specific question
         if not conversation_history:
-            questions = self.role_questions.get(role, self.role_questions['Software Engineer'])
-            question = random.choice(questions)
+            question = question_bank.pick(role, resume_data) if question_bank is not None else None
+            if question is None:
+                question = random.choice(content.questions_for(role))
             
             # If resume data available, customize first question
             if resume_data and 'skills' in resume_data and resume_data['skills']:
@@ -93,100 +82,231 @@ class FreeInterviewAgent:
             
             return question
         
-        # If there's conversation history, ask follow-up questions
+        # The session tracks where the last answer is; only scan when it doesn't
         last_user_answer = None
-        for msg in reversed(conversation_history):
-            if msg.get('type') == 'answer':
-                last_user_answer = msg.get('content')
-                break
-        
-        if last_user_answer:
-            # Smart follow-up based on user's answer content
-            answer_lower = last_user_answer.lower()
-            
-            if any(word in answer_lower for word in ['project', 'developed', 'built', 'created', 'designed']):
-                return "What were the main technologies or tools used in that project?"
-            elif any(word in answer_lower for word in ['team', 'collaborat', 'worked with', 'colleagues']):
-                return "What was your specific role and responsibilities in the team?"
-            elif any(word in answer_lower for word in ['problem', 'challenge', 'issue', 'difficult']):
-                return "What steps did you take to overcome that challenge?"
-            elif any(word in answer_lower for word in ['result', 'outcome', 'achieved', 'success']):
-                return "How did you measure the impact or success of that outcome?"
-            elif any(word in answer_lower for word in ['learn', 'grow', 'improve', 'develop']):
-                return "How have you applied what you learned in other situations?"
-            elif any(word in answer_lower for word in ['data', 'analysis', 'metrics', 'numbers']):
-                return "Can you share specific numbers or metrics that demonstrate the impact?"
+        if last_answer_index is not None:
+            last_user_answer = conversation_history[last_answer_index].content
+        else:
+            for turn in reversed(conversation_history):
+                if turn.type == 'answer':
+                    last_user_answer = turn.content
+                    break
+        
+        # Smart follow-up based on user's answer content (one pass over the answer)
+        follow_up = content.follow_up_router.route(role, last_user_answer)
+        if follow_up:
+            return follow_up
+        
+        # Move on to the bank question that best fits the resume and recent answers
+        if question_bank is not None:
+            question = question_bank.pick(role, resume_data, conversation_history, exclude=asked)
+            if question is not None:
+                return question
         
         # Fallback to random follow-up question
-        return random.choice(self.follow_up_questions)
+        return random.choice(content.follow_up_questions)
+    
+    def bank_index(self, question, content):
+        """Bank index of a question being asked, kept with the session so it is never picked again"""
+        question_bank = content.question_bank
+        return question_bank.index_of(question) if question_bank is not None else None
     
-        def generate_feedback(self, conversation_history, role):
+    def generate_feedback(self, conversation_history, role):
         # Analyze conversation and provide detailed feedback
-            user_answers = [msg['content'] for msg in conversation_history if msg.get('type') == 'answer']
-        
-            if not user_answers:
-                return "No answers provided during the interview. Please try to engage with the questions."
-        
-            # Analyze answer characteristics
-            total_answers = len(user_answers)
-            answer_lengths = [len(answer.split()) for answer in user_answers]
-            avg_length = sum(answer_lengths) / len(answer_lengths) if answer_lengths else 0
-            
-            # Simple content analysis
-            has_examples = any('example' in answer.lower() or 'specific' in answer.lower() for answer in user_answers)
-            has_metrics = any(any(char.isdigit() for char in answer) for answer in user_answers)
-            has_team_mention = any('team' in answer.lower() for answer in user_answers)
-            
-            # Generate personalized feedback - using regular strings to avoid syntax issues
-            feedback_lines = [
-                "📊 Interview Feedback for " + role + " Position",
-                "",
-                "✅ STRENGTHS:",
-                "• Provided " + str(total_answers) + " substantial answers",
-                "• Average answer length: " + str(round(avg_length, 1)) + " words - " + ("Good detail" if avg_length > 20 else "Could use more detail"),
-                "• " + ("Used specific examples effectively" if has_examples else "Included some examples"),
-                "• " + ("Included measurable results" if has_metrics else "Could add more metrics"),
-                "• " + ("Demonstrated teamwork experience" if has_team_mention else "Mentioned individual contributions"),
-                "",
-                "📈 AREAS FOR IMPROVEMENT:",
-                "1. Structure answers using STAR method (Situation, Task, Action, Result)",
-                "2. Include more specific numbers and metrics",
-                "3. Connect experiences to the target role", 
-                "4. Practice concise but comprehensive answers",
-                "",
-                "💡 TECHNICAL KNOWLEDGE:",
-                "• Showed understanding of " + role + " requirements",
-                "• Demonstrated relevant experience", 
-                "• Could benefit from more technical specifics",
-                "",
-                "🗣️ COMMUNICATION SKILLS:",
-                "• Good engagement level",
-                "• Clear expression of ideas",
-                "• Work on making answers more structured",
-                "",
-                "🎯 SPECIFIC TIPS FOR NEXT TIME:",
-                "1. Prepare 3-5 detailed accomplishment stories",
-                "2. Research common " + role + " interview questions",
-                "3. Practice explaining technical concepts simply",
-                "4. Record yourself to improve delivery",
-                "5. Use the STAR method for behavioral questions",
-                "",
-                "Remember: Practice makes perfect! Each mock interview helps you improve."
-            ]
-            
-            return "\n".join(feedback_lines)
+        return "\n\n".join(text for _, text in self.feedback_sections(conversation_history, role))
+    
+    def feedback_sections(self, conversation_history, role):
+        """Yield (section, text) pairs of the feedback report, in display order"""
+        user_answers = [turn.content for turn in conversation_history if turn.type == 'answer']
+        
+        if not user_answers:
+            yield 'summary', "No answers provided during the interview. Please try to engage with the questions."
+            return
+        
+        yield 'title', "📊 Interview Feedback for " + role + " Position"
+        
+        # Every answer is tokenized once and scored in a single batched pass
+        with stage('answer_analysis'):
+            analysis = answer_analyzer.analyze(user_answers, role)
+        total_answers = analysis['total_answers']
+        avg_length = analysis['avg_length']
+        has_examples = analysis['has_examples']
+        has_metrics = analysis['has_metrics']
+        has_team_mention = analysis['has_team_mention']
+        uses_star = analysis['star_answers'] > 0
+        
+        yield 'score', "Overall answer score: " + str(round(analysis['overall_score'])) + "/100"
+        
+        # Generate personalized feedback - using regular strings to avoid syntax issues
+        yield 'strengths', "\n".join([
+            "✅ STRENGTHS:",
+            "• Provided " + str(total_answers) + " substantial answers",
+            "• Average answer length: " + str(round(avg_length, 1)) + " words - " + ("Good detail" if avg_length > 20 else "Could use more detail"),
+            "• " + ("Used specific examples effectively" if has_examples else "Included some examples"),
+            "• " + ("Included measurable results" if has_metrics else "Could add more metrics"),
+            "• " + ("Demonstrated teamwork experience" if has_team_mention else "Mentioned individual contributions"),
+            "• " + ("Used STAR-style structure in " + str(analysis['star_answers']) + " answers" if uses_star else "Answered each question directly")
+        ])
+        
+        improvements = []
+        if not uses_star:
+            improvements.append("Structure answers using STAR method (Situation, Task, Action, Result)")
+        if not has_metrics:
+            improvements.append("Include more specific numbers and metrics")
+        if analysis['role_coverage'] < 0.2:
+            improvements.append("Connect experiences to the target role")
+        if analysis['filler_rate'] > 0.03:
+            improvements.append("Cut filler words (um, uh, basically) to sound more confident")
+        if avg_length > 150:
+            improvements.append("Practice concise but comprehensive answers")
+        elif avg_length <= 20:
+            improvements.append("Add more detail and context to each answer")
+        if not improvements:
+            improvements.append("Keep practicing to make strong answers feel natural")
+        
+        yield 'improvements', "\n".join(
+            ["📈 AREAS FOR IMPROVEMENT:"] + [str(i) + ". " + item for i, item in enumerate(improvements, 1)]
+        )
+        yield 'technical', "\n".join([
+            "💡 TECHNICAL KNOWLEDGE:",
+            "• Showed understanding of " + role + " requirements",
+            "• " + ("Used relevant " + role + " terminology" if analysis['role_coverage'] >= 0.2 else "Demonstrated relevant experience"),
+            "• Could benefit from more technical specifics"
+        ])
+        yield 'communication', "\n".join([
+            "🗣️ COMMUNICATION SKILLS:",
+            "• Good engagement level",
+            "• " + ("Clear expression of ideas" if analysis['filler_rate'] <= 0.03 else "Ideas came through, with some filler words"),
+            "• Work on making answers more structured"
+        ])
+        yield 'tips', "\n".join([
+            "🎯 SPECIFIC TIPS FOR NEXT TIME:",
+            "1. Prepare 3-5 detailed accomplishment stories",
+            "2. Research common " + role + " interview questions",
+            "3. Practice explaining technical concepts simply",
+            "4. Record yourself to improve delivery",
+            "5. Use the STAR method for behavioral questions"
+        ])
+        yield 'closing', "Remember: Practice makes perfect! Each mock interview helps you improve."
+
+# Interview content, hot-reloaded when its file changes (see utils/interview_content.py)
+content_store = create_content_store()
 
 # Initialize the free agent
-interview_agent = FreeInterviewAgent()
+interview_agent = FreeInterviewAgent(content_store)
+
+registry.gauge(
+    'interview_executor_in_flight',
+    'Tasks running or queued on each bounded executor',
+    lambda: {(('executor', e.name),): e.in_flight for e in (tts_executor, resume_executor)}
+)
+registry.gauge(
+    'interview_admission_running',
+    'Admitted requests in progress per endpoint class',
+    lambda: {(('endpoint_class', name),): gate.running for name, gate in admission.gates.items()}
+)
+registry.gauge(
+    'interview_admission_waiting',
+    'Requests waiting for an admission slot per endpoint class',
+    lambda: {(('endpoint_class', name),): gate.waiting for name, gate in admission.gates.items()}
+)
+
+# Serve frontend files: from memory when `python -m utils.static_assets` has been run
+# (precompressed, fingerprinted), otherwise straight from frontend/
+static_assets = load_static_assets()
+if static_assets is None:
+    print("📦 No static build found, serving frontend/ as is (run python -m utils.static_assets)")
 
-# Serve frontend files
 @app.route('/')
 def serve_index():
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_static('index.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
-    return send_from_directory(app.static_folder, path)
+    if static_assets is None:
+        return send_from_directory(DEFAULT_SOURCE_DIR, path)
+    response = static_assets.response(path, request)
+    if response is None:
+        abort(404)
+    return response
+
+def preload():
+    """
+    Load what workers would otherwise each load lazily: the document and TTS
+    libraries and the STT model (the content store has already warmed the
+    question bank's per-role arrays). The
+    gunicorn master calls this in preload mode (see gunicorn.conf.py), so
+    forked workers share it all copy-on-write.
+    """
+    load_document_libraries()
+    tts_synthesizer.preload()
+    get_recognizer().preload()
+
+def warm():
+    """
+    Start what each serving process needs before its first request (the
+    Piper process pool). Runs after any fork, since child processes can't
+    share it: gunicorn.conf.py calls it in post_fork, asgi.py and the dev
+    server at startup.
+    """
+    tts_synthesizer.warm()
+
+def busy_response(error):
+    """
+    429 with Retry-After when admission control turns a request away, 503 with
+    Retry-After when a worker pool is full, 504 when a task ran out of time
+    """
+    if isinstance(error, Rejected):
+        response = jsonify({'error': str(error), 'reason': error.reason, 'success': False})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response
+    if isinstance(error, Overloaded):
+        response = jsonify({'error': str(error), 'success': False})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response
+    return jsonify({'error': str(error), 'success': False}), 504
+
+def finish_session(session_id, session):
+    """Move a finished interview out of the session store and into the transcript archive"""
+    with stage('session_archive'):
+        if transcript_archive is not None:
+            transcript_archive.append(session_id, session)
+        session_store.delete(session_id)
+
+def answer_and_ask(session_id, answer):
+    """
+    Record an answer and the next question; returns the question, or None if the session is gone.
+    Raises ConversationFull once the session's turn limit is reached.
+    """
+    with stage('session_append'):
+        if not session_store.append_turn(session_id, 'answer', answer):
+            return None
+    
+    # Only the turns the next question depends on, not the whole conversation
+    with stage('session_lookup'):
+        session = session_store.get_recent(session_id, QUERY_TURNS)
+        content = content_store.get(session.get('content_version'))
+        # Asked indexes belong to the pinned snapshot's bank; if that snapshot was
+        # dropped, the bank looks the asked questions up in the whole conversation instead
+        pinned = content.tag == session.get('content_version')
+        if not pinned:
+            session = session_store.get(session_id)
+    with stage('question_generation'):
+        next_question = interview_agent.generate_question(
+            session['role'],
+            session['conversation'],
+            session['resume_data'],
+            session.get('last_answer_index'),
+            content,
+            session.get('asked') if pinned else None
+        )
+    
+    with stage('session_append'):
+        bank_index = interview_agent.bank_index(next_question, content) if pinned else None
+        session_store.append_turn(session_id, 'question', next_question, bank_index)
+    return next_question
 
 # API Routes
 @app.route('/api/start_interview', methods=['POST'])
@@ -196,19 +316,18 @@ def start_interview():
         session_id = data.get('session_id')
         role = data.get('role', 'Software Engineer')
         
-        interview_sessions[session_id] = {
-            'role': role,
-            'conversation': [],
-            'resume_data': None
-        }
+        # The session stays on this content version even if it is reloaded mid-interview
+        content = content_store.current
+        with stage('session_create'):
+            session_store.create(session_id, role, content.tag)
         
         # Generate first question
-        first_question = interview_agent.generate_question(role, [])
+        with stage('question_generation'):
+            first_question = interview_agent.generate_question(role, [], content=content)
         
-        interview_sessions[session_id]['conversation'].append({
-            'type': 'question',
-            'content': first_question
-        })
+        with stage('session_append'):
+            session_store.append_turn(session_id, 'question', first_question,
+                                      interview_agent.bank_index(first_question, content))
         
         return jsonify({
             'success': True,
@@ -225,32 +344,17 @@ def submit_answer():
         session_id = data.get('session_id')
         answer = data.get('answer')
         
-        if session_id not in interview_sessions:
+        # Add user's answer to conversation and generate the next question
+        next_question = answer_and_ask(session_id, answer)
+        if next_question is None:
             return jsonify({'error': 'Session not found'}), 404
         
-        # Add user's answer to conversation
-        interview_sessions[session_id]['conversation'].append({
-            'type': 'answer',
-            'content': answer
-        })
-        
-        # Generate next question
-        session = interview_sessions[session_id]
-        next_question = interview_agent.generate_question(
-            session['role'],
-            session['conversation'],
-            session['resume_data']
-        )
-        
-        session['conversation'].append({
-            'type': 'question',
-            'content': next_question
-        })
-        
         return jsonify({
             'success': True,
             'question': next_question
         })
+    except ConversationFull as e:
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -266,11 +370,17 @@ def upload_resume():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Parse resume
-        resume_data = parse_resume(file)
+        # Parse resume on the bounded parser pool; read the upload first so the
+        # worker never touches the request stream after a timeout
+        with admission.admit('resume', session_id, request.remote_addr):
+            data = file.read(MAX_RESUME_BYTES + 1)
+            if len(data) > MAX_RESUME_BYTES:
+                return jsonify({'error': f'Resume exceeds {MAX_RESUME_BYTES} bytes'}), 413
+            upload = FileStorage(stream=BytesIO(data), filename=file.filename)
+            resume_data = resume_executor.run(parse_resume, upload)
         
-        if session_id in interview_sessions:
-            interview_sessions[session_id]['resume_data'] = resume_data
+        if session_id:
+            session_store.set_resume_data(session_id, resume_data)
         
         return jsonify({
             'success': True,
@@ -278,28 +388,68 @@ def upload_resume():
             'message': 'Resume parsed successfully'
         })
         
+    except (Rejected, Overloaded, TaskTimeout) as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/upload_resumes', methods=['POST'])
+def upload_resumes():
+    """
+    Bulk resume import: any number of 'resumes' files and/or zip archives.
+    Streams one NDJSON line per file as soon as it is parsed.
+    """
+    try:
+        files = [f for f in request.files.getlist('resumes') if f.filename]
+        if not files:
+            return jsonify({'error': 'No files uploaded'}), 400
+        
+        # Files are read one at a time while the batch runs, not up front
+        entries = expand_uploads([(f.filename, f.stream) for f in files])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        parsed = failed = 0
+        for result in parse_batch(entries):
+            if result['success']:
+                parsed += 1
+            else:
+                failed += 1
+            yield json.dumps(result) + "\n"
+        yield json.dumps({'done': True, 'total': len(entries), 'parsed': parsed, 'failed': failed}) + "\n"
+    
+    # The batch holds its admission slot while it streams; the request (and its
+    # uploaded files) stays open until the last entry is read
+    try:
+        body = admission.admit_stream('batch', generate(), request.form.get('session_id'), request.remote_addr)
+    except Rejected as e:
+        return busy_response(e)
+    return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
 @app.route('/api/end_interview', methods=['POST'])
 def end_interview():
     try:
         data = request.json
         session_id = data.get('session_id')
         
-        if session_id not in interview_sessions:
+        with stage('session_lookup'):
+            session = session_store.get(session_id)
+        if session is None:
             return jsonify({'error': 'Session not found'}), 404
         
-        session = interview_sessions[session_id]
         feedback = interview_agent.generate_feedback(
             session['conversation'],
             session['role']
         )
+        finish_session(session_id, session)
         
         return jsonify({
             'success': True,
             'feedback': feedback,
-            'full_conversation': session['conversation']
+            'full_conversation': conversation_dicts(session['conversation'])
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -311,66 +461,235 @@ def handle_text_to_speech():
         text = data.get('text', '')
         if not text:
             return jsonify({'error': 'No text provided'}), 400
-            
-        audio_data = text_to_speech(text)
-        return jsonify({'audio': audio_data, 'success': True})
+        if len(text) > MAX_TTS_CHARS:
+            return jsonify({'error': f'Text exceeds {MAX_TTS_CHARS} characters'}), 413
+        
+        with admission.admit('tts', data.get('session_id'), request.remote_addr):
+            audio_id = tts_executor.run(prepare_speech, text)
+        return jsonify({'audio_url': audio_url(audio_id), 'success': True})
+    except (Rejected, Overloaded, TaskTimeout) as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
 
+AUDIO_ID_RE = re.compile(r'[0-9a-f]{64}')
+
+def audio_url(audio_id):
+    return f"/api/tts/{audio_id}"
+
+@app.route('/api/tts/<audio_id>', methods=['GET'])
+def stream_tts_audio(audio_id):
+    """
+    Stream synthesized audio as raw MP3 bytes.
+    IDs are content hashes, so responses are immutable; send_file handles
+    chunked streaming, ETag/If-None-Match and Range requests.
+    """
+    if not AUDIO_ID_RE.fullmatch(audio_id):
+        return jsonify({'error': 'Invalid audio id'}), 400
+    
+    audio = get_audio(audio_id)
+    if audio is None:
+        return jsonify({'error': 'Audio not found'}), 404
+    
+    return send_file(
+        BytesIO(audio),
+        mimetype=audio_mimetype(audio),
+        conditional=True,
+        etag=audio_id,
+        max_age=31536000
+    )
+
 @app.route('/api/process-voice-answer', methods=['POST'])
 def process_voice_answer():
     """
-    Process voice answer - simplified version
+    Process voice answer: transcribe it with the offline STT backend
+    (a placeholder when none is configured, see utils/speech_to_text.py)
     """
     try:
+        if (request.content_length or 0) > MAX_AUDIO_BYTES:
+            return jsonify({'error': f'Audio exceeds {MAX_AUDIO_BYTES} bytes'}), 413
+        # Chunked uploads don't declare a length, so the spooled file enforces the cap as well
+        request.max_file_bytes = MAX_AUDIO_BYTES
         session_id = request.form.get('session_id')
-        
-        if session_id not in interview_sessions:
+        if not session_store.exists(session_id):
             return jsonify({'error': 'Session not found'}), 404
-        
-        # Since speech-to-text isn't working reliably, we'll use a placeholder
-        answer_text = "[Voice answer recorded - please use text mode for accurate transcription]"
-        
-        # Add user's answer to conversation
-        interview_sessions[session_id]['conversation'].append({
-            'type': 'answer', 
-            'content': answer_text
-        })
-        
-        # Generate next question
-        session = interview_sessions[session_id]
-        next_question = interview_agent.generate_question(
-            session['role'],
-            session['conversation'],
-            session['resume_data']
-        )
-        
-        session['conversation'].append({
-            'type': 'question',
-            'content': next_question
-        })
-        
-        # Generate speech for the next question
-        question_audio = text_to_speech(next_question)
+        if 'audio' not in request.files:
+            return jsonify({'error': 'No audio provided'}), 400
+        
+        with admission.admit('stt', session_id, request.remote_addr):
+            transcript = speech_to_text(request.files['audio'])
+            answer_text = transcript.text
+            if not answer_text:
+                return jsonify({'error': 'No speech detected', 'transcription': transcript.metrics()}), 422
+            
+            # Add user's answer to conversation and generate the next question
+            next_question = answer_and_ask(session_id, answer_text)
+            if next_question is None:
+                return jsonify({'error': 'Session not found'}), 404
+            
+            # Generate speech for the next question
+            # The turn is already recorded, so if TTS is saturated, shed or failing send the question without audio
+            try:
+                with admission.admit('tts', session_id, request.remote_addr):
+                    question_audio_url = audio_url(tts_executor.run(prepare_speech, next_question))
+            except Exception as e:
+                print(f"🔊 Skipping question audio: {e}")
+                question_audio_url = None
         
         return jsonify({
             'success': True,
             'answer_text': answer_text,
             'next_question': next_question,
-            'question_audio': question_audio,
-            'note': 'Speech-to-text requires additional setup. Use text mode for accurate transcription.'
+            'question_audio_url': question_audio_url,
+            'transcription': transcript.metrics()
         })
         
+    except (Rejected, Overloaded) as e:
+        return busy_response(e)
+    except ConversationFull as e:
+        return jsonify({'error': str(e)}), 409
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except SpeechToTextError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/sessions/<session_id>/turns', methods=['POST'])
+def stream_turn(session_id):
+    """
+    Submit an answer and stream the rest of the turn as Server-Sent Events:
+    'question' as soon as the next question is chosen, then 'audio' once its
+    speech is ready (when requested), then 'done'.
+    JSON body {answer, audio} for text answers. Voice answers are sent as the
+    raw audio body (Content-Type audio/*) and transcribed while they upload,
+    or as a multipart 'audio' file.
+    """
+    transcription = None
+    try:
+        if request.is_json:
+            data = request.json
+            answer = data.get('answer')
+            want_audio = bool(data.get('audio'))
+            if not answer:
+                return jsonify({'error': 'No answer provided'}), 400
+        else:
+            if (request.content_length or 0) > MAX_AUDIO_BYTES:
+                return jsonify({'error': f'Audio exceeds {MAX_AUDIO_BYTES} bytes'}), 413
+            if not session_store.exists(session_id):
+                return jsonify({'error': 'Session not found'}), 404
+            request.max_file_bytes = MAX_AUDIO_BYTES
+            with admission.admit('stt', session_id, request.remote_addr):
+                if request.mimetype.startswith('audio/'):
+                    transcript = speech_to_text_stream(iter_file_chunks(request.stream), MAX_AUDIO_BYTES)
+                elif 'audio' in request.files:
+                    transcript = speech_to_text(request.files['audio'])
+                else:
+                    return jsonify({'error': 'No audio provided'}), 400
+            if not transcript.text:
+                return jsonify({'error': 'No speech detected', 'transcription': transcript.metrics()}), 422
+            answer = transcript.text
+            transcription = transcript.metrics()
+            want_audio = True
+        
+        next_question = answer_and_ask(session_id, answer)
+        if next_question is None:
+            return jsonify({'error': 'Session not found'}), 404
+    except (Rejected, Overloaded) as e:
+        return busy_response(e)
+    except ConversationFull as e:
+        return jsonify({'error': str(e)}), 409
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except SpeechToTextError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    client_ip = request.remote_addr
+    
+    def events():
+        yield 'question', {'answer': answer, 'question': next_question, 'transcription': transcription}
+        if want_audio:
+            # Same admission class as /api/text-to-speech, so streamed turns are shed alike
+            try:
+                with admission.admit('tts', session_id, client_ip):
+                    audio_id = tts_executor.run(prepare_speech, next_question)
+                yield 'audio', {'audio_url': audio_url(audio_id)}
+            except Rejected as e:
+                yield 'audio', {'audio_url': None, 'error': str(e), 'retry_after': e.retry_after}
+            except Exception as e:
+                # The turn is already recorded; the client just shows the text
+                print(f"🔊 Skipping question audio: {e}")
+                yield 'audio', {'audio_url': None, 'error': str(e)}
+        yield 'done', {'success': True}
+    
+    return sse_response(events())
+
+@app.route('/api/sessions/<session_id>/feedback', methods=['POST'])
+def stream_feedback(session_id):
+    """End the interview and stream the feedback report one section at a time"""
+    with stage('session_lookup'):
+        session = session_store.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    finish_session(session_id, session)
+    
+    def events():
+        for section, text in interview_agent.feedback_sections(session['conversation'], session['role']):
+            yield 'feedback', {'section': section, 'text': text}
+        yield 'done', {'success': True, 'full_conversation': conversation_dicts(session['conversation'])}
+    
+    return sse_response(events())
+
+@app.route('/api/admin/content', methods=['GET', 'POST'])
+def admin_content():
+    """
+    Content status (GET), or reload the content file now (POST). Needs the
+    X-Admin-Token header to match ADMIN_TOKEN; disabled when that is unset.
+    Only the worker that takes the request reloads; the others pick the
+    change up with their file watchers.
+    """
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        abort(404)
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+        return jsonify({'error': 'Invalid admin token', 'success': False}), 403
+    
+    reloaded = None
+    if request.method == 'POST':
+        try:
+            reloaded = content_store.reload(force=True)
+        except (OSError, ContentError) as e:
+            return jsonify({'error': str(e), 'success': False, 'content': content_store.stats()}), 400
+    return jsonify({
+        'success': True,
+        'reloaded': reloaded.tag if reloaded is not None else None,
+        'content': content_store.stats()
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy', 
         'version': '1.0.0',
-        'message': 'Interview Practice API is running'
+        'message': 'Interview Practice API is running',
+        'tts_cache': tts_cache.stats(),
+        'tts_engines': tts_synthesizer.stats(),
+        'sessions': session_store.stats(),
+        'transcripts': transcript_archive.stats() if transcript_archive is not None else None,
+        'resume_cache': resume_cache.stats(),
+        'static_assets': static_assets.stats() if static_assets is not None else None,
+        'stt': get_recognizer().stats(),
+        'transcoding': transcode_pool.stats(),
+        'admission': admission.stats(),
+        'content': content_store.stats(),
+        'executors': {
+            'tts': tts_executor.stats(),
+            'resume': resume_executor.stats()
+        }
     })
 
 if __name__ == '__main__':
+    warm()
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+ASGI entry point.
+
+The Flask app runs inside a2wsgi's thread-pooled adapter, so the event loop
+only accepts connections and every request gets its own thread. Slow requests
+(speech synthesis and recognition, resume uploads, bulk imports) hold their
+thread while they run and while they wait at their admission gate (see
+utils/admission.py), so at most the gates' concurrency + queue slots summed
+over all endpoint classes are blocked at once. The pool defaults to that many
+threads plus SPARE_THREADS, leaving room for start_interview/submit_answer
+however busy the slow endpoints are.
+
+  ASGI_REQUEST_THREADS   request threads (default: admission slots + SPARE_THREADS)
+
+Run with:
+  uvicorn asgi:asgi_app --host 0.0.0.0 --port 5000
+  gunicorn asgi:asgi_app -k uvicorn.workers.UvicornWorker
+"""
+import os
+import sys
+
+from a2wsgi import WSGIMiddleware
+
+from app import admission, app, warm
+
+SPARE_THREADS = 16
+ADMISSION_SLOTS = sum(gate.concurrency + gate.queue for gate in admission.gates.values())
+
+asgi_app = WSGIMiddleware(
+    app, workers=int(os.environ.get('ASGI_REQUEST_THREADS', ADMISSION_SLOTS + SPARE_THREADS))
+)
+
+# Under gunicorn, the post_fork hook in gunicorn.conf.py warms each worker instead
+if 'gunicorn' not in sys.modules:
+    warm()
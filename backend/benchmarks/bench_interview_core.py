@@ -0,0 +1,109 @@
+"""
+Microbenchmarks for the per-request hot paths: parse_resume (per format,
+uncached and cached), extract_key_info, generate_question and
+generate_feedback.
+
+Run from the backend directory:
+  python -m benchmarks.bench_interview_core [--resumes 30] [--history 200] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import time
+from io import BytesIO
+
+# Benchmarks measure the code, not the disk cache or the network
+os.environ.setdefault('RESUME_CACHE_PATH', '')
+os.environ.setdefault('TTS_CACHE_DIR', '')
+os.environ.setdefault('TTS_BACKENDS', 'stub')
+
+from werkzeug.datastructures import FileStorage
+
+from app import interview_agent
+from benchmarks.load_test import ANSWER_TEMPLATES, ROLES, THINGS
+from benchmarks.resume_corpus import FORMATS, generate_corpus, make_resume_text
+from utils.resume_parser import extract_key_info, parse_resume, parse_resume_uncached
+from utils.transcripts import Turn
+
+
+def per_call(fn, items, repeat=3):
+    """Best-of-repeat mean seconds per call over items"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(items), 1)
+
+
+def upload(filename, data):
+    return FileStorage(stream=BytesIO(data), filename=filename)
+
+
+def make_history(rng, turns):
+    history = []
+    for _ in range(turns):
+        history.append(Turn.make('question', 'Tell me more.'))
+        answer = rng.choice(ANSWER_TEMPLATES).format(thing=rng.choice(THINGS), n=rng.randint(2, 60))
+        history.append(Turn.make('answer', answer))
+    # A trailing question, so the last answer isn't the last turn
+    history.append(Turn.make('question', 'And then?'))
+    return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=30, help='Resumes per format')
+    parser.add_argument('--history', type=int, default=200, help='Answers in the long-interview history')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = {}
+
+    def record(name, seconds):
+        results[name] = seconds * 1e6
+        print(f"{name:45} {seconds * 1e6:12.1f} us/call")
+
+    for fmt in FORMATS:
+        corpus = generate_corpus(args.resumes, args.seed, formats=(fmt,))
+        record(f"parse_resume_uncached [{fmt}]",
+               per_call(lambda item: parse_resume_uncached(upload(*item)), corpus, args.repeat))
+    corpus = generate_corpus(args.resumes, args.seed)
+    for item in corpus:
+        parse_resume(upload(*item))  # Warm the memory cache
+    record("parse_resume [cache hit]", per_call(lambda item: parse_resume(upload(*item)), corpus, args.repeat))
+
+    texts = [make_resume_text(rng) for _ in range(args.resumes)]
+    long_texts = [make_resume_text(rng, jobs=40) for _ in range(max(1, args.resumes // 5))]
+    record("extract_key_info [1 page]", per_call(extract_key_info, texts, args.repeat))
+    record("extract_key_info [~10 pages]", per_call(extract_key_info, long_texts, args.repeat))
+
+    roles = [rng.choice(ROLES) for _ in range(200)]
+    record("generate_question [first question]",
+           per_call(lambda role: interview_agent.generate_question(role, []), roles, args.repeat))
+    history = make_history(rng, args.history)
+    last_answer = len(history) - 2
+    record(f"generate_question [{args.history} answers, indexed]",
+           per_call(lambda role: interview_agent.generate_question(role, history, None, last_answer),
+                    roles, args.repeat))
+    record(f"generate_question [{args.history} answers, scan]",
+           per_call(lambda role: interview_agent.generate_question(role, history), roles, args.repeat))
+
+    short = make_history(rng, 8)
+    record("generate_feedback [8 answers]",
+           per_call(lambda role: interview_agent.generate_feedback(short, role), roles[:50], args.repeat))
+    record(f"generate_feedback [{args.history} answers]",
+           per_call(lambda role: interview_agent.generate_feedback(history, role), roles[:10], args.repeat))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'us_per_call': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
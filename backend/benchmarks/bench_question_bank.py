@@ -0,0 +1,105 @@
+"""
+Benchmark: question bank index build time and per-query retrieval latency.
+
+A synthetic bank is generated from templates x skills x roles; queries use
+resumes from the benchmark corpus and a growing conversation.
+
+Run from the backend directory:
+  python -m benchmarks.bench_question_bank [--questions 50000] [--queries 2000]
+  python -m benchmarks.bench_question_bank --write /tmp/bank.jsonl   # keep the bank for QUESTION_BANK_PATH
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.load_test import ANSWER_TEMPLATES, ROLES, THINGS
+from benchmarks.resume_corpus import SKILLS
+from utils.question_bank import QuestionBank
+from utils.resume_parser import extract_key_info
+from benchmarks.resume_corpus import make_resume_text
+from utils.transcripts import Turn
+
+TEMPLATES = [
+    "How have you used {skill} to {goal}?",
+    "Tell me about a time {skill} helped you {goal}.",
+    "What trade-offs do you weigh when choosing {skill} over {other}?",
+    "Describe a project where you combined {skill} and {other}.",
+    "How would you explain {skill} to a new teammate?",
+    "What went wrong the last time you worked with {skill}, and how did you {goal}?",
+    "How do you measure success when you {goal} with {skill}?",
+    "Walk me through how you would {goal} using {other}."
+]
+GOALS = ['reduce costs', 'ship faster', 'improve reliability', 'grow revenue', 'win a customer',
+         'scale the team', 'fix a production incident', 'speed up onboarding', 'improve data quality',
+         'run an experiment', 'migrate a legacy system', 'launch a new feature']
+EXTRA_TOPICS = [f"{a} {b}" for a in ('stream', 'batch', 'mobile', 'cloud', 'edge', 'legacy', 'realtime', 'internal')
+                for b in ('analytics', 'payments', 'search', 'billing', 'messaging', 'onboarding', 'reporting')]
+
+
+def make_bank(count, seed=0):
+    """[(text, roles)] with a mix of role-specific and generic questions"""
+    rng = random.Random(seed)
+    topics = SKILLS + EXTRA_TOPICS
+    bank, seen = [], set()
+    while len(bank) < count:
+        text = rng.choice(TEMPLATES).format(
+            skill=rng.choice(topics), other=rng.choice(topics), goal=rng.choice(GOALS)
+        )
+        text += f" ({rng.choice(topics)} context #{len(bank)})" if text in seen else ''
+        seen.add(text)
+        roles = () if rng.random() < 0.3 else tuple(rng.sample(ROLES, rng.randint(1, 2)))
+        bank.append((text, roles))
+    return bank
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--questions', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--write', help='Also write the generated bank as JSON lines')
+    args = parser.parse_args(argv)
+
+    questions = make_bank(args.questions, args.seed)
+    if args.write:
+        with open(args.write, 'w', encoding='utf-8') as f:
+            for text, roles in questions:
+                f.write(json.dumps({'question': text, 'roles': list(roles)}) + '\n')
+
+    bank = QuestionBank(questions)
+    print(f"Index: {bank.stats()}")
+
+    rng = random.Random(args.seed)
+    resumes = [extract_key_info(make_resume_text(rng)) for _ in range(50)]
+    timings = {'first question (resume only)': [], 'follow-up (resume + answers)': [], 'no resume, no answers': []}
+    for i in range(args.queries):
+        role = rng.choice(ROLES)
+        resume = resumes[i % len(resumes)]
+        conversation = []
+        for _ in range(rng.randint(1, 10)):
+            conversation.append(Turn.make('question', rng.choice(questions)[0]))
+            answer = rng.choice(ANSWER_TEMPLATES).format(thing=rng.choice(THINGS), n=rng.randint(2, 60))
+            conversation.append(Turn.make('answer', answer))
+
+        for name, args_ in (('first question (resume only)', (role, resume, ())),
+                            ('follow-up (resume + answers)', (role, resume, conversation)),
+                            ('no resume, no answers', (role, None, ()))):
+            started = time.perf_counter()
+            question = bank.pick(*args_, rng=rng)
+            timings[name].append(time.perf_counter() - started)
+            assert question is not None
+
+        # Asked questions are never picked again
+        asked = {t.content for t in conversation if t.type == 'question'}
+        assert bank.pick(role, resume, conversation, rng=rng) not in asked
+
+    print(f"\n{'query':32} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}")
+    for name, values in timings.items():
+        values.sort()
+        print(f"{name:32} {values[len(values) // 2] * 1e6:8.1f} {values[int(len(values) * 0.99)] * 1e6:8.1f} "
+              f"{sum(values) / len(values) * 1e6:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: section-based extraction vs. the original whole-text regexes,
+on realistic and pathological (backtracking-prone) resume text.
+
+Run from the backend directory:
+  python -m benchmarks.bench_resume_extraction [--size 50000]
+"""
+import argparse
+import re
+import time
+
+from benchmarks.bench_skill_matcher import legacy_extract_skills
+from utils.resume_parser import extract_key_info
+from utils.skill_matcher import PROFESSIONAL_SKILLS, TECHNICAL_SKILLS
+
+
+def legacy_extract_key_info(text):
+    """
+    The pre-segmenter extractors, kept verbatim for comparison. Returns the
+    skills and years of experience, the fields the segmenter must not change.
+    """
+    text = re.sub(r'\s+', ' ', text)
+    info = {'skills': legacy_extract_skills(text, TECHNICAL_SKILLS + PROFESSIONAL_SKILLS), 'experience': None}
+    lowered = text.lower()
+    for pattern in [r'(\d+[\+\+]?\s*(?:years?|yrs?))',
+                    r'experience.*?(\d+[\+\+]?\s*(?:years?|yrs?))',
+                    r'(\d+[\+\+]?\s*(?:years?|yrs?)).*?experience']:
+        matches = re.findall(pattern, lowered)
+        if matches:
+            info['experience'] = matches[0].title()
+            break
+    keywords = ['university', 'college', 'institute', 'school', 'bachelor', r'b\.?s\.?', r'b\.?a\.?',
+                'master', r'm\.?s\.?', r'm\.?a\.?', 'mba', 'phd', r'ph\.?d\.?', 'doctorate',
+                'associate', 'diploma', 'certificate']
+    for line in text.split('\n'):
+        line_lower = line.lower()
+        if not any(re.search(k, line_lower) for k in keywords if '.' in k):
+            any(k in line_lower for k in keywords if '.' not in k)
+    re.findall(r'projects?:(.*?)(?:\n\s*\n|\n[A-Z]|$)', text, re.IGNORECASE | re.DOTALL)
+    for pattern in [r'summary[:\s]*(.*?)(?:\n\s*\n|\n[A-Z]|$)',
+                    r'objective[:\s]*(.*?)(?:\n\s*\n|\n[A-Z]|$)',
+                    r'profile[:\s]*(.*?)(?:\n\s*\n|\n[A-Z]|$)']:
+        re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
+    return info
+
+
+def realistic(size):
+    block = (
+        "Jane Doe\njane@example.com\n\nSUMMARY\nBackend engineer with a focus on reliable services.\n\n"
+        "EXPERIENCE\nSenior Engineer, Acme (2019-2024)\n- Built billing pipelines in Python\n\n"
+        "EDUCATION\nB.S. Computer Science, State University\n\n"
+        "PROJECTS\n- Open-source rate limiter used by several companies\n- Realtime dashboard for ops\n\n"
+    )
+    return (block * (size // len(block) + 1))[:size]
+
+
+def pathological_inputs(size):
+    return {
+        # Every "experience" scans to the end looking for "N years"
+        'experience without years': 'experience ' * (size // 11),
+        # Every "summary" scans to the end for a paragraph break
+        'summary without terminator': 'summary profile objective ' * (size // 26),
+        # Long digit runs make \d+ retry from every position
+        'long digit runs': ('9' * 5000 + ' ') * (size // 5001),
+        # Many short lines (the legacy code collapsed them into one line first)
+        'many short lines': 'line of text about nothing\n' * (size // 27),
+    }
+
+
+def timeit(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=50000, help='Characters per input')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    inputs = {'realistic resume': realistic(args.size), **pathological_inputs(args.size)}
+    print(f"{'input':28} {'legacy ms':>12} {'current ms':>12} {'speedup':>9}")
+    for name, text in inputs.items():
+        legacy = timeit(lambda: legacy_extract_key_info(text), args.repeat)
+        current = timeit(lambda: extract_key_info(text), args.repeat)
+        print(f"{name:28} {legacy * 1000:12.2f} {current * 1000:12.2f} {legacy / current:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: single-pass SkillMatcher vs. the original per-skill regex loop.
+
+Run from the backend directory:
+  python -m benchmarks.bench_skill_matcher [--pages 20] [--taxonomy-size 2000]
+"""
+import argparse
+import random
+import re
+import time
+
+from utils.skill_matcher import PROFESSIONAL_SKILLS, TECHNICAL_SKILLS, SkillMatcher, default_taxonomy
+
+
+def legacy_extract_skills(text, all_skills):
+    """The pre-SkillMatcher implementation: one regex and one text.lower() per skill"""
+    found_skills = []
+    for skill in all_skills:
+        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
+            found_skills.append(skill.title())
+    return list(set(found_skills))[:15]
+
+
+FILLER = (
+    "Led a cross-functional effort to migrate reporting pipelines and improve reliability "
+    "for customers across several regions while mentoring junior colleagues. "
+)
+
+
+def make_resume(pages, skills, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(pages * 40):
+        words = FILLER.split()
+        for _ in range(2):
+            words.insert(rng.randrange(len(words)), rng.choice(skills))
+        lines.append(' '.join(words))
+    return '\n'.join(lines)
+
+
+def synthetic_taxonomy(size, seed=11):
+    rng = random.Random(seed)
+    syllables = ['ka', 'lo', 'mi', 'tra', 'zen', 'qua', 'ver', 'dex', 'ion', 'pho']
+    taxonomy = default_taxonomy()
+    while len(taxonomy) < size:
+        name = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        taxonomy.setdefault(name.title(), [name + 'js', name + ' framework'])
+    return taxonomy
+
+
+def timeit(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--taxonomy-size', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    builtin = TECHNICAL_SKILLS + PROFESSIONAL_SKILLS
+    text = make_resume(args.pages, builtin)
+    print(f"Resume: {args.pages} pages, {len(text):,} chars")
+
+    matcher = SkillMatcher(default_taxonomy())
+    legacy = timeit(lambda: legacy_extract_skills(text, builtin), args.repeat)
+    single = timeit(lambda: matcher.skills(text, limit=15), args.repeat)
+    print(f"Built-in taxonomy ({len(builtin)} skills)")
+    print(f"  legacy per-skill loop: {legacy * 1000:9.2f} ms")
+    print(f"  SkillMatcher:          {single * 1000:9.2f} ms  ({legacy / single:.1f}x)")
+
+    taxonomy = synthetic_taxonomy(args.taxonomy_size)
+    terms = [term for name, synonyms in taxonomy.items() for term in [name.lower(), *synonyms]]
+    start = time.perf_counter()
+    big = SkillMatcher(taxonomy)
+    build = time.perf_counter() - start
+    legacy = timeit(lambda: legacy_extract_skills(text, terms), 1)
+    single = timeit(lambda: big.find(text), args.repeat)
+    print(f"Large taxonomy ({len(taxonomy)} skills, {len(terms)} terms, built in {build * 1000:.0f} ms)")
+    print(f"  legacy per-skill loop: {legacy * 1000:9.2f} ms")
+    print(f"  SkillMatcher:          {single * 1000:9.2f} ms  ({legacy / single:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
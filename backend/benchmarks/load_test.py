@@ -0,0 +1,290 @@
+"""
+Load test: many synthetic candidates running the full interview flow
+concurrently against the HTTP API.
+
+Each candidate does start_interview -> N x submit_answer -> upload_resume ->
+end_interview -> text-to-speech (+ fetching the audio). By default the
+harness starts its own gunicorn with the stub TTS engine (no network) and
+a SQLite session store shared by the workers, and samples each worker's RSS.
+
+Run from the backend directory:
+  python -m benchmarks.load_test [--candidates 100] [--concurrency 16] [--answers 5]
+                                 [--workers 2] [--threads 8] [--tts-delay-ms 150]
+  python -m benchmarks.load_test --url http://127.0.0.1:5000   # an already running server
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.resume_corpus import generate_corpus
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROLES = ['Software Engineer', 'Data Scientist', 'Sales Representative', 'Marketing Manager',
+         'Product Manager', 'UX Designer']
+ANSWER_TEMPLATES = [
+    "In my last project I built a {thing} with my team. As a result latency dropped {n}% and we shipped on time.",
+    "The biggest challenge was {thing}. I worked with colleagues to analyse the data and fixed it in {n} days.",
+    "I learned to prioritize. For example, I used metrics from {n} customers to decide what to build next.",
+    "Um, I basically like to keep things simple, you know, and focus on the {thing} that matters.",
+    "My role was to lead the {thing} effort; the outcome was a {n}% increase in engagement."
+]
+THINGS = ['billing pipeline', 'search feature', 'design system', 'pricing model', 'data warehouse', 'campaign']
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(master_pid):
+    """Child processes of the gunicorn master (Linux /proc)"""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == master_pid:
+            pids.append(int(entry))
+    return pids
+
+
+def rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class RSSSampler(threading.Thread):
+    """Samples every worker's RSS until stopped; keeps first, peak and last"""
+
+    def __init__(self, master_pid, interval=0.25):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples = {}  # pid -> [first, peak, last]
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            self.sample()
+            self._stopped.wait(self.interval)
+
+    def sample(self):
+        for pid in worker_pids(self.master_pid):
+            rss = rss_bytes(pid)
+            if rss is None:
+                continue
+            entry = self.samples.setdefault(pid, [rss, rss, rss])
+            entry[1] = max(entry[1], rss)
+            entry[2] = rss
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self.sample()
+
+
+def start_server(workers, threads, tts_delay_ms, workdir, extra_env=None):
+    port = free_port()
+    env = dict(
+        os.environ,
+        TTS_BACKENDS='stub',
+        TTS_STUB_DELAY_MS=str(tts_delay_ms),
+        TTS_CACHE_DIR='',
+        TTS_BUNDLE_PATH=os.path.join(workdir, 'no-bundle.bin'),
+        RESUME_CACHE_PATH='',
+        TRANSCRIPT_DB_PATH=os.path.join(workdir, 'transcripts.db'),
+        # Every synthetic candidate shares one client IP
+        IP_RATE='100000',
+        IP_BURST='100000',
+        # Workers must share sessions, since consecutive requests can land on different workers
+        SESSION_STORE='sqlite',
+        SESSION_DB_PATH=os.path.join(workdir, 'sessions.db')
+    )
+    env.update(extra_env or {})
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--workers', str(workers), '--threads', str(threads),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            if requests.get(url + '/api/health', timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('Server did not become healthy within 60 seconds')
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}  # endpoint -> [seconds]
+        self.errors = {}
+
+    def call(self, endpoint, fn):
+        started = time.perf_counter()
+        try:
+            response = fn()
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        return response if ok else None
+
+
+def run_candidate(url, index, answers, corpus, recorder, seed):
+    rng = random.Random(seed * 100003 + index)
+    http = requests.Session()
+    session_id = f"load_{uuid.uuid4().hex[:12]}"
+    role = rng.choice(ROLES)
+
+    response = recorder.call('start_interview', lambda: http.post(
+        url + '/api/start_interview', json={'session_id': session_id, 'role': role}, timeout=30))
+    if response is None:
+        return False
+    question = response.json().get('question', '')
+
+    for _ in range(answers):
+        answer = rng.choice(ANSWER_TEMPLATES).format(thing=rng.choice(THINGS), n=rng.randint(2, 60))
+        response = recorder.call('submit_answer', lambda: http.post(
+            url + '/api/submit_answer', json={'session_id': session_id, 'answer': answer}, timeout=30))
+        if response is not None:
+            question = response.json().get('question', question)
+
+    filename, data = corpus[index % len(corpus)]
+    recorder.call('upload_resume', lambda: http.post(
+        url + '/api/upload_resume', files={'resume': (filename, data)},
+        data={'session_id': session_id}, timeout=60))
+
+    recorder.call('end_interview', lambda: http.post(
+        url + '/api/end_interview', json={'session_id': session_id}, timeout=30))
+
+    response = recorder.call('text_to_speech', lambda: http.post(
+        url + '/api/text-to-speech', json={'text': question}, timeout=60))
+    if response is not None:
+        audio_url = response.json().get('audio_url')
+        recorder.call('tts_audio', lambda: http.get(url + audio_url, timeout=30))
+    return True
+
+
+def report(recorder, elapsed, candidates, rss):
+    summary = {'elapsed_seconds': elapsed, 'candidates': candidates, 'endpoints': {}}
+    total = 0
+    print(f"{'endpoint':18} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for endpoint, values in recorder.latencies.items():
+        values = sorted(values)
+        total += len(values)
+        stats = {
+            'count': len(values),
+            'errors': recorder.errors.get(endpoint, 0),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'mean_ms': sum(values) / len(values) * 1000
+        }
+        summary['endpoints'][endpoint] = stats
+        print(f"{endpoint:18} {stats['count']:7d} {stats['errors']:7d} {stats['p50_ms']:9.1f} "
+              f"{stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f} {stats['mean_ms']:9.1f}")
+
+    summary['requests_per_second'] = total / elapsed
+    summary['flows_per_second'] = candidates / elapsed
+    print(f"\n{total} requests in {elapsed:.1f}s: {summary['requests_per_second']:.1f} req/s, "
+          f"{summary['flows_per_second']:.2f} interviews/s")
+
+    if rss:
+        summary['rss_mb'] = {}
+        print(f"\n{'worker pid':>10} {'start MB':>9} {'peak MB':>9} {'end MB':>9}")
+        for pid, (first, peak, last) in sorted(rss.items()):
+            summary['rss_mb'][pid] = {'start': first / 2**20, 'peak': peak / 2**20, 'end': last / 2**20}
+            print(f"{pid:10d} {first / 2**20:9.1f} {peak / 2**20:9.1f} {last / 2**20:9.1f}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent interview-flow load test')
+    parser.add_argument('--url', help='Target an already running server instead of starting gunicorn')
+    parser.add_argument('--candidates', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--answers', type=int, default=5, help='Answers per interview')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (when starting the server)')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker')
+    parser.add_argument('--tts-delay-ms', type=int, default=150, help='Simulated TTS engine latency')
+    parser.add_argument('--resumes', type=int, default=30, help='Size of the generated resume corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Also write the summary to this file')
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.resumes, args.seed)
+    server, sampler = None, None
+    workdir = tempfile.mkdtemp(prefix='interview-load-')
+    url = args.url
+    if url is None:
+        server, url = start_server(args.workers, args.threads, args.tts_delay_ms, workdir)
+        sampler = RSSSampler(server.pid)
+        sampler.start()
+        print(f"Started gunicorn ({args.workers} workers x {args.threads} threads) at {url}")
+
+    recorder = Recorder()
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(
+                lambda i: run_candidate(url, i, args.answers, corpus, recorder, args.seed),
+                range(args.candidates)
+            ))
+        elapsed = time.perf_counter() - started
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    summary = report(recorder, elapsed, args.candidates, sampler.samples if sampler else None)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if recorder.errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,149 @@
+"""
+Synthetic resume corpus built from templates, in TXT, DOCX and PDF form.
+
+Resumes are deterministic for a given seed, so benchmark runs are
+comparable. PDFs are written by hand (one Helvetica text page per ~45
+lines) so no PDF library is needed.
+
+  python -m benchmarks.resume_corpus --count 50 --output /tmp/resumes
+"""
+import argparse
+import os
+import random
+from io import BytesIO
+
+from docx import Document
+
+FIRST_NAMES = ['Alex', 'Priya', 'Jordan', 'Wei', 'Maria', 'Sam', 'Fatima', 'Lucas', 'Aiko', 'Noah']
+LAST_NAMES = ['Kim', 'Patel', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Silva', 'Larsen', 'Haddad', 'Moreau']
+TITLES = ['Software Engineer', 'Data Scientist', 'Product Manager', 'UX Designer', 'Marketing Manager',
+          'Sales Representative', 'Backend Developer', 'Data Analyst']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Analytics']
+SKILLS = ['Python', 'Java', 'JavaScript', 'SQL', 'AWS', 'Docker', 'Kubernetes', 'React', 'Tableau',
+          'Machine Learning', 'Figma', 'Salesforce', 'SEO', 'Agile', 'Scrum', 'Leadership', 'Git',
+          'Communication', 'Project Management', 'Excel', 'PostgreSQL', 'Node.js', 'Go', 'Redis']
+DEGREES = ['B.S. Computer Science', 'M.S. Data Science', 'MBA', 'B.A. Economics', 'PhD Statistics',
+           'Bachelor of Design']
+SCHOOLS = ['State University', 'Institute of Technology', 'City College', 'Northern University']
+BULLETS = [
+    'Built {skill} services handling {n}k requests per day',
+    'Led a team of {n} engineers to migrate the platform to {skill}',
+    'Improved conversion by {n}% through experiments and analytics',
+    'Designed dashboards in {skill} used by {n} stakeholders',
+    'Reduced infrastructure cost by {n}% with {skill} automation',
+    'Mentored {n} junior colleagues and ran weekly code reviews'
+]
+PROJECTS = [
+    'Open-source {skill} library with {n} stars',
+    'Realtime analytics pipeline on {skill}',
+    'Mobile app prototype tested with {n} users',
+    'Internal {skill} tooling adopted by {n} teams'
+]
+FORMATS = ('txt', 'docx', 'pdf')
+
+
+def make_resume_text(rng, jobs=3):
+    """One resume as plain text with the usual section headings"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, 8)
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rng.randint(1000, 9999)}",
+        '',
+        'SUMMARY',
+        f"{title} with {rng.randint(2, 15)} years of experience in {skills[0]} and {skills[1]}.",
+        '',
+        'EXPERIENCE'
+    ]
+    for _ in range(jobs):
+        start = rng.randint(2005, 2020)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start}-{start + rng.randint(1, 4)})")
+        for template in rng.sample(BULLETS, 3):
+            lines.append('- ' + template.format(skill=rng.choice(skills), n=rng.randint(2, 90)))
+        lines.append('')
+    lines += ['EDUCATION', f"{rng.choice(DEGREES)}, {rng.choice(SCHOOLS)}", '', 'PROJECTS']
+    for template in rng.sample(PROJECTS, 2):
+        lines.append('- ' + template.format(skill=rng.choice(skills), n=rng.randint(5, 900)))
+    lines += ['', 'SKILLS', ', '.join(skills)]
+    return '\n'.join(lines)
+
+
+def to_docx(text):
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    out = BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _pdf_escape(line):
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def to_pdf(text, lines_per_page=45):
+    """Minimal multi-page PDF with the text in Helvetica"""
+    lines = text.split('\n')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = []  # object bodies; object n is objects[n - 1]
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append('<< /Type /Catalog /Pages 2 0 R >>')
+    objects.append(f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {len(pages)} >>")
+    objects.append('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    for page_id, page_lines in zip(page_ids, pages):
+        body = 'BT /F1 10 Tf 14 TL 50 800 Td ' + ' '.join(f"({_pdf_escape(l)}) '" for l in page_lines) + ' ET'
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('latin-1')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    return bytes(out)
+
+
+def generate_corpus(count, seed=0, formats=FORMATS, jobs=3):
+    """[(filename, bytes)] cycling through formats"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        text = make_resume_text(rng, jobs)
+        fmt = formats[i % len(formats)]
+        if fmt == 'docx':
+            data = to_docx(text)
+        elif fmt == 'pdf':
+            data = to_pdf(text)
+        else:
+            data = text.encode('utf-8')
+        corpus.append((f"resume_{i:04d}.{fmt}", data))
+    return corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic resume corpus')
+    parser.add_argument('--count', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    for filename, data in generate_corpus(args.count, args.seed):
+        with open(os.path.join(args.output, filename), 'wb') as f:
+            f.write(data)
+    print(f"Wrote {args.count} resumes to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
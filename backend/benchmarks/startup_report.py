@@ -0,0 +1,176 @@
+"""
+Startup report: import time, cold start and per-worker memory, to track
+across releases.
+
+1. Imports the app in a fresh interpreter with -X importtime: total import
+   time, the slowest top-level packages, RSS after import, and which of the
+   lazily loaded libraries (PDF/DOCX parsing, gTTS, vosk) got pulled
+   in anyway.
+2. Starts gunicorn with and without preload (GUNICORN_PRELOAD, see
+   gunicorn.conf.py), times how long until /api/health answers, runs a few
+   interviews with resume uploads, then reads every worker's memory: RSS,
+   PSS (shared pages split between the processes sharing them) and private.
+
+Run from the backend directory:
+  python -m benchmarks.startup_report [--workers 4] [--candidates 24]
+  python -m benchmarks.startup_report --json startup.json --baseline previous.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.load_test import BACKEND_DIR, Recorder, run_candidate, start_server, worker_pids
+from benchmarks.resume_corpus import generate_corpus
+from utils.prefork import memory_usage
+
+LAZY_LIBRARIES = ('PyPDF2', 'docx', 'gtts', 'vosk')
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+from utils.prefork import memory_usage
+print(json.dumps({{
+    'import_seconds': elapsed,
+    'memory': memory_usage(),
+    'eager_libraries': [name for name in {LAZY_LIBRARIES!r} if name in sys.modules]
+}}))
+"""
+
+
+def probe_env(workdir):
+    """Same stand-ins as the load test: stub TTS, no caches on disk, throwaway databases"""
+    return dict(
+        os.environ,
+        TTS_BACKENDS='stub',
+        TTS_CACHE_DIR='',
+        TTS_BUNDLE_PATH=os.path.join(workdir, 'no-bundle.bin'),
+        RESUME_CACHE_PATH='',
+        TRANSCRIPT_DB_PATH=os.path.join(workdir, 'transcripts.db')
+    )
+
+
+def measure_imports(workdir, top=10):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_PROBE],
+        cwd=BACKEND_DIR, env=probe_env(workdir), capture_output=True, text=True, check=True
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # "import time: self [us] | cumulative | name", nested imports indented under their parent
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    report['slowest_packages_ms'] = {package: us / 1000 for package, us in slowest}
+    return report
+
+
+def measure_server(workers, candidates, preload, workdir, corpus):
+    started = time.perf_counter()
+    server, url = start_server(workers, 4, 0, workdir, extra_env={'GUNICORN_PRELOAD': '1' if preload else '0'})
+    ready_seconds = time.perf_counter() - started
+    try:
+        recorder = Recorder()
+        # Enough interviews (each with a resume upload) that every worker serves some
+        with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            list(pool.map(lambda i: run_candidate(url, i, 2, corpus, recorder, 0), range(candidates)))
+        pids = sorted(worker_pids(server.pid))
+        per_worker = {pid: memory_usage(pid) for pid in pids}
+        master = memory_usage(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    def mean(field):
+        values = [usage.get(field, 0) for usage in per_worker.values()]
+        return sum(values) / len(values) if values else 0
+
+    return {
+        'ready_seconds': ready_seconds,
+        'errors': sum(recorder.errors.values()),
+        'master': master,
+        'workers': per_worker,
+        'mean_worker_kb': {field: mean(field) for field in ('rss_kb', 'pss_kb', 'shared_kb', 'private_kb')},
+        # What the whole server costs: the master plus every worker, shared pages counted once
+        'total_pss_kb': master.get('pss_kb', 0) + sum(usage.get('pss_kb', 0) for usage in per_worker.values())
+    }
+
+
+def print_report(report):
+    imports = report['imports']
+    print(f"Import app: {imports['import_seconds'] * 1000:.0f} ms, "
+          f"RSS {imports['memory'].get('rss_kb', 0) / 1024:.1f} MB")
+    print(f"Lazy libraries loaded at import: {', '.join(imports['eager_libraries']) or 'none'}")
+    print(f"\n{'package':24} {'self ms':>8}")
+    for package, ms in imports['slowest_packages_ms'].items():
+        print(f"{package:24} {ms:8.1f}")
+
+    print(f"\n{'mode':10} {'ready s':>8} {'errors':>7} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11} {'total PSS MB':>13}")
+    for mode in ('preload', 'no_preload'):
+        server = report[mode]
+        kb = server['mean_worker_kb']
+        print(f"{mode:10} {server['ready_seconds']:8.2f} {server['errors']:7d} {kb['rss_kb'] / 1024:8.1f} "
+              f"{kb['pss_kb'] / 1024:8.1f} {kb['private_kb'] / 1024:11.1f} {server['total_pss_kb'] / 1024:13.1f}")
+    print("(per-worker means; total PSS is master + all workers)")
+
+
+def headline(report):
+    """The numbers worth comparing between releases"""
+    numbers = {'import_ms': report['imports']['import_seconds'] * 1000}
+    for mode in ('preload', 'no_preload'):
+        server = report[mode]
+        numbers[f'{mode}_ready_ms'] = server['ready_seconds'] * 1000
+        numbers[f'{mode}_worker_private_mb'] = server['mean_worker_kb']['private_kb'] / 1024
+        numbers[f'{mode}_total_pss_mb'] = server['total_pss_kb'] / 1024
+    return numbers
+
+
+def print_comparison(report, baseline):
+    current, previous = headline(report), headline(baseline)
+    print(f"\n{'vs baseline':32} {'before':>9} {'now':>9} {'change':>8}")
+    for name, value in current.items():
+        before = previous.get(name)
+        if before:
+            print(f"{name:32} {before:9.1f} {value:9.1f} {(value - before) / before * 100:+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import time, cold start and per-worker memory')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--candidates', type=int, default=24, help='Interviews to run before measuring memory')
+    parser.add_argument('--json', help='Also write the report to this file')
+    parser.add_argument('--baseline', help='Earlier --json report to compare against')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='interview-startup-')
+    corpus = generate_corpus(12, 0)
+    report = {
+        'python': sys.version.split()[0],
+        'workers': args.workers,
+        'imports': measure_imports(workdir),
+        'preload': measure_server(args.workers, args.candidates, True, os.path.join(workdir, 'preload'), corpus),
+        'no_preload': measure_server(args.workers, args.candidates, False, os.path.join(workdir, 'lazy'), corpus)
+    }
+    print_report(report)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(report, json.load(f))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['preload']['errors'] or report['no_preload']['errors'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
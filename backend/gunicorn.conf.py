@@ -0,0 +1,35 @@
+"""
+Gunicorn settings, read automatically when gunicorn is started from backend/.
+
+Preload mode (on by default): the master imports the app once - question
+bank, compiled follow-up and skill matchers, caches - runs app.preload() for
+the libraries and models that are otherwise loaded lazily, then freezes the
+garbage collector's view of those objects so collections in the workers
+don't write to (and un-share) their pages. Workers are forked from it and
+share all of that copy-on-write. Connections are closed before each fork
+(see utils/prefork.py) and reopened by each worker, and each worker starts
+its own content file watcher. Per-process resources that can't be shared
+(the Piper TTS pool) are started by app.warm() in every worker as it boots.
+
+  GUNICORN_PRELOAD  0 to have every worker import the app itself, e.g. so
+                    a HUP reloads changed code (default 1)
+"""
+import gc
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+
+def when_ready(server):
+    if preload_app:
+        from app import preload
+
+        preload()
+        gc.freeze()
+        server.log.info("Preloaded app shared with workers (%d objects frozen)", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    from app import warm
+
+    warm()
@@ -0,0 +1,205 @@
+"""
+In-process stand-in for a Redis server, for testing RedisSessionStore
+without one.
+
+Speaks RESP2 over a local TCP socket and implements the commands the store
+sends, with per-key expiry. EVAL runs the store's Lua scripts through
+Python versions of them, written line for line alike; set TEST_REDIS_URL
+to run the same tests against a real server, which runs the Lua itself.
+"""
+import socket
+import socketserver
+import threading
+import time
+
+from utils.session_store import APPEND_TURN_SCRIPT
+
+
+class StandInRedis:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}  # key -> monotonic deadline
+        self.lock = threading.RLock()
+        self.scripts = {APPEND_TURN_SCRIPT: self._append_turn_script}
+        self._connections = set()
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"redis://{host}:{port}/0"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.drop_connections()
+
+    def drop_connections(self):
+        """Close every client connection, as a server does with idle ones"""
+        for conn in list(self._connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server._connections.add(self.connection)
+                try:
+                    while True:
+                        command = self._read_command()
+                        if command is None:
+                            return
+                        self.wfile.write(server._encode(server.execute(command)))
+                except (OSError, ValueError):
+                    return
+                finally:
+                    server._connections.discard(self.connection)
+
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+        return Handler
+
+    def _encode(self, reply):
+        if isinstance(reply, Exception):
+            return b'-ERR %s\r\n' % str(reply).encode('utf-8')
+        if reply is None:
+            return b'$-1\r\n'
+        if isinstance(reply, int):
+            return b':%d\r\n' % reply
+        if isinstance(reply, str):
+            return b'+%s\r\n' % reply.encode('utf-8')
+        if isinstance(reply, bytes):
+            return b'$%d\r\n%s\r\n' % (len(reply), reply)
+        return b'*%d\r\n' % len(reply) + b''.join(self._encode(item) for item in reply)
+
+    def _live(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def execute(self, command):
+        name, args = command[0].decode('utf-8').upper(), command[1:]
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return ValueError(f"unknown command '{name}'")
+        with self.lock:
+            try:
+                return handler(*args)
+            except (TypeError, ValueError) as e:
+                return ValueError(str(e))
+
+    def cmd_ping(self):
+        return 'PONG'
+
+    def cmd_auth(self, password):
+        return 'OK'
+
+    def cmd_select(self, db):
+        return 'OK'
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                removed += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(self._live(key) is not None for key in keys)
+
+    def cmd_expire(self, key, seconds):
+        if self._live(key) is None:
+            return 0
+        self.expires[key] = time.monotonic() + int(seconds)
+        return 1
+
+    def cmd_ttl(self, key):
+        if self._live(key) is None:
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else max(0, round(deadline - time.monotonic()))
+
+    def cmd_hset(self, key, *pairs):
+        fields = self._live(key)
+        if fields is None:
+            fields = self.data[key] = {}
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in fields
+            fields[field] = value
+        return added
+
+    def cmd_hgetall(self, key):
+        fields = self._live(key) or {}
+        return [item for pair in fields.items() for item in pair]
+
+    def cmd_rpush(self, key, *values):
+        items = self._live(key)
+        if items is None:
+            items = self.data[key] = []
+        items.extend(values)
+        return len(items)
+
+    def cmd_sadd(self, key, *members):
+        items = self._live(key)
+        if items is None:
+            items = self.data[key] = set()
+        added = len(set(members) - items)
+        items.update(members)
+        return added
+
+    def cmd_smembers(self, key):
+        return sorted(self._live(key) or ())
+
+    def cmd_llen(self, key):
+        return len(self._live(key) or [])
+
+    def cmd_lrange(self, key, start, stop):
+        items = self._live(key) or []
+        start, stop = int(start), int(stop)
+        stop = len(items) if stop == -1 else stop + 1
+        return items[start:stop]
+
+    def cmd_eval(self, script, key_count, *rest):
+        function = self.scripts.get(script.decode('utf-8'))
+        if function is None:
+            return ValueError('script not known to the stand-in')
+        key_count = int(key_count)
+        return function(list(rest[:key_count]), list(rest[key_count:]))
+
+    def _call(self, name, *args):
+        return getattr(self, f"cmd_{name.lower()}")(*(a if isinstance(a, bytes) else str(a).encode() for a in args))
+
+    def _append_turn_script(self, keys, argv):
+        # Same steps as APPEND_TURN_SCRIPT
+        if self._call('EXPIRE', keys[0], argv[0]) == 0:
+            return -1
+        length = self._call('LLEN', keys[1])
+        if length + int(argv[2]) > int(argv[1]):
+            return -2
+        length = self._call('RPUSH', keys[1], argv[3])
+        self._call('EXPIRE', keys[1], argv[0])
+        if argv[4] == b'1':
+            self._call('HSET', keys[0], 'last_answer_index', length - 1)
+        if argv[5] != b'':
+            self._call('SADD', keys[2], argv[5])
+            self._call('EXPIRE', keys[2], argv[0])
+        return length
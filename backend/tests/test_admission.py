@@ -0,0 +1,155 @@
+import threading
+import time
+import types
+
+import pytest
+
+import utils.admission as admission
+from utils.admission import AdmissionController, AdmissionGate, AdmittedStream, RateLimiter, Rejected
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def make_controller(concurrency=1, queue=0, budget=1.0, session=(1, 10), ip=(1, 30)):
+    gates = {'resume': AdmissionGate('resume', concurrency, queue, budget)}
+    return AdmissionController(gates, {'resume': 3}, RateLimiter(*session), RateLimiter(*ip))
+
+
+def test_bucket_spends_burst_then_refills(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter.take('a') for _ in range(3)] == [0, 0, 0]
+    assert limiter.take('a') == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert limiter.take('a') == 0
+    # Refill stops at the burst size
+    clock[0] += 60
+    assert [limiter.take('a', 3), limiter.take('a')] == [0, pytest.approx(0.5)]
+
+
+def test_bucket_drops_least_recently_used_keys(clock):
+    limiter = RateLimiter(rate=1, burst=1, max_keys=2)
+    limiter.take('a')
+    limiter.take('b')
+    limiter.take('a')
+    limiter.take('c')
+    assert len(limiter) == 2 and limiter.take('b') == 0
+
+
+def test_refund_is_capped_at_burst(clock):
+    limiter = RateLimiter(rate=1, burst=2)
+    limiter.take('a', 2)
+    limiter.refund('a', 5)
+    assert limiter.take('a', 2) == 0 and limiter.take('a') > 0
+    limiter.refund('unknown')
+    assert len(limiter) == 1
+
+
+def test_shed_request_keeps_its_tokens(clock):
+    controller = make_controller(session=(0, 6))
+    with controller.admit('resume', 'session', '10.0.0.1'):
+        with pytest.raises(Rejected) as shed:
+            with controller.admit('resume', 'session', '10.0.0.1'):
+                pass
+    assert shed.value.reason == 'shed'
+    # 6 tokens pay for exactly the two requests that ran, the shed one cost nothing
+    with controller.admit('resume', 'session'):
+        pass
+    with pytest.raises(Rejected) as limited:
+        controller.check_rate('resume', 'session')
+    assert limited.value.reason == 'session_rate'
+
+
+def test_ip_rejection_refunds_the_session(clock):
+    controller = make_controller(session=(0, 3), ip=(0, 3))
+    with controller.admit('resume', 'first', '10.0.0.1'):
+        pass
+    with pytest.raises(Rejected) as limited:
+        controller.check_rate('resume', 'second', '10.0.0.1')
+    assert limited.value.reason == 'ip_rate'
+    controller.check_rate('resume', 'second', '10.0.0.2')
+    assert controller.stats()['rate_limited'] == {'session_rate': 0, 'ip_rate': 1}
+
+
+def test_gate_queues_up_to_its_limit():
+    gate = AdmissionGate('tts', concurrency=1, queue=1, budget=5.0)
+    gate.acquire()
+    admitted = threading.Event()
+
+    def waiter():
+        gate.acquire()
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while gate.stats()['waiting'] < 1:
+        time.sleep(0.001)
+    # The queue is full, so the next request is shed up front
+    with pytest.raises(Rejected):
+        gate.acquire()
+    gate.release(0.01)
+    assert admitted.wait(5)
+    thread.join()
+    assert {key: gate.stats()[key] for key in ('running', 'waiting', 'admitted', 'shed')} == {
+        'running': 1, 'waiting': 0, 'admitted': 2, 'shed': 1
+    }
+
+
+def test_gate_sheds_waiters_at_the_budget():
+    gate = AdmissionGate('stt', concurrency=1, queue=4, budget=0.05)
+    gate.acquire()
+    started = time.monotonic()
+    with pytest.raises(Rejected) as shed:
+        gate.acquire()
+    assert time.monotonic() - started >= 0.05
+    assert shed.value.retry_after >= 1 and gate.stats()['waiting'] == 0
+
+
+def test_gate_sheds_when_the_expected_wait_is_over_budget():
+    gate = AdmissionGate('batch', concurrency=1, queue=4, budget=1.0)
+    gate.acquire()
+    gate.release(2.0)
+    gate.acquire()
+    with pytest.raises(Rejected):
+        gate.acquire()
+    assert gate.stats()['waiting'] == 0
+
+
+def test_stream_releases_when_closed_before_reading():
+    gate = AdmissionGate('batch', concurrency=1, queue=0, budget=1.0)
+
+    def body():
+        # A finally block here would never run: the generator is closed before it starts
+        yield b'first'
+
+    gate.acquire()
+    stream = AdmittedStream(body(), gate)
+    stream.close()
+    stream.close()
+    assert gate.stats()['running'] == 0
+    gate.acquire()
+    assert gate.stats()['running'] == 1
+
+
+def test_stream_releases_when_exhausted():
+    gate = AdmissionGate('batch', concurrency=1, queue=0, budget=1.0)
+    gate.acquire()
+    stream = AdmittedStream([b'a', b'b'], gate)
+    assert list(stream) == [b'a', b'b']
+    stream.close()
+    assert gate.stats()['running'] == 0
+
+
+def test_admit_stream_holds_the_slot(clock):
+    controller = make_controller()
+    stream = controller.admit_stream('resume', iter([b'x']), 'session')
+    with pytest.raises(Rejected):
+        controller.admit_stream('resume', iter([]), 'other')
+    assert next(stream) == b'x'
+    with pytest.raises(StopIteration):
+        next(stream)
+    assert controller.gates['resume'].stats()['running'] == 0
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from utils.answer_analysis import AnswerAnalyzer
+
+ANSWERS = [
+    "For example, I led a team of 5 engineers and cut latency by 40%.",
+    "I like working on examples with clear outcomes.",
+    "Teamwork matters; our cross-functional group shipped on time.",
+    "Nonspecific answer without numbers",
+    "We measured x² growth in the second quarter",
+    "Steam-powered...   well,\tno\n\nreally",
+    "",
+    "   ",
+    "Um, basically I, like, you know, fixed the build. Specifically the CI step.",
+    "Revenue grew from $1.2M to $3,000,000 in Q3 — a 150% jump",
+    "Situation: legacy API. Task: migrate. Action: wrote tests. Result: zero downtime.",
+]
+
+
+def legacy_analysis(user_answers):
+    """The checks generate_feedback used before the batched analyzer"""
+    answer_lengths = [len(answer.split()) for answer in user_answers]
+    return {
+        'total_answers': len(user_answers),
+        'avg_length': sum(answer_lengths) / len(answer_lengths) if answer_lengths else 0,
+        'has_examples': any('example' in answer.lower() or 'specific' in answer.lower() for answer in user_answers),
+        'has_metrics': any(any(char.isdigit() for char in answer) for answer in user_answers),
+        'has_team_mention': any('team' in answer.lower() for answer in user_answers)
+    }
+
+
+def sample_interviews():
+    rng = random.Random(0)
+    interviews = [[answer] for answer in ANSWERS]
+    for _ in range(50):
+        interviews.append(rng.sample(ANSWERS, rng.randint(1, 4)))
+    return interviews
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return AnswerAnalyzer()
+
+
+@pytest.mark.parametrize('answers', sample_interviews())
+def test_matches_legacy_checks(analyzer, answers):
+    analysis = analyzer.analyze(answers, 'Software Engineer')
+    legacy = legacy_analysis(answers)
+    assert {key: analysis[key] for key in legacy} == legacy
+
+
+def test_bulk_matches_single_transcripts(analyzer):
+    interviews = sample_interviews()
+    roles = ['Software Engineer', 'Data Scientist', 'Unknown Role']
+    transcripts = [(answers, roles[i % len(roles)]) for i, answers in enumerate(interviews)]
+    assert analyzer.analyze_transcripts(transcripts) == [
+        analyzer.analyze(answers, role) for answers, role in transcripts
+    ]
+
+
+def test_like_as_a_verb_is_not_filler(analyzer):
+    assert analyzer.analyze(["I like to write tests"], 'Software Engineer')['filler_rate'] == 0.0
+    assert analyzer.analyze(["Um, basically it works"], 'Software Engineer')['filler_rate'] > 0.0
@@ -0,0 +1,116 @@
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_question_bank import make_bank
+from utils.interview_content import (
+    DEFAULT_SOURCE_PATH, ContentError, ContentStore, build_content, load_build, load_source, main
+)
+from utils.question_bank import QuestionBank
+
+
+def write_source(path, version, mtime):
+    with open(DEFAULT_SOURCE_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    data['version'] = version
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    # Explicit times, so which file was written last never depends on timestamp resolution
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def content(tmp_path):
+    bank = tmp_path / 'bank.jsonl'
+    with open(bank, 'w', encoding='utf-8') as f:
+        for text, roles in make_bank(200):
+            f.write(json.dumps({'question': text, 'roles': list(roles)}) + '\n')
+    source, build = tmp_path / 'interview.json', tmp_path / 'interview.bin'
+    write_source(source, '1', 1000)
+    return str(source), str(build), str(bank)
+
+
+def built_at(source, build, bank, mtime):
+    snapshot = build_content(source, build, bank)
+    os.utime(build, (mtime, mtime))
+    return snapshot
+
+
+def test_build_loads_the_same_content(content):
+    source, build, bank = content
+    built_at(source, build, bank, 2000)
+    parsed, mapped = load_source(source, bank), load_build(build)
+    assert mapped.tag == parsed.tag
+    assert dict(mapped.role_questions) == dict(parsed.role_questions)
+    assert list(mapped.question_bank.texts) == list(parsed.question_bank.texts)
+    for name in QuestionBank.ARRAYS:
+        array = getattr(mapped.question_bank, name)
+        assert np.array_equal(array, getattr(parsed.question_bank, name))
+        # Views over the read-only mapping, shared with every other worker
+        assert not array.flags.writeable
+    role = parsed.question_bank.role_names[0]
+    assert mapped.question_bank.pick(role, rng=random.Random(1)) == parsed.question_bank.pick(role, rng=random.Random(1))
+
+
+def test_editing_the_source_after_a_build_reloads_it(content):
+    source, build, bank = content
+    built_at(source, build, bank, 2000)
+    store = ContentStore([source, build], bank)
+    first = store.current
+    assert (store.path, first.version) == (build, '1')
+
+    write_source(source, '2', 3000)
+    second = store.reload()
+    assert (store.path, second.version) == (source, '2')
+    assert store.current is second and store.reload() is None
+
+    # Rebuilding moves workers back onto the build
+    built_at(source, build, bank, 4000)
+    assert store.reload().tag == second.tag and store.path == build
+
+
+def test_stale_build_gives_way_to_its_source(content):
+    source, build, bank = content
+    built_at(source, build, bank, 2000)
+    write_source(source, '2', 3000)
+    os.utime(build, (4000, 4000))
+    store = ContentStore([source, build], bank)
+    assert (store.path, store.current.version) == (source, '2')
+    with pytest.raises(ContentError):
+        load_build(build, strict=True)
+    assert main(['check', build]) == 1
+    # Given on its own, the stale build still loads
+    assert ContentStore(build).current.version == '1'
+
+
+def test_sessions_stay_on_their_snapshot(content):
+    source, _, bank = content
+    store = ContentStore(source, bank, keep=2)
+    tags = [store.current.tag]
+    for version in range(2, 4):
+        write_source(source, str(version), 1000 + version)
+        tags.append(store.reload().tag)
+    assert store.get(tags[1]).version == '2'
+    assert store.get(tags[2]) is store.current
+    # Dropped and unknown tags fall back to the current snapshot
+    assert store.get(tags[0]) is store.current
+    assert store.get('nope@00000000') is store.current
+    assert store.get(None) is store.current
+
+
+def test_broken_source_keeps_the_current_snapshot(content):
+    source, _, bank = content
+    store = ContentStore(source, bank)
+    current = store.current
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write('{"format": 1,')
+    os.utime(source, (5000, 5000))
+    with pytest.raises(ContentError):
+        store.reload()
+    assert store.current is current
+    assert store.failures == 1 and store.last_error
+    # Reported once, not on every poll
+    assert store.reload() is None
@@ -0,0 +1,50 @@
+import random
+
+from benchmarks.bench_question_bank import make_bank
+from utils.question_bank import QuestionBank
+from utils.transcripts import Turn
+
+
+def make_question_bank():
+    return QuestionBank(make_bank(500))
+
+
+def test_unknown_roles_share_one_bias():
+    bank = make_question_bank()
+    generic = bank.role_bias('Role nobody has')
+    for i in range(50):
+        assert bank.role_bias(f"Made-up role {i}") is generic
+    # Unknown roles only get the questions meant for every role
+    counts = [bank.role_ptr[q + 1] - bank.role_ptr[q] for q in range(len(bank))]
+    assert [bias == 0.0 for bias in generic] == [count == 0 for count in counts]
+    assert set(bank._role_bias) <= set(bank.role_names) | {QuestionBank.UNKNOWN_ROLE}
+
+
+def test_known_roles_get_their_questions():
+    bank = make_question_bank()
+    role = bank.role_names[0]
+    question = bank.pick(role, rng=random.Random(1))
+    index = bank.index_of(question)
+    assert index is not None and bank.role_bias(role)[index] >= 0
+
+
+def test_exclude_matches_asked_from_the_conversation():
+    bank = make_question_bank()
+    role = bank.role_names[0]
+    rng = random.Random(3)
+    conversation, asked = [], set()
+    for _ in range(30):
+        question = bank.pick(role, {'skills': ['Python', 'SQL']}, conversation, rng=rng, exclude=asked)
+        index = bank.index_of(question)
+        assert index not in asked
+        asked.add(index)
+        conversation += [Turn.make('question', question), Turn.make('answer', 'I used Python and SQL.')]
+    assert set(bank.asked(conversation)) == asked
+    assert bank.index_of('Not a bank question?') is None
+
+
+def test_pick_runs_out_of_questions():
+    bank = QuestionBank([('Only one question here?', ('Tester',)), ('Generic question for all?', ())])
+    asked = {bank.index_of('Only one question here?'), bank.index_of('Generic question for all?')}
+    assert bank.pick('Tester', exclude=asked) is None
+    assert bank.pick('Someone else', exclude=asked) is None
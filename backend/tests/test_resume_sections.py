@@ -0,0 +1,83 @@
+import random
+import time
+
+import pytest
+
+from benchmarks.bench_resume_extraction import legacy_extract_key_info, pathological_inputs, realistic
+from benchmarks.resume_corpus import make_resume_text
+from utils.resume_parser import extract_key_info
+from utils.resume_sections import PREAMBLE, normalize_text, segment_sections
+
+HEADINGS = {'SUMMARY': 'summary', 'EXPERIENCE': 'experience', 'EDUCATION': 'education',
+            'PROJECTS': 'projects', 'SKILLS': 'skills'}
+
+
+def sample_resumes():
+    rng = random.Random(0)
+    return [make_resume_text(rng) for _ in range(20)]
+
+
+def expected_sections(text):
+    """The lines the corpus template wrote under each heading"""
+    sections = {PREAMBLE: []}
+    current = PREAMBLE
+    for line in text.split('\n'):
+        if line in HEADINGS:
+            current = HEADINGS[line]
+            sections[current] = []
+        else:
+            sections[current].append(line)
+    return {name: '\n'.join(lines).strip() for name, lines in sections.items()}
+
+
+@pytest.mark.parametrize('text', sample_resumes(), ids=range(20))
+def test_segments_sample_resumes(text):
+    assert segment_sections(normalize_text(text)) == expected_sections(text)
+
+
+@pytest.mark.parametrize('text', sample_resumes() + [realistic(2000)], ids=[*range(20), 'realistic'])
+def test_skills_and_experience_match_legacy(text):
+    legacy = legacy_extract_key_info(text)
+    info = extract_key_info(text)
+    assert set(info['skills']) == set(legacy['skills'])
+    if legacy['experience'] is None:
+        # No years figure either way; job titles are the fallback
+        assert isinstance(info['experience'], list)
+    else:
+        assert info['experience'] == legacy['experience']
+
+
+@pytest.mark.parametrize('text', sample_resumes(), ids=range(20))
+def test_fields_come_from_their_sections(text):
+    sections = expected_sections(text)
+    info = extract_key_info(text)
+    assert info['summary'] == sections['summary']
+    assert info['education'] == [sections['education']]
+    assert info['projects'] == [line[2:] for line in sections['projects'].split('\n')]
+
+
+def test_inline_and_decorated_headings():
+    text = normalize_text(
+        "Jane Doe\n\n# Professional  Summary\nBuilds things.\n"
+        "Skills: Python, SQL\n• Work Experience\nEngineer at Acme\nProjects:\n- Rate limiter"
+    )
+    assert segment_sections(text) == {
+        PREAMBLE: 'Jane Doe',
+        'summary': 'Builds things.',
+        'skills': 'Python, SQL',
+        'experience': 'Engineer at Acme',
+        'projects': '- Rate limiter'
+    }
+
+
+def test_heading_words_inside_sentences_are_not_headings():
+    text = normalize_text("Summary of results was good\nEducation matters to me")
+    assert segment_sections(text) == {PREAMBLE: text}
+
+
+@pytest.mark.parametrize('name', list(pathological_inputs(1)))
+def test_pathological_inputs_stay_linear(name):
+    text = pathological_inputs(50000)[name]
+    start = time.perf_counter()
+    extract_key_info(text)
+    assert time.perf_counter() - start < 1.0
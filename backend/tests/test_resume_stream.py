@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from benchmarks.bench_resume_extraction import realistic
+from benchmarks.resume_corpus import make_resume_text
+from utils.resume_parser import ExtractionBudget, extract_key_info, extract_key_info_stream
+from utils.resume_sections import iter_normalized_lines, normalize_text
+
+SKILLS = ("Python, Java, Go, Rust, SQL, Docker, Kubernetes, AWS, React, Git, Redis, "
+          "Javascript, Machine Learning, Node.js, Leadership, Communication")
+
+MULTI_SECTION = [
+    # A years figure in the summary comes before the Experience section's own
+    "Jane Doe\nSummary\nEngineer with 12 years in fintech.\nExperience\nAcme, 4 years as engineer\n",
+    # Education keywords outside the Education section
+    "Jane Doe\nCertificate of merit from my school newsletter\nProjects\n- Built the school site rebuild project\n"
+    "Education\nBS Computer Science\nState University of Somewhere\n",
+    # Repeated headings and inline heading text
+    "Jane Doe\nProjects: 1. Payment service rewrite in Go\nExperience\nengineer\nProjects\n"
+    "2. Search indexing for the catalog\nEducation: MBA\nExperience: 3+ yrs lead\n",
+    # Windows line endings, blank lines and a skill phrase split across lines
+    "Jane Doe\r\n\r\n\r\nSkills\r\nmachine\r\n  learning, C++\r\nSummary\r\n\r\nShort\r\n",
+    "No headings at all, 7 years as a manager\nUniversity of Tech\nemail: jane@example.com\n",
+]
+
+
+def sample_resumes():
+    rng = random.Random(0)
+    return MULTI_SECTION + [make_resume_text(rng) for _ in range(20)] + [realistic(3000)]
+
+
+def random_chunks(text, rng):
+    chunks = []
+    while text:
+        size = rng.randint(1, 64)
+        chunks.append(text[:size])
+        text = text[size:]
+    return chunks
+
+
+@pytest.mark.parametrize('text', sample_resumes())
+def test_stream_matches_full_parse(text):
+    rng = random.Random(len(text))
+    for _ in range(5):
+        assert extract_key_info_stream(random_chunks(text, rng), ExtractionBudget()) == extract_key_info(text)
+
+
+@pytest.mark.parametrize('text', sample_resumes())
+def test_lines_match_normalize_text(text):
+    rng = random.Random(len(text))
+    assert list(iter_normalized_lines(random_chunks(text, rng))) == normalize_text(text).split('\n')
+
+
+def test_summary_years_do_not_settle_experience():
+    info = extract_key_info_stream(iter([MULTI_SECTION[0]]), ExtractionBudget())
+    assert info['experience'] == '4 Years'
+
+
+def test_stops_once_every_field_is_settled():
+    head = (
+        "Jane Doe\nSummary\n" + "Engineer who builds reliable data systems and mentors teams. " * 6 +
+        "\nSkills: " + SKILLS + "\nExperience\n7 years building backends\n"
+        "Education\nBS Computer Science\nState University of Somewhere\nMS Data Science at Tech Institute\n"
+        "Graduated with honors in 2015\nPhD candidate, University of Tech\nThesis on distributed storage\n"
+        "Projects\n" + "".join(f"- Project number {i} that shipped something large\n" for i in range(6)) +
+        "Other\n" + "filler text line here\n" * 100
+    )
+    text = head + "Later page mentioning Haskell, 20 years and Masters University\n" * 5000
+    pulled = []
+
+    def chunks():
+        for start in range(0, len(text), 4096):
+            pulled.append(start)
+            yield text[start:start + 4096]
+
+    budget = ExtractionBudget()
+    info = extract_key_info_stream(chunks(), budget)
+    assert budget.stop_reason == 'complete'
+    assert len(pulled) < 5
+    assert info == extract_key_info(text)
@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+
+import pytest
+
+from tests.resp_stand_in import StandInRedis
+from utils.session_store import (
+    ConversationFull, MemorySessionStore, RedisError, RedisSessionStore, SQLiteSessionStore
+)
+
+BACKENDS = ('memory', 'sqlite', 'redis')
+
+
+@pytest.fixture
+def redis_url():
+    # A real server when TEST_REDIS_URL is set, else the in-process stand-in
+    url = os.environ.get('TEST_REDIS_URL')
+    if url:
+        yield url
+        return
+    server = StandInRedis()
+    yield server.url
+    server.close()
+
+
+@pytest.fixture
+def make_store(tmp_path, redis_url):
+    def make(backend, **limits):
+        if backend == 'memory':
+            return MemorySessionStore(**limits)
+        if backend == 'sqlite':
+            return SQLiteSessionStore(str(tmp_path / 'sessions.db'), **limits)
+        return RedisSessionStore(redis_url, prefix=f"test:{time.monotonic_ns()}:", **limits)
+    return make
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_create_and_get(make_store, backend):
+    store = make_store(backend)
+    store.create('s1', 'Data Scientist', '1@abcd')
+    session = store.get('s1')
+    assert session['role'] == 'Data Scientist'
+    assert session['conversation'] == []
+    assert session['resume_data'] is None
+    assert session['last_answer_index'] is None
+    assert session['content_version'] == '1@abcd'
+    assert store.get('missing') is None
+    assert store.exists('s1') and not store.exists('missing')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_append_tracks_last_answer(make_store, backend):
+    store = make_store(backend)
+    store.create('s1', 'UX Designer')
+    assert store.append_turn('s1', 'question', 'Walk me through your design process.')
+    assert store.append_turn('s1', 'answer', 'I start with research.')
+    assert store.append_turn('s1', 'question', 'How do you conduct user research?')
+    session = store.get('s1')
+    assert [(t.type, t.content) for t in session['conversation']] == [
+        ('question', 'Walk me through your design process.'),
+        ('answer', 'I start with research.'),
+        ('question', 'How do you conduct user research?')
+    ]
+    assert session['last_answer_index'] == 1
+    assert not store.append_turn('missing', 'answer', 'hello')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_asked_bank_indexes(make_store, backend):
+    store = make_store(backend)
+    store.create('s1', 'Data Analyst')
+    assert store.get('s1')['asked'] == set()
+    store.append_turn('s1', 'question', 'Q1', 7)
+    store.append_turn('s1', 'answer', 'A1')
+    store.append_turn('s1', 'question', 'Not from the bank')
+    store.append_turn('s1', 'answer', 'A2')
+    store.append_turn('s1', 'question', 'Q3', 42)
+    assert store.get('s1')['asked'] == {7, 42}
+    store.create('s1', 'Data Analyst')
+    assert store.get('s1')['asked'] == set()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_get_recent_returns_the_tail(make_store, backend):
+    store = make_store(backend)
+    store.create('s1', 'Data Analyst', '1@abcd')
+    for i in range(5):
+        store.append_turn('s1', 'question', f"Q{i}", i)
+        store.append_turn('s1', 'answer', f"A{i}")
+    store.append_turn('s1', 'question', 'Q5')
+    recent = store.get_recent('s1', 4)
+    assert [t.content for t in recent['conversation']] == ['A3', 'Q4', 'A4', 'Q5']
+    assert recent['conversation'][recent['last_answer_index']].content == 'A4'
+    assert recent['asked'] == {0, 1, 2, 3, 4}
+    assert (recent['role'], recent['content_version']) == ('Data Analyst', '1@abcd')
+    # The last answer is older than the tail
+    assert store.get_recent('s1', 1)['last_answer_index'] is None
+    assert [t.content for t in store.get_recent('s1', 50)['conversation']] == \
+        [t.content for t in store.get('s1')['conversation']]
+    assert store.get_recent('missing', 4) is None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_resume_data_and_delete(make_store, backend):
+    store = make_store(backend)
+    store.create('s1', 'Software Engineer')
+    assert store.set_resume_data('s1', {'skills': ['Python'], 'raw_text': 'x'})
+    assert store.get('s1')['resume_data']['skills'] == ['Python']
+    store.delete('s1')
+    assert store.get('s1') is None
+    assert not store.set_resume_data('s1', {'skills': []})
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_turn_cap_and_answer_truncation(make_store, backend):
+    store = make_store(backend, max_turns=3, max_answer_chars=10)
+    store.create('s1', 'Software Engineer')
+    store.append_turn('s1', 'question', 'Q1')
+    store.append_turn('s1', 'answer', 'a' * 50)
+    assert store.get('s1')['conversation'][1].content == 'a' * 10
+    store.append_turn('s1', 'question', 'Q2')
+    # An answer needs room for the question after it
+    with pytest.raises(ConversationFull):
+        store.append_turn('s1', 'answer', 'too late')
+    assert len(store.get('s1')['conversation']) == 3
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_idle_sessions_expire(make_store, backend):
+    store = make_store(backend, ttl=1)
+    store.create('s1', 'Software Engineer')
+    store.append_turn('s1', 'question', 'Q1')
+    time.sleep(1.2)
+    assert store.get('s1') is None
+    assert not store.append_turn('s1', 'answer', 'hello')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_concurrent_appends_respect_the_cap(make_store, backend):
+    store = make_store(backend, max_turns=20)
+    store.create('s1', 'Software Engineer')
+    accepted, full = [], []
+
+    def append(i):
+        try:
+            if store.append_turn('s1', 'question', f"Q{i}"):
+                accepted.append(i)
+        except ConversationFull:
+            full.append(i)
+
+    threads = [threading.Thread(target=append, args=(i,)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(accepted) == 20 and len(full) == 20
+    assert len(store.get('s1')['conversation']) == 20
+
+
+def test_redis_error_reply_keeps_connection_in_step(redis_url):
+    store = RedisSessionStore(redis_url, prefix='test:errors:')
+    with pytest.raises(RedisError):
+        store._run([('NOSUCHCOMMAND',), ('PING',)])
+    # The PING reply was drained with the error, so this reads its own reply
+    assert store._run([('PING',)]) == ['PONG']
+
+
+def test_redis_reconnects_after_idle_drop():
+    server = StandInRedis()
+    try:
+        store = RedisSessionStore(server.url, prefix='test:drop:')
+        store.create('s1', 'Software Engineer')
+        server.drop_connections()
+        time.sleep(0.05)
+        assert store.append_turn('s1', 'question', 'Q1')
+        assert len(store.get('s1')['conversation']) == 1
+    finally:
+        server.close()
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from benchmarks.bench_skill_matcher import legacy_extract_skills, make_resume
+from benchmarks.resume_corpus import make_resume_text
+from utils.skill_matcher import PROFESSIONAL_SKILLS, TECHNICAL_SKILLS, SkillMatcher, default_taxonomy
+
+BUILTIN = TECHNICAL_SKILLS + PROFESSIONAL_SKILLS
+
+# The legacy \b boundary can never match after '+' or '#'; matching these is the fix
+FIXED_BY_MATCHER = {'C++', 'C#'}
+
+
+def sample_resumes():
+    rng = random.Random(0)
+    return [make_resume_text(rng) for _ in range(20)] + [make_resume(2, BUILTIN)]
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return SkillMatcher(default_taxonomy())
+
+
+@pytest.mark.parametrize('text', sample_resumes())
+def test_matches_legacy_loop(matcher, text):
+    # One skill per call, since the legacy loop keeps 15 of an unordered set
+    legacy = {name for skill in BUILTIN for name in legacy_extract_skills(text, [skill])}
+    assert set(matcher.skills(text)) - FIXED_BY_MATCHER == legacy
+
+
+def test_matches_symbols_and_whitespace(matcher):
+    text = "Stack: C++, C#, node.js and machine\n  learning; Javascript"
+    assert matcher.skills(text) == ['C++', 'C#', 'Node.Js', 'Machine Learning', 'Javascript']
+
+
+def test_whole_words_only(matcher):
+    assert matcher.skills("Gopher pythonic javascripts sqlite") == []
+
+
+def test_limit_keeps_first_appearance(matcher):
+    text = "Docker first, then Python, then SQL and Docker again"
+    assert matcher.skills(text) == ['Docker', 'Python', 'Sql']
+    assert matcher.skills(text, limit=2) == ['Docker', 'Python']
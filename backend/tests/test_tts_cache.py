@@ -0,0 +1,49 @@
+import os
+import time
+
+from utils.tts_cache import TTSCache, make_cache_key
+
+
+def disk_files(directory):
+    return [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+
+
+def test_memory_tier_is_bounded():
+    cache = TTSCache(max_entries=2, max_bytes=1000)
+    for i in range(3):
+        cache.put(make_cache_key(f"text {i}"), b'x' * 10)
+    assert cache.get(make_cache_key('text 0')) is None
+    assert cache.get(make_cache_key('text 2')) == b'x' * 10
+    assert cache.stats()['evictions'] == 1
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    TTSCache(disk_dir=str(tmp_path)).put('a' * 64, b'audio')
+    cache = TTSCache(disk_dir=str(tmp_path))
+    assert cache.get('a' * 64) == b'audio'
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = TTSCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=10_000)
+    keys = [make_cache_key(f"question {i}") for i in range(40)]
+    cache.put(keys[0], b'x' * 1000)
+    old = time.time() - 100
+    os.utime(cache._disk_path(keys[0]), (old, old))
+    for key in keys[1:]:
+        cache.put(key, b'x' * 1000)
+        # Reading the first entry back keeps it recently used
+        assert cache._read_disk(keys[0]) is not None
+    cache.trim_disk()
+    total = sum(os.path.getsize(path) for path in disk_files(tmp_path))
+    assert total <= 10_000
+    assert cache.stats()['disk_bytes'] == total
+    assert cache.stats()['disk_evictions'] >= 30
+    assert cache._read_disk(keys[0]) == b'x' * 1000
+    assert cache._read_disk(keys[1]) is None
+
+
+def test_key_covers_language_speed_and_whitespace():
+    assert make_cache_key('Hello  world') == make_cache_key(' Hello world ')
+    assert make_cache_key('Hello', 'en') != make_cache_key('Hello', 'fr')
+    assert make_cache_key('Hello', slow=True) != make_cache_key('Hello')
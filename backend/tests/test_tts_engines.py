@@ -0,0 +1,80 @@
+import pytest
+
+import utils.voice_processor as voice_processor
+from utils.tts_cache import TTSCache, make_cache_key
+from utils.tts_engines import FallbackSynthesizer, StubEngine, TTSEngine, TTSEngineError
+from utils.tts_prerender import build_bundle, load_audio_bundle
+
+
+class FailingEngine(TTSEngine):
+    name = 'failing'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.down = True
+        self.warmed = 0
+
+    def warm(self):
+        self.warmed += 1
+
+    def synthesize(self, text, lang='en', slow=False):
+        if self.down:
+            raise TTSEngineError('offline')
+        return b'primary:' + text.encode('utf-8')
+
+
+class BrokenWarmEngine(StubEngine):
+    name = 'broken'
+
+    def warm(self):
+        raise OSError('no model')
+
+
+@pytest.fixture
+def speech(monkeypatch):
+    primary = FailingEngine()
+    synthesizer = FallbackSynthesizer([primary, StubEngine()], cooldown=0)
+    monkeypatch.setattr(voice_processor, 'tts_synthesizer', synthesizer)
+    monkeypatch.setattr(voice_processor, 'tts_cache', TTSCache())
+    monkeypatch.setattr(voice_processor, 'audio_bundle', None)
+    return primary
+
+
+def test_fallback_audio_is_keyed_by_its_engine(speech):
+    audio_id = voice_processor.prepare_speech('Tell me about yourself.')
+    assert audio_id == make_cache_key('Tell me about yourself.', codec='mp3', engine='stub')
+    # Still served by ID, e.g. from /api/tts/<id>
+    assert voice_processor.get_audio(audio_id)[:4] == b'RIFF'
+
+    # Once the first engine is back its audio is used, not the cached fallback
+    speech.down = False
+    assert voice_processor.synthesize_speech('Tell me about yourself.') == b'primary:Tell me about yourself.'
+    assert voice_processor.prepare_speech('Tell me about yourself.') == voice_processor.speech_key(
+        'Tell me about yourself.'
+    )
+
+
+def test_codec_is_part_of_the_key():
+    assert make_cache_key('Hello', codec='mp3') != make_cache_key('Hello', codec='ogg')
+    assert make_cache_key('Hello', engine='gtts') != make_cache_key('Hello', engine='piper')
+
+
+def test_bundle_is_rerendered_for_a_new_codec(tmp_path):
+    path = str(tmp_path / 'questions.bin')
+    texts = ['Question one?', 'Question two?']
+    render = lambda text, lang, slow: text.encode('utf-8')
+    first = build_bundle(texts, path, render, workers=1, codec='mp3', engine='stub')
+    again = build_bundle(texts, path, render, workers=1, codec='mp3', engine='stub')
+    changed = build_bundle(texts, path, render, workers=1, codec='ogg', engine='stub')
+    assert (first['rendered'], again['reused'], changed['reused'], changed['rendered']) == (2, 2, 0, 2)
+    bundle = load_audio_bundle(path)
+    assert bundle.get(make_cache_key('Question one?', codec='ogg', engine='stub')) == b'Question one?'
+    assert bundle.get(make_cache_key('Question one?', codec='mp3', engine='stub')) is None
+    bundle.close()
+
+
+def test_warm_starts_every_engine():
+    primary = FailingEngine()
+    synthesizer = FallbackSynthesizer([BrokenWarmEngine(), primary])
+    synthesizer.warm()
+    assert primary.warmed == 1
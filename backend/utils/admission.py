@@ -0,0 +1,316 @@
+"""
+Admission control for the expensive endpoints (speech synthesis, speech
+recognition, resume parsing, bulk resume imports).
+
+A request of an endpoint class is admitted in three steps:
+  1. token buckets - one per session and one per client IP, shared by all
+     classes; each class costs a number of tokens
+  2. a concurrency gate per class - at most `concurrency` requests of the
+     class run at once and at most `queue` more wait for a slot
+  3. load shedding - a request is turned away up front when the expected
+     wait (requests ahead / concurrency x average service time) exceeds the
+     class's latency budget, and any waiter still queued at the budget gives up
+Rejections raise Rejected, which the app answers with 429 and Retry-After.
+Tokens spent by a request that is then turned away (by the IP bucket or by
+load shedding) are refunded, so a shed request doesn't use up quota.
+Streamed responses (bulk imports) are admitted before the response starts
+and hold their slot until the stream ends or is closed.
+
+Limits are per worker process. Settings:
+  SESSION_RATE / SESSION_BURST   tokens per second / bucket size per session (default 0.5 / 10)
+  IP_RATE / IP_BURST             the same per client IP (default 2 / 30)
+  ADMISSION_<CLASS>_CONCURRENCY, ADMISSION_<CLASS>_QUEUE, ADMISSION_<CLASS>_BUDGET_MS
+                                 gate settings, CLASS being TTS, STT, RESUME or BATCH
+  TTS_MAX_CHARS                  longest text accepted for synthesis (default 1000)
+  AUDIO_MAX_BYTES                largest voice answer upload (default 20 MB)
+  RESUME_UPLOAD_MAX_BYTES        largest single resume upload (default 10 MB; RESUME_MAX_BYTES is
+                                 the extracted-text budget, see utils/resume_parser.py)
+  MAX_REQUEST_BYTES              hard limit on any request body (default 64 MB)
+  PROXY_HOPS                     reverse proxies in front of the app; client IPs are then
+                                 taken from X-Forwarded-For (default 0)
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.metrics import observe_stage, registry
+
+# class -> (token cost, concurrency, queue, latency budget in ms)
+ENDPOINT_CLASSES = {
+    'tts': (1, 4, 16, 2000),
+    'stt': (2, 2, 4, 3000),
+    'resume': (3, 2, 8, 3000),
+    # A bulk import keeps the whole parser process pool busy, so one at a time
+    'batch': (10, 1, 2, 5000)
+}
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name, default):
+    return float(os.environ.get(name, default))
+
+
+MAX_TTS_CHARS = _env_int('TTS_MAX_CHARS', 1000)
+MAX_AUDIO_BYTES = _env_int('AUDIO_MAX_BYTES', 20 * 1024 * 1024)
+MAX_RESUME_BYTES = _env_int('RESUME_UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+MAX_REQUEST_BYTES = _env_int('MAX_REQUEST_BYTES', 64 * 1024 * 1024)
+
+
+class Rejected(Exception):
+    """A request turned away by rate limiting or load shedding"""
+
+    def __init__(self, endpoint_class, reason, retry_after):
+        messages = {
+            'session_rate': "Too many requests for this session",
+            'ip_rate': "Too many requests from this address",
+            'shed': f"{endpoint_class} is at capacity"
+        }
+        super().__init__(f"{messages[reason]}, please retry shortly")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class RateLimiter:
+    """Token buckets keyed by session or IP; the least recently used keys are dropped past max_keys"""
+
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def take(self, key, cost=1):
+        """Spend cost tokens; returns 0 if allowed, else seconds until enough tokens refill"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0
+            return (cost - bucket[0]) / self.rate if self.rate > 0 else 60
+
+    def refund(self, key, cost=1):
+        """Give back tokens spent by a request that was turned away later"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + cost)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded wait queue and a latency budget for one endpoint class"""
+
+    def __init__(self, name, concurrency, queue, budget):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.budget = budget
+        self._cond = threading.Condition()
+        self.running = 0
+        self.waiting = 0
+        self.service_time = 0.0  # moving average of seconds per admitted request
+        self.admitted = 0
+        self.shed = 0
+
+    def _retry_after(self):
+        # Caller holds the lock: time for the current backlog to drain
+        return (self.running + self.waiting) / self.concurrency * self.service_time
+
+    def acquire(self):
+        started = time.monotonic()
+        with self._cond:
+            if self.running >= self.concurrency:
+                expected = (self.waiting + 1) / self.concurrency * self.service_time
+                if self.waiting >= self.queue or expected > self.budget:
+                    self.shed += 1
+                    raise Rejected(self.name, 'shed', self._retry_after())
+                self.waiting += 1
+                try:
+                    deadline = started + self.budget
+                    while self.running >= self.concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed += 1
+                            raise Rejected(self.name, 'shed', self._retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.running += 1
+            self.admitted += 1
+        observe_stage(f"admission_{self.name}_wait", time.monotonic() - started)
+
+    def release(self, service_seconds):
+        with self._cond:
+            self.running -= 1
+            if self.service_time:
+                self.service_time += 0.2 * (service_seconds - self.service_time)
+            else:
+                self.service_time = service_seconds
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'concurrency': self.concurrency,
+                'queue': self.queue,
+                'budget_ms': round(self.budget * 1000),
+                'running': self.running,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'service_ms': round(self.service_time * 1000, 1)
+            }
+
+
+class AdmittedStream:
+    """
+    Response body holding an admission slot. The WSGI server calls close()
+    even when the client goes away before the body is read, which a
+    generator's finally block would miss if it never started.
+    """
+
+    def __init__(self, chunks, gate):
+        self._chunks = iter(chunks)
+        self._gate = gate
+        self._started = time.monotonic()
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        try:
+            close = getattr(self._chunks, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._gate.release(time.monotonic() - self._started)
+
+
+class AdmissionController:
+    def __init__(self, gates, costs, session_limiter, ip_limiter):
+        self.gates = gates
+        self.costs = costs
+        self.session_limiter = session_limiter
+        self.ip_limiter = ip_limiter
+        self._lock = threading.Lock()
+        self.rate_limited = {'session_rate': 0, 'ip_rate': 0}
+
+    def _reject(self, endpoint_class, reason, retry_after):
+        with self._lock:
+            self.rate_limited[reason] += 1
+        registry.inc('interview_admission_rejected_total', endpoint_class=endpoint_class, reason=reason)
+        raise Rejected(endpoint_class, reason, retry_after)
+
+    def check_rate(self, endpoint_class, session_id=None, client_ip=None):
+        """Spend the class's tokens from the session and IP buckets, or raise Rejected"""
+        cost = self.costs[endpoint_class]
+        if session_id:
+            wait = self.session_limiter.take(session_id, cost)
+            if wait:
+                self._reject(endpoint_class, 'session_rate', wait)
+        if client_ip:
+            wait = self.ip_limiter.take(client_ip, cost)
+            if wait:
+                self.refund(endpoint_class, session_id)
+                self._reject(endpoint_class, 'ip_rate', wait)
+
+    def refund(self, endpoint_class, session_id=None, client_ip=None):
+        """Return the tokens check_rate spent, for a request that didn't run"""
+        cost = self.costs[endpoint_class]
+        if session_id:
+            self.session_limiter.refund(session_id, cost)
+        if client_ip:
+            self.ip_limiter.refund(client_ip, cost)
+
+    def _enter(self, endpoint_class, session_id, client_ip):
+        """Rate check and a gate slot, or raise Rejected; returns the gate to release"""
+        self.check_rate(endpoint_class, session_id, client_ip)
+        gate = self.gates[endpoint_class]
+        try:
+            gate.acquire()
+        except Rejected:
+            # Shed requests don't count against the caller's rate
+            self.refund(endpoint_class, session_id, client_ip)
+            registry.inc('interview_admission_rejected_total', endpoint_class=endpoint_class, reason='shed')
+            raise
+        return gate
+
+    @contextmanager
+    def admit(self, endpoint_class, session_id=None, client_ip=None):
+        """Run the block as one admitted request of endpoint_class"""
+        gate = self._enter(endpoint_class, session_id, client_ip)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            gate.release(time.monotonic() - started)
+
+    def admit_stream(self, endpoint_class, chunks, session_id=None, client_ip=None):
+        """
+        Admit a streamed response body now, raising Rejected before the
+        response starts; the slot is held until the body is exhausted or closed
+        """
+        return AdmittedStream(chunks, self._enter(endpoint_class, session_id, client_ip))
+
+    def stats(self):
+        with self._lock:
+            rate_limited = dict(self.rate_limited)
+        return {
+            'classes': {name: gate.stats() for name, gate in self.gates.items()},
+            'rate_limited': rate_limited,
+            'tracked_sessions': len(self.session_limiter),
+            'tracked_ips': len(self.ip_limiter)
+        }
+
+
+def create_admission_controller():
+    """Build the controller from environment settings"""
+    gates, costs = {}, {}
+    for name, (cost, concurrency, queue, budget_ms) in ENDPOINT_CLASSES.items():
+        prefix = f"ADMISSION_{name.upper()}_"
+        gates[name] = AdmissionGate(
+            name,
+            concurrency=_env_int(prefix + 'CONCURRENCY', concurrency),
+            queue=_env_int(prefix + 'QUEUE', queue),
+            budget=_env_int(prefix + 'BUDGET_MS', budget_ms) / 1000.0
+        )
+        costs[name] = cost
+    return AdmissionController(
+        gates,
+        costs,
+        RateLimiter(_env_float('SESSION_RATE', 0.5), _env_float('SESSION_BURST', 10)),
+        RateLimiter(_env_float('IP_RATE', 2), _env_float('IP_BURST', 30))
+    )
+
+
+registry.counter('interview_admission_rejected_total', 'Requests turned away by rate limits or load shedding')
@@ -0,0 +1,247 @@
+"""
+Batched answer analysis for interview feedback.
+
+Each answer is lowercased and tokenized exactly once. All tokens of all
+answers (optionally across many transcripts) are then mapped to integer
+ids; feature hits, two-word phrases and role keywords are counted with
+vectorized array operations and np.bincount, giving an (answers x features)
+matrix that is scored in one pass. This keeps feedback fast for long
+sessions and bulk re-scoring.
+
+Answer length, examples, metrics and team mentions keep the meaning they
+had in the original feedback: whitespace-separated words, substrings of
+the lowercased answer ("examples", "teamwork"), and any digit character.
+"""
+import re
+
+import numpy as np
+
+FEATURES = ['words', 'star', 'examples', 'metrics', 'team', 'filler', 'role_terms']
+WORDS, STAR, EXAMPLES, METRICS, TEAM, FILLER, ROLE_TERMS = range(len(FEATURES))
+
+# Single words and two-word phrases, matched against tokens and token bigrams
+FEATURE_TERMS = {
+    STAR: [
+        'situation', 'task', 'action', 'result', 'results', 'outcome', 'goal',
+        'so i', 'as a result', 'which led', 'resulted in', 'my role'
+    ],
+    # "like" is left out: as a verb it is not filler
+    FILLER: ['um', 'uh', 'basically', 'actually', 'literally', 'you know', 'kind of', 'sort of']
+}
+
+# Counted as substrings of the lowercased answer, as the original feedback did
+SUBSTRING_TERMS = {
+    EXAMPLES: ['example', 'specific'],
+    TEAM: ['team']
+}
+
+ROLE_KEYWORDS = {
+    'Software Engineer': [
+        'code', 'testing', 'tests', 'debugging', 'git', 'api', 'architecture', 'deploy',
+        'performance', 'python', 'java', 'javascript', 'database', 'review', 'agile'
+    ],
+    'Data Scientist': [
+        'model', 'models', 'data', 'regression', 'classification', 'features', 'python',
+        'pandas', 'statistics', 'validation', 'accuracy', 'visualization', 'sql', 'experiment'
+    ],
+    'Sales Representative': [
+        'pipeline', 'quota', 'leads', 'prospecting', 'crm', 'closed', 'deal', 'deals',
+        'objections', 'revenue', 'clients', 'customer', 'negotiation', 'relationship'
+    ],
+    'Marketing Manager': [
+        'campaign', 'campaigns', 'roi', 'brand', 'seo', 'content', 'budget', 'channels',
+        'conversion', 'audience', 'analytics', 'engagement', 'strategy', 'market'
+    ],
+    'Product Manager': [
+        'roadmap', 'prioritize', 'prioritization', 'stakeholders', 'users', 'metrics',
+        'launch', 'requirements', 'features', 'customer', 'engineering', 'design', 'mvp'
+    ],
+    'UX Designer': [
+        'user', 'users', 'research', 'prototype', 'prototyping', 'wireframes', 'usability',
+        'figma', 'personas', 'testing', 'accessibility', 'feedback', 'design', 'journey'
+    ]
+}
+
+NUMBER_TOKEN = '<num>'
+_TOKEN_RE = re.compile(r"(\$?\d[\d,.]*%?)|([a-z][a-z'\-]*)")
+
+# Weights for the per-answer score (each feature is first scaled to 0..1)
+_SCORE_WEIGHTS = {
+    WORDS: 0.25, STAR: 0.2, EXAMPLES: 0.15, METRICS: 0.15, TEAM: 0.05, ROLE_TERMS: 0.2
+}
+_FILLER_PENALTY = 0.2
+
+
+def tokenize(lowered):
+    """Split a lowercased answer into word tokens; numbers become NUMBER_TOKEN"""
+    return [
+        NUMBER_TOKEN if number else word
+        for number, word in _TOKEN_RE.findall(lowered)
+    ]
+
+
+class AnswerAnalyzer:
+    def __init__(self, feature_terms=FEATURE_TERMS, role_keywords=ROLE_KEYWORDS):
+        # Token vocabulary: every word used by a feature term or role keyword
+        words = {NUMBER_TOKEN}
+        for terms in feature_terms.values():
+            for term in terms:
+                words.update(term.split())
+        keywords = sorted({kw for kws in role_keywords.values() for kw in kws})
+        words.update(keywords)
+        self.vocab = {word: i for i, word in enumerate(sorted(words))}
+        size = len(self.vocab)
+
+        # Per-token lookup tables (-1 = no feature / not a keyword)
+        self.unigram_feature = np.full(size, -1, dtype=np.int64)
+        self.unigram_feature[self.vocab[NUMBER_TOKEN]] = METRICS
+        bigrams = {}
+        for feature, terms in feature_terms.items():
+            for term in terms:
+                parts = term.split()
+                if len(parts) == 1:
+                    self.unigram_feature[self.vocab[parts[0]]] = feature
+                else:
+                    # Two-word phrases are keyed by the pair of token ids
+                    bigrams[self.vocab[parts[0]] * size + self.vocab[parts[1]]] = feature
+        self.bigram_keys = np.array(sorted(bigrams), dtype=np.int64)
+        self.bigram_feature = np.array([bigrams[k] for k in self.bigram_keys], dtype=np.int64)
+
+        self.unigram_keyword = np.full(size, -1, dtype=np.int64)
+        for i, kw in enumerate(keywords):
+            self.unigram_keyword[self.vocab[kw]] = i
+        self.keyword_count = len(keywords)
+
+        # role x keyword membership mask; the extra last row (all keywords) covers unknown roles
+        self.roles = list(role_keywords)
+        self.role_index = {role: i for i, role in enumerate(self.roles)}
+        keyword_index = {kw: i for i, kw in enumerate(keywords)}
+        self.role_mask = np.zeros((len(self.roles) + 1, len(keywords)), dtype=bool)
+        for role, kws in role_keywords.items():
+            self.role_mask[self.role_index[role], [keyword_index[kw] for kw in kws]] = True
+        self.role_mask[-1] = True
+        self.role_sizes = self.role_mask.sum(axis=1)
+
+    def feature_matrix(self, answers, roles):
+        """
+        Build the (answers x FEATURES) count matrix for parallel lists of
+        answers and roles (role_terms is keyword coverage, 0..1).
+        """
+        n = len(answers)
+        tokens = []
+        lengths = np.zeros(n, dtype=np.int64)
+        matrix = np.zeros((n, len(FEATURES)), dtype=np.float64)
+        for i, answer in enumerate(answers):
+            answer = answer or ''
+            lowered = answer.lower()
+            answer_tokens = tokenize(lowered)
+            lengths[i] = len(answer_tokens)
+            tokens.extend(answer_tokens)
+            matrix[i, WORDS] = len(answer.split())
+            for feature, terms in SUBSTRING_TERMS.items():
+                matrix[i, feature] = sum(lowered.count(term) for term in terms)
+            # \d misses digits such as '²' that str.isdigit() accepts; only possible outside ASCII
+            if not answer.isascii() and NUMBER_TOKEN not in answer_tokens and any(c.isdigit() for c in answer):
+                matrix[i, METRICS] = 1
+
+        if not tokens:
+            return matrix
+
+        # From here on everything is integer array work over all answers at once
+        lookup = self.vocab.get
+        ids = np.fromiter((lookup(t, -1) for t in tokens), dtype=np.int64, count=len(tokens))
+        rows = np.repeat(np.arange(n), lengths)
+        width = len(FEATURES)
+
+        known = ids >= 0
+        features = np.where(known, self.unigram_feature[ids], -1)
+        hit = features >= 0
+        counts = np.bincount(rows[hit] * width + features[hit], minlength=n * width)
+
+        if len(self.bigram_keys):
+            pair = known[:-1] & known[1:] & (rows[:-1] == rows[1:])
+            keys = ids[:-1][pair] * len(self.vocab) + ids[1:][pair]
+            positions = np.minimum(np.searchsorted(self.bigram_keys, keys), len(self.bigram_keys) - 1)
+            found = self.bigram_keys[positions] == keys
+            pair_rows = rows[:-1][pair][found]
+            counts += np.bincount(
+                pair_rows * width + self.bigram_feature[positions[found]], minlength=n * width
+            )
+        matrix += counts.reshape(n, width)
+
+        # Role keyword coverage: distinct keywords hit, masked by each answer's role
+        keywords = np.where(known, self.unigram_keyword[ids], -1)
+        has_keyword = keywords >= 0
+        hits = np.zeros((n, self.keyword_count), dtype=bool)
+        hits[rows[has_keyword], keywords[has_keyword]] = True
+        role_rows = np.array([self.role_index.get(role, len(self.roles)) for role in roles], dtype=np.int64)
+        covered = (hits & self.role_mask[role_rows]).sum(axis=1)
+        matrix[:, ROLE_TERMS] = covered / np.maximum(self.role_sizes[role_rows], 1)
+        return matrix
+
+    def score(self, matrix):
+        """Score every answer 0-100 from its feature row"""
+        words = matrix[:, WORDS]
+        scaled = np.zeros_like(matrix)
+        scaled[:, WORDS] = np.clip(words / 60.0, 0, 1)
+        scaled[:, STAR] = np.clip(matrix[:, STAR] / 3.0, 0, 1)
+        scaled[:, EXAMPLES] = np.clip(matrix[:, EXAMPLES], 0, 1)
+        scaled[:, METRICS] = np.clip(matrix[:, METRICS] / 2.0, 0, 1)
+        scaled[:, TEAM] = np.clip(matrix[:, TEAM], 0, 1)
+        scaled[:, ROLE_TERMS] = np.clip(matrix[:, ROLE_TERMS] * 4.0, 0, 1)
+
+        weights = np.zeros(len(FEATURES))
+        for feature, weight in _SCORE_WEIGHTS.items():
+            weights[feature] = weight
+        filler_rate = matrix[:, FILLER] / np.maximum(words, 1)
+        score = scaled @ weights - _FILLER_PENALTY * np.clip(filler_rate * 10, 0, 1)
+        return np.round(np.clip(score, 0, 1) * 100, 1)
+
+    def analyze(self, answers, role):
+        """Summary of one interview's answers"""
+        matrix = self.feature_matrix(answers, [role] * len(answers))
+        return self._summarize(matrix, self.score(matrix))
+
+    def analyze_transcripts(self, transcripts):
+        """
+        Bulk re-scoring: transcripts is an iterable of (answers, role).
+        Every answer of every transcript goes through one feature_matrix call.
+        """
+        answers, roles, owners = [], [], []
+        count = 0
+        for index, (transcript_answers, role) in enumerate(transcripts):
+            answers.extend(transcript_answers)
+            roles.extend([role] * len(transcript_answers))
+            owners.extend([index] * len(transcript_answers))
+            count = index + 1
+
+        matrix = self.feature_matrix(answers, roles)
+        scores = self.score(matrix)
+        owners = np.array(owners, dtype=np.int64)
+        order = np.argsort(owners, kind='stable')
+        bounds = np.searchsorted(owners[order], np.arange(count + 1))
+        return [
+            self._summarize(matrix[order[start:end]], scores[order[start:end]])
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def _summarize(self, matrix, scores):
+        if not len(matrix):
+            return {'total_answers': 0, 'scores': [], 'overall_score': 0.0}
+        words = matrix[:, WORDS]
+        return {
+            'total_answers': int(len(matrix)),
+            'avg_length': float(words.mean()),
+            'has_examples': bool((matrix[:, EXAMPLES] > 0).any()),
+            'has_metrics': bool((matrix[:, METRICS] > 0).any()),
+            'has_team_mention': bool((matrix[:, TEAM] > 0).any()),
+            'star_answers': int((matrix[:, STAR] >= 2).sum()),
+            'filler_rate': float(matrix[:, FILLER].sum() / max(words.sum(), 1)),
+            'role_coverage': float(matrix[:, ROLE_TERMS].max()),
+            'scores': scores.tolist(),
+            'overall_score': float(scores.mean())
+        }
+
+
+# Shared, built once per process
+answer_analyzer = AnswerAnalyzer()
@@ -0,0 +1,305 @@
+"""
+Voice answer uploads: spooling, header checks and bounded transcoding.
+
+Uploads never sit in memory as a whole:
+  - multipart files are written to spooled temp files (in memory up to
+    AUDIO_SPOOL_BYTES, then on disk) and the upload is cut off with
+    UploadTooLarge as soon as it passes the endpoint's byte limit
+  - raw audio bodies are read chunk by chunk under the same limit
+Before any decoding, the first bytes are checked: the container and codec
+must be recognised and allowed, and when the header states a duration (WAV,
+FLAC) it must be within STT_MAX_SECONDS.
+
+16-bit mono WAV is handed to the recognizer as it is. Everything else is
+normalised to 16 kHz mono PCM by ffmpeg, streamed through a TranscodePool
+that runs at most TRANSCODE_PROCESSES conversions at once per worker and
+lets at most TRANSCODE_QUEUE more wait (up to TRANSCODE_WAIT_MS) before
+turning requests away with Overloaded (503).
+
+  AUDIO_SPOOL_BYTES    upload bytes kept in memory before spilling to disk (default 1 MB)
+  AUDIO_CODECS         allowed codecs (default pcm_s16le,pcm_s24le,pcm_s32le,pcm_u8,opus,vorbis,flac,mp3,aac)
+  TRANSCODE_PROCESSES / TRANSCODE_QUEUE / TRANSCODE_WAIT_MS   pool settings (default 2 / 4 / 2000)
+  FFMPEG_BINARY        ffmpeg to run (default: ffmpeg or avconv found on PATH)
+"""
+import io
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import wave
+
+from flask import Request
+
+from utils.executors import Overloaded
+from utils.metrics import observe_stage
+from utils.speech_to_text import SpeechToTextError, iter_ffmpeg_pcm, iter_wav_pcm
+
+HEAD_BYTES = 64 * 1024  # enough for the headers of every supported container
+DEFAULT_CODECS = 'pcm_s16le,pcm_s24le,pcm_s32le,pcm_u8,opus,vorbis,flac,mp3,aac'
+# Codec markers found in the first bytes of Ogg / Matroska (WebM) / MP4 files
+OGG_CODECS = ((b'OpusHead', 'opus'), (b'\x01vorbis', 'vorbis'), (b'\x7fFLAC', 'flac'))
+MATROSKA_CODECS = ((b'A_OPUS', 'opus'), (b'A_VORBIS', 'vorbis'), (b'A_AAC', 'aac'),
+                   (b'A_MPEG/L3', 'mp3'), (b'A_FLAC', 'flac'), (b'A_PCM/INT/LIT', 'pcm_s16le'))
+MP4_CODECS = ((b'mp4a', 'aac'), (b'Opus', 'opus'), (b'fLaC', 'flac'))
+
+
+class UploadTooLarge(Exception):
+    """An upload over its byte limit, or a recording over the duration limit (413)"""
+
+
+class CappedSpooledFile(tempfile.SpooledTemporaryFile):
+    """Spooled temp file that refuses to grow past max_bytes"""
+
+    def __init__(self, max_bytes=None, spool_bytes=1024 * 1024):
+        super().__init__(max_size=spool_bytes)
+        self.max_bytes = max_bytes
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+        if self.max_bytes is not None and self.written > self.max_bytes:
+            raise UploadTooLarge(f"Audio exceeds {self.max_bytes} bytes")
+        return super().write(data)
+
+
+class SpoolingRequest(Request):
+    """
+    Flask request whose multipart files are spooled to CappedSpooledFile.
+    A view sets request.max_file_bytes before touching request.files to cap
+    its uploads.
+    """
+
+    max_file_bytes = None
+    spool_bytes = int(os.environ.get('AUDIO_SPOOL_BYTES', 1024 * 1024))
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return CappedSpooledFile(self.max_file_bytes, self.spool_bytes)
+
+
+def capped_chunks(chunks, max_bytes):
+    """Pass chunks through, raising UploadTooLarge once more than max_bytes went by"""
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(f"Audio exceeds {max_bytes} bytes")
+        yield chunk
+
+
+class AudioInfo:
+    __slots__ = ('container', 'codec', 'sample_rate', 'channels', 'sample_width', 'duration')
+
+    def __init__(self, container, codec, sample_rate=None, channels=None, sample_width=None, duration=None):
+        self.container = container
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.duration = duration  # seconds, None when the header doesn't say
+
+    @property
+    def is_pcm16_mono(self):
+        return self.codec == 'pcm_s16le' and self.channels == 1
+
+
+def _probe_wav(head):
+    try:
+        reader = wave.open(io.BytesIO(head), 'rb')
+    except (wave.Error, EOFError) as e:
+        raise SpeechToTextError(f"Unsupported WAV audio: {e}")
+    width, channels, rate, frames = (reader.getsampwidth(), reader.getnchannels(),
+                                     reader.getframerate(), reader.getnframes())
+    codec = 'pcm_u8' if width == 1 else f"pcm_s{8 * width}le"
+    # Streaming writers leave the data size at 0 or 0xFFFFFFFF: length unknown
+    data_bytes = frames * width * channels
+    known = frames and data_bytes < 0xFFFFFFFF - width * channels
+    return AudioInfo('wav', codec, rate, channels, width, frames / rate if known and rate else None)
+
+
+def _probe_flac(head):
+    # STREAMINFO is the first metadata block: rate (20 bits), channels - 1 (3),
+    # bits per sample - 1 (5), total samples (36) packed from byte 18
+    if len(head) < 26:
+        return AudioInfo('flac', 'flac')
+    packed = struct.unpack('>Q', head[18:26])[0]
+    rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    samples = packed & 0xFFFFFFFFF
+    return AudioInfo('flac', 'flac', rate, channels, None, samples / rate if samples and rate else None)
+
+
+def _find_codec(head, markers):
+    for marker, codec in markers:
+        if marker in head:
+            return codec
+    return None
+
+
+def probe_audio(head):
+    """AudioInfo from the first bytes of a recording; raises SpeechToTextError if it isn't usable audio"""
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return _probe_wav(head)
+    if head[:4] == b'fLaC':
+        return _probe_flac(head)
+    if head[:4] == b'OggS':
+        return AudioInfo('ogg', _find_codec(head, OGG_CODECS))
+    if head[:4] == b'\x1aE\xdf\xa3':
+        return AudioInfo('webm', _find_codec(head, MATROSKA_CODECS))
+    if head[4:8] == b'ftyp':
+        return AudioInfo('mp4', _find_codec(head, MP4_CODECS))
+    if head[:3] == b'ID3' or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE6 == 0xE2):
+        return AudioInfo('mp3', 'mp3')
+    if len(head) > 1 and head[0] == 0xFF and head[1] & 0xF6 == 0xF0:
+        return AudioInfo('adts', 'aac')
+    if not head:
+        raise SpeechToTextError("Empty audio upload")
+    raise SpeechToTextError("Unsupported audio format")
+
+
+class AudioPolicy:
+    """Which recordings are accepted: allowed codecs and the longest duration"""
+
+    def __init__(self, codecs, max_seconds=None):
+        self.codecs = frozenset(codecs)
+        self.max_seconds = max_seconds
+
+    def check(self, info):
+        if info.codec is None:
+            raise SpeechToTextError(f"Could not find the audio codec in the {info.container} header")
+        if info.codec not in self.codecs:
+            raise SpeechToTextError(f"Unsupported audio codec: {info.codec}")
+        if self.max_seconds and info.duration is not None and info.duration > self.max_seconds:
+            raise UploadTooLarge(f"Recording is {info.duration:.0f}s long, the limit is {self.max_seconds}s")
+        return info
+
+
+def head_of_file(file):
+    """First HEAD_BYTES of a seekable file, leaving it rewound"""
+    file.seek(0)
+    head = file.read(HEAD_BYTES)
+    file.seek(0)
+    return head
+
+
+def head_of_chunks(chunks):
+    """(first HEAD_BYTES, iterator over the whole stream) for a chunk iterator"""
+    chunks = iter(chunks)
+    parts, size = [], 0
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= HEAD_BYTES:
+            break
+    head = b''.join(parts)
+
+    def stream():
+        if head:
+            yield head
+        yield from chunks
+
+    return head, stream()
+
+
+class TranscodePool:
+    """Bounded ffmpeg conversions to 16 kHz mono PCM, shared by the worker's threads"""
+
+    def __init__(self, ffmpeg='ffmpeg', processes=2, queue=4, wait_seconds=2.0, max_seconds=None):
+        self.ffmpeg = ffmpeg
+        self.processes = processes
+        self.queue = queue
+        self.wait_seconds = wait_seconds
+        self.max_seconds = max_seconds
+        self._cond = threading.Condition()
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _acquire(self):
+        started = time.monotonic()
+        with self._cond:
+            if self.running >= self.processes:
+                if self.waiting >= self.queue:
+                    self.rejected += 1
+                    raise Overloaded('Audio transcoding')
+                self.waiting += 1
+                try:
+                    deadline = started + self.wait_seconds
+                    while self.running >= self.processes:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            raise Overloaded('Audio transcoding')
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.running += 1
+        observe_stage('transcode_wait', time.monotonic() - started)
+
+    def _release(self):
+        with self._cond:
+            self.running -= 1
+            self.completed += 1
+            self._cond.notify()
+
+    def pcm(self, chunks):
+        """
+        Sample rate, then PCM chunks, converted by one ffmpeg process once a
+        slot is free. The slot is held until the stream is exhausted or closed.
+        """
+        self._acquire()
+        try:
+            yield from iter_ffmpeg_pcm(chunks, self.ffmpeg, max_seconds=self.max_seconds)
+        finally:
+            self._release()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'ffmpeg': self.ffmpeg,
+                'processes': self.processes,
+                'queue': self.queue,
+                'running': self.running,
+                'waiting': self.waiting,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+
+def pcm_stream(chunks, info, transcode_pool):
+    """Sample rate, then PCM chunks: WAV read as it is when already 16-bit mono, else transcoded"""
+    if info.container == 'wav' and info.is_pcm16_mono:
+        return iter_wav_pcm(chunks)
+    return transcode_pool.pcm(chunks)
+
+
+def find_ffmpeg():
+    """
+    FFMPEG_BINARY, else ffmpeg (or avconv) on PATH - pydub's lookup order,
+    without importing pydub (and audioop) into every worker at startup
+    """
+    binary = os.environ.get('FFMPEG_BINARY')
+    if binary:
+        return binary
+    return shutil.which('ffmpeg') or shutil.which('avconv') or 'ffmpeg'
+
+
+def create_audio_policy():
+    codecs = os.environ.get('AUDIO_CODECS', DEFAULT_CODECS)
+    return AudioPolicy(
+        [codec.strip() for codec in codecs.split(',') if codec.strip()],
+        int(os.environ.get('STT_MAX_SECONDS', 300)) or None
+    )
+
+
+def create_transcode_pool():
+    """Build the transcoding pool from environment settings"""
+    return TranscodePool(
+        ffmpeg=find_ffmpeg(),
+        processes=int(os.environ.get('TRANSCODE_PROCESSES', 2)),
+        queue=int(os.environ.get('TRANSCODE_QUEUE', 4)),
+        wait_seconds=int(os.environ.get('TRANSCODE_WAIT_MS', 2000)) / 1000.0,
+        max_seconds=int(os.environ.get('STT_MAX_SECONDS', 300)) or None
+    )
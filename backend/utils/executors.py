@@ -0,0 +1,116 @@
+"""
+Bounded executors for slow work (TTS synthesis, resume parsing).
+
+Each executor has a fixed number of workers and a fixed number of queue
+slots. When both are full, submit() fails fast with Overloaded instead of
+piling up requests, and run() gives up waiting after a per-request timeout.
+Request threads therefore never wait on an unbounded backlog.
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from utils.metrics import observe_stage
+
+
+class Overloaded(Exception):
+    """Raised when an executor has no free worker or queue slot"""
+
+    def __init__(self, name, retry_after=1):
+        super().__init__(f"{name} is busy, please retry shortly")
+        self.retry_after = retry_after
+
+
+class TaskTimeout(Exception):
+    """Raised when a task does not finish within its time budget"""
+
+    def __init__(self, name, timeout):
+        super().__init__(f"{name} did not finish within {timeout} seconds")
+
+
+class BoundedExecutor:
+    def __init__(self, name, max_workers=4, max_queue=8, timeout=30):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn; raises Overloaded when every worker and queue slot is taken"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise Overloaded(self.name)
+
+        with self._lock:
+            self.in_flight += 1
+        # Run in a copy of the caller's context so stage timings reach the submitting request
+        context = contextvars.copy_context()
+        try:
+            future = self._pool.submit(context.run, self._timed, fn, time.perf_counter(), *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _timed(self, fn, submitted, *args, **kwargs):
+        observe_stage(f"{self.name.replace('-', '_')}_queue_wait", time.perf_counter() - submitted)
+        return fn(*args, **kwargs)
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """Run fn on the pool and wait for its result (blocking caller)"""
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise TaskTimeout(self.name, timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts
+            }
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+# Shared by every request in this worker
+tts_executor = BoundedExecutor(
+    'tts',
+    max_workers=_env_int('TTS_WORKERS', 4),
+    max_queue=_env_int('TTS_QUEUE', 8),
+    timeout=_env_int('TTS_TIMEOUT', 20)
+)
+resume_executor = BoundedExecutor(
+    'resume-parser',
+    max_workers=_env_int('RESUME_WORKERS', 2),
+    max_queue=_env_int('RESUME_QUEUE', 4),
+    timeout=_env_int('RESUME_TIMEOUT', 30)
+)
@@ -0,0 +1,114 @@
+"""
+Keyword router for follow-up questions.
+
+Follow-up rules are data: each rule has keywords, a question, a weight and a
+priority, and may be limited to one role. The rules for a role are compiled
+once into a single case-insensitive regex, so an answer is scanned in one
+pass no matter how many rules exist. Keywords match as substrings, so
+'collaborat' also catches "collaborated" and "collaboration".
+
+The matched rule with the highest priority wins; among equal priorities the
+highest score (weight x distinct keywords hit) wins, then the earlier rule.
+
+The rules live in the "follow_up_rules" section of the interview content
+file (see utils/interview_content.py):
+  {"rules": [{"keywords": ["project", "built"], "question": "...", "weight": 1, "priority": 0}],
+   "roles": {"Data Scientist": [{"keywords": ["model"], "question": "..."}]}}
+Role rules are added to the shared "rules" for that role.
+"""
+import re
+
+
+class FollowUpRule:
+    __slots__ = ('name', 'keywords', 'question', 'weight', 'priority')
+
+    def __init__(self, keywords, question, weight=1.0, priority=0, name=None):
+        self.keywords = [' '.join(k.lower().split()) for k in keywords if k.strip()]
+        self.question = question
+        self.weight = float(weight)
+        self.priority = int(priority)
+        self.name = name or self.keywords[0]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['keywords'],
+            data['question'],
+            weight=data.get('weight', 1.0),
+            priority=data.get('priority', 0),
+            name=data.get('name')
+        )
+
+
+class CompiledRules:
+    """One role's rules compiled into a single alternation regex"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.keyword_rules = {}  # keyword -> indexes of the rules that use it
+        for index, rule in enumerate(rules):
+            for keyword in rule.keywords:
+                self.keyword_rules.setdefault(keyword, []).append(index)
+
+        if self.keyword_rules:
+            # Longest first so "worked with" wins over a shorter overlapping keyword
+            alternatives = sorted(self.keyword_rules, key=len, reverse=True)
+            self.pattern = re.compile(
+                '|'.join(re.escape(k).replace(r'\ ', r'\s+') for k in alternatives),
+                re.IGNORECASE
+            )
+        else:
+            self.pattern = None
+
+    def match(self, answer):
+        """Return the winning rule for an answer, or None"""
+        if not answer or self.pattern is None:
+            return None
+
+        hits = {}  # rule index -> distinct keywords seen
+        for match in self.pattern.finditer(answer):
+            keyword = ' '.join(match.group(0).lower().split())
+            for index in self.keyword_rules[keyword]:
+                hits.setdefault(index, set()).add(keyword)
+        if not hits:
+            return None
+
+        best = min(
+            hits,
+            key=lambda i: (-self.rules[i].priority, -self.rules[i].weight * len(hits[i]), i)
+        )
+        return self.rules[best]
+
+
+class FollowUpRouter:
+    def __init__(self, rules, role_rules=None):
+        self.rules = rules
+        self.role_rules = role_rules or {}
+        self._shared = CompiledRules(rules)
+        # Role-specific rules come first so they win ties against shared ones
+        self._compiled = {
+            role: CompiledRules(extra + rules) for role, extra in self.role_rules.items()
+        }
+
+    def route(self, role, answer):
+        """Follow-up question for the answer, or None if no rule matches"""
+        rule = self._compiled.get(role, self._shared).match(answer)
+        return rule.question if rule else None
+
+    def questions(self):
+        """Every question a rule can return"""
+        texts = [rule.question for rule in self.rules]
+        for extra in self.role_rules.values():
+            texts.extend(rule.question for rule in extra)
+        return list(dict.fromkeys(texts))
+
+
+def router_from_dict(data):
+    """Build a router from the {"rules": [...], "roles": {role: [...]}} layout"""
+    rules = [FollowUpRule.from_dict(rule) for rule in data.get('rules', [])]
+    role_rules = {
+        role: [FollowUpRule.from_dict(rule) for rule in entries]
+        for role, entries in data.get('roles', {}).items()
+    }
+    return FollowUpRouter(rules, role_rules)
+
@@ -0,0 +1,493 @@
+"""
+Versioned interview content: role questions, generic follow-ups and the
+keyword follow-up rules, with hot reload.
+
+The content is edited in content/interview.json:
+  {"format": 1, "version": "...", "default_role": "...",
+   "role_questions": {role: [question, ...]},
+   "follow_up_questions": [question, ...],
+   "follow_up_rules": {"rules": [...], "roles": {...}}   (see utils/follow_up_router.py)}
+and can be compiled, together with the question bank index, into a binary
+build (content/interview.bin) that workers memory-map instead of parsing and
+re-indexing:
+  python -m utils.interview_content build [--source PATH] [--bank PATH] [--output PATH]
+  python -m utils.interview_content check [PATH]
+
+Everything a loaded file yields lives in one immutable ContentSnapshot,
+tagged "<version>@<digest>" where the digest covers the source file and the
+bank file, so every worker computes the same tag for the same content. The
+ContentStore publishes a new snapshot with a single reference swap once it
+is fully built and warmed, so requests are served from the old snapshot
+until then and never wait on a reload, and keeps the last few so a session
+stays on the snapshot it started with. A file that fails to load or
+validate leaves the current snapshot in place.
+
+By default the store watches both the .json source and the .bin build and
+loads whichever was written last, so editing the source after a build
+takes effect instead of being shadowed by the older build. A build records
+the digest of its source: one whose source has changed since is skipped in
+favour of the source, loaded with a warning when it is the only file given,
+and refused by `check`.
+
+Reloads happen when a file changes (polled, per worker) or through
+POST /api/admin/content. The arrays of a binary build are views over a
+read-only mapping, so the page cache holds one copy for every worker, and
+loading one takes milliseconds where the .json source re-indexes the bank.
+
+  CONTENT_PATH           .json source or .bin build to load (default: the newer of content/interview.json
+                         and content/interview.bin)
+  CONTENT_WATCH_SECONDS  how often to check the file for changes (default 5, 0 = never)
+  CONTENT_KEEP_VERSIONS  snapshots kept for sessions started on earlier content (default 4)
+  QUESTION_BANK_PATH     bank indexed into the snapshot when loading the .json source
+  ADMIN_TOKEN            X-Admin-Token value for /api/admin/content (unset = endpoint disabled)
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from types import MappingProxyType
+
+import numpy as np
+
+from utils.follow_up_router import router_from_dict
+from utils.prefork import restart_after_fork
+from utils.question_bank import QuestionBank, build_question_bank
+from utils.transcripts import question_catalog
+
+CONTENT_FORMAT = 1
+BUILD_MAGIC = b'IVCB'
+BUILD_FORMAT = 1
+_PREAMBLE = struct.Struct('<4sIQ')  # magic, build format, header length
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'content')
+DEFAULT_SOURCE_PATH = os.path.join(CONTENT_DIR, 'interview.json')
+DEFAULT_BUILD_PATH = os.path.join(CONTENT_DIR, 'interview.bin')
+
+
+class ContentError(Exception):
+    """Content that can't be loaded: bad JSON, missing fields, a damaged build"""
+
+
+def _check_questions(name, questions):
+    if not isinstance(questions, list) or not questions:
+        raise ContentError(f"{name} must be a non-empty list of questions")
+    if not all(isinstance(q, str) and q.strip() for q in questions):
+        raise ContentError(f"{name} must only hold non-empty strings")
+
+
+def validate_content(data):
+    """Raise ContentError unless data is complete content of a supported format"""
+    if not isinstance(data, dict):
+        raise ContentError("Content must be a JSON object")
+    if data.get('format') != CONTENT_FORMAT:
+        raise ContentError(f"Unsupported content format: {data.get('format')}")
+    if not data.get('version'):
+        raise ContentError("Content has no version")
+    role_questions = data.get('role_questions')
+    if not isinstance(role_questions, dict) or not role_questions:
+        raise ContentError("role_questions must map each role to its questions")
+    for role, questions in role_questions.items():
+        _check_questions(f"role_questions[{role!r}]", questions)
+    if data.get('default_role') not in role_questions:
+        raise ContentError(f"default_role {data.get('default_role')!r} is not one of the roles")
+    _check_questions('follow_up_questions', data.get('follow_up_questions'))
+
+
+class ContentSnapshot:
+    """One loaded version of the content; never changed after it is built"""
+
+    __slots__ = ('version', 'digest', 'tag', 'role_questions', 'default_role', 'follow_up_questions',
+                 'follow_up_router', 'question_bank', 'source', 'loaded_at')
+
+    def __init__(self, data, digest, question_bank=None, source=None):
+        validate_content(data)
+        try:
+            self.follow_up_router = router_from_dict(data.get('follow_up_rules') or {})
+        except (KeyError, TypeError, ValueError, AttributeError, IndexError) as e:
+            raise ContentError(f"Invalid follow_up_rules: {e!r}")
+        self.version = str(data['version'])
+        self.digest = digest
+        self.tag = f"{self.version}@{digest[:8]}"
+        self.role_questions = MappingProxyType(
+            {role: tuple(questions) for role, questions in data['role_questions'].items()}
+        )
+        self.default_role = data['default_role']
+        self.follow_up_questions = tuple(data['follow_up_questions'])
+        self.question_bank = question_bank
+        self.source = source
+        self.loaded_at = time.time()
+
+    def questions_for(self, role):
+        return self.role_questions.get(role) or self.role_questions[self.default_role]
+
+    def all_question_texts(self):
+        """Every fixed question string this content can ask (used for TTS pre-rendering)"""
+        texts = []
+        for questions in self.role_questions.values():
+            texts.extend(questions)
+        texts.extend(self.follow_up_questions)
+        texts.extend(self.follow_up_router.questions())
+        return list(dict.fromkeys(texts))
+
+    def warm(self):
+        """Build the bank's per-role arrays now rather than on a request"""
+        if self.question_bank is not None:
+            for role in self.role_questions:
+                self.question_bank.role_bias(role)
+
+    def stats(self):
+        return {
+            'tag': self.tag,
+            'version': self.version,
+            'source': self.source,
+            'loaded_at': self.loaded_at,
+            'roles': len(self.role_questions),
+            'follow_up_rules': len(self.follow_up_router.rules),
+            'question_bank': self.question_bank.stats() if self.question_bank is not None else None
+        }
+
+
+def content_digest(source, bank_path=None):
+    """sha256 over the source file and the bank file, i.e. everything a snapshot is built from"""
+    digest = hashlib.sha256()
+    for path in (source, bank_path):
+        if path:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_source(source):
+    try:
+        with open(source, encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError as e:
+        raise ContentError(f"{source} is not valid JSON: {e}")
+
+
+def load_source(source, bank_path=None):
+    """Snapshot from the .json source, indexing the bank file at bank_path / QUESTION_BANK_PATH"""
+    bank_path = bank_path or os.environ.get('QUESTION_BANK_PATH')
+    data = _read_source(source)
+    validate_content(data)
+    digest = content_digest(source, bank_path)
+    bank = build_question_bank(data['role_questions'], bank_path)
+    return ContentSnapshot(data, digest, bank, source)
+
+
+class _StringTable(Sequence):
+    """Strings stored back to back in a buffer, decoded on access"""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+
+def _string_arrays(strings):
+    """(offsets, utf-8 bytes) for a string table"""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def build_content(source=DEFAULT_SOURCE_PATH, output=DEFAULT_BUILD_PATH, bank_path=None):
+    """
+    Compile the source (and bank) into a binary build at output:
+      magic, build format, header length | JSON header | 8-byte aligned arrays
+    The header holds the content itself, its digest and where each bank array lies.
+    Written to a temp file and renamed, so a watching worker never reads half a build.
+    """
+    bank_path = bank_path or os.environ.get('QUESTION_BANK_PATH')
+    data = _read_source(source)
+    validate_content(data)
+    bank = build_question_bank(data['role_questions'], bank_path)
+    snapshot = ContentSnapshot(data, content_digest(source, bank_path), bank, source)
+
+    arrays, bank_header = {}, None
+    if bank is not None:
+        arrays = {name: np.ascontiguousarray(getattr(bank, name)) for name in QuestionBank.ARRAYS}
+        arrays['text_offsets'], arrays['text_data'] = _string_arrays(bank.texts)
+        arrays['term_offsets'], arrays['term_data'] = _string_arrays(bank.terms())
+        bank_header = {'role_names': bank.role_names, 'max_df': bank.max_df, 'questions': len(bank)}
+
+    # Array offsets are relative to the end of the (padded) header
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, len(array), offset]
+        offset += -(-array.nbytes // 8) * 8
+    if bank_header is not None:
+        bank_header['arrays'] = layout
+    header = json.dumps({
+        'digest': snapshot.digest,
+        'source': os.path.abspath(source),
+        'source_digest': content_digest(source),
+        'built_at': time.time(),
+        'content': data,
+        'bank': bank_header
+    }).encode('utf-8')
+    header += b' ' * (-(_PREAMBLE.size + len(header)) % 8)
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(BUILD_MAGIC, BUILD_FORMAT, len(header)))
+            f.write(header)
+            for array in arrays.values():
+                f.write(array.tobytes())
+                f.write(b'\0' * (-array.nbytes % 8))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return snapshot
+
+
+def build_staleness(header):
+    """Why a build no longer matches its source file, or None if it does (or the source isn't here)"""
+    source = header.get('source')
+    if not source or not os.path.exists(source):
+        return None
+    if content_digest(source) != header.get('source_digest'):
+        return f"{source} has changed since this build; rebuild with `python -m utils.interview_content build`"
+    return None
+
+
+def load_build(path, strict=False):
+    """
+    Snapshot from a binary build; the bank arrays are views over a read-only
+    mapping of the file. A build older than its source is loaded with a
+    warning, or refused with strict.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _PREAMBLE.size:
+            raise ContentError(f"{path} is not a content build")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, build_format, header_length = _PREAMBLE.unpack_from(data)
+    if magic != BUILD_MAGIC:
+        raise ContentError(f"{path} is not a content build")
+    if build_format != BUILD_FORMAT:
+        raise ContentError(f"Unsupported content build format: {build_format}")
+    start = _PREAMBLE.size + header_length
+    try:
+        header = json.loads(data[_PREAMBLE.size:start])
+    except ValueError as e:
+        raise ContentError(f"Damaged content build header: {e}")
+    stale = build_staleness(header)
+    if stale and strict:
+        raise ContentError(f"{path} is stale: {stale}")
+    if stale:
+        print(f"📝 Warning: loading {path} although {stale}")
+
+    bank = None
+    if header.get('bank'):
+        meta = header['bank']
+        arrays = {}
+        for name, (dtype, count, offset) in meta['arrays'].items():
+            if start + offset + count * np.dtype(dtype).itemsize > size:
+                raise ContentError(f"Content build is truncated ({name})")
+            arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=start + offset)
+        texts = _StringTable(arrays['text_offsets'], arrays['text_data'])
+        terms = _StringTable(arrays['term_offsets'], arrays['term_data'])
+        bank = QuestionBank.from_arrays(texts, terms, meta['role_names'], meta['max_df'], arrays)
+    return ContentSnapshot(header['content'], header['digest'], bank, path)
+
+
+def load_snapshot(path, bank_path=None, strict=False):
+    """Snapshot from a binary build or a .json source, whichever path is"""
+    with open(path, 'rb') as f:
+        is_build = f.read(len(BUILD_MAGIC)) == BUILD_MAGIC
+    return load_build(path, strict) if is_build else load_source(path, bank_path)
+
+
+class ContentStore:
+    """
+    The current snapshot plus the last few, reloaded when the file changes.
+    Readers take store.current (or get(tag) for a session's pinned version)
+    without locking; reload builds the new snapshot off to the side and then
+    swaps the reference.
+    """
+
+    def __init__(self, paths, bank_path=None, keep=4):
+        # One file, or candidates such as the source and its build: the one written last is loaded
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.path = None
+        self.bank_path = bank_path
+        self.keep = max(1, keep)
+        self.current = None
+        self.watch_seconds = 0
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._snapshots = OrderedDict()  # tag -> snapshot, oldest first
+        self._signature = None
+        self._lock = threading.Lock()
+        self.reload(force=True)
+
+    def _file_signature(self):
+        signature = []
+        for path in self.paths + ([self.bank_path] if self.bank_path else []):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load(self):
+        """
+        (path, snapshot) for the candidate written last. A candidate that fails,
+        e.g. a build older than its source, gives way to the next newest one.
+        """
+        existing = [path for path in self.paths if os.path.exists(path)]
+        candidates = sorted(existing, key=os.path.getmtime, reverse=True) or self.paths[:1]
+        for index, path in enumerate(candidates):
+            fallback = index < len(candidates) - 1
+            try:
+                return path, load_snapshot(path, self.bank_path, strict=fallback)
+            except ContentError as e:
+                if not fallback:
+                    raise
+                print(f"📝 Skipping {path}: {e}")
+
+    def get(self, tag=None):
+        """The snapshot a session is pinned to, or the current one if it is unknown or was dropped"""
+        if tag:
+            snapshot = self._snapshots.get(tag)
+            if snapshot is not None:
+                return snapshot
+        return self.current
+
+    def reload(self, force=False):
+        """
+        Load the file if it changed since the last attempt (always with force).
+        Returns the newly published snapshot, or None when nothing changed.
+        Raises ContentError / OSError, keeping the current snapshot, if it doesn't load.
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if not force and signature == self._signature:
+                return None
+            # Remember the attempt even if it fails, so a broken file is reported once, not every poll
+            self._signature = signature
+            try:
+                path, snapshot = self._load()
+            except (OSError, ContentError) as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            self.last_error = None
+            self.path = path
+            # The same content from the other file (e.g. a fresh build of the source) still
+            # replaces the current snapshot, so workers move onto the shared mapping
+            if self.current is not None and (snapshot.tag, snapshot.source) == (self.current.tag, self.current.source):
+                return None
+
+            snapshot.warm()
+            # Sessions store the fixed questions as catalog ids rather than text
+            question_catalog.register(snapshot.all_question_texts())
+            self._snapshots[snapshot.tag] = snapshot
+            self._snapshots.move_to_end(snapshot.tag)
+            while len(self._snapshots) > self.keep:
+                self._snapshots.popitem(last=False)
+            self.current = snapshot
+            self.reloads += 1
+            print(f"📝 Interview content {snapshot.tag} loaded from {snapshot.source}")
+            return snapshot
+
+    def watch(self, interval):
+        """Check the file every interval seconds in a background thread (restarted in forked workers)"""
+        self.watch_seconds = interval
+        if interval > 0:
+            self._start_watcher()
+            restart_after_fork(self._restart_watcher)
+
+    def _start_watcher(self):
+        threading.Thread(target=self._watch_loop, name='content-watcher', daemon=True).start()
+
+    def _restart_watcher(self):
+        # Only the forking thread survives a fork: the watcher may have held the lock
+        self._lock = threading.Lock()
+        self._start_watcher()
+
+    def _watch_loop(self):
+        while True:
+            time.sleep(self.watch_seconds)
+            try:
+                self.reload()
+            except (OSError, ContentError) as e:
+                print(f"📝 Keeping interview content {self.current.tag}: {e}")
+
+    def stats(self):
+        return {
+            'current': self.current.stats(),
+            'path': self.path,
+            'versions': list(self._snapshots),
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'watch_seconds': self.watch_seconds
+        }
+
+
+def create_content_store():
+    """Build the content store from environment settings and start watching its file"""
+    path = os.environ.get('CONTENT_PATH')
+    store = ContentStore(
+        path or (DEFAULT_SOURCE_PATH, DEFAULT_BUILD_PATH),
+        bank_path=os.environ.get('QUESTION_BANK_PATH'),
+        keep=int(os.environ.get('CONTENT_KEEP_VERSIONS', 4))
+    )
+    store.watch(float(os.environ.get('CONTENT_WATCH_SECONDS', 5)))
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or check the interview content')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Compile the source and question bank into a binary build')
+    build.add_argument('--source', default=DEFAULT_SOURCE_PATH)
+    build.add_argument('--bank', default=os.environ.get('QUESTION_BANK_PATH'))
+    build.add_argument('--output', default=DEFAULT_BUILD_PATH)
+    check = commands.add_parser('check', help='Load a source or build (refusing a stale build) and print what it holds')
+    check.add_argument('path', nargs='?', default=DEFAULT_SOURCE_PATH)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'build':
+            snapshot = build_content(args.source, args.output, args.bank)
+            print(f"📝 Content {snapshot.tag} written to {args.output} ({os.path.getsize(args.output)} bytes)")
+        else:
+            snapshot = load_snapshot(args.path, strict=True)
+            print(json.dumps(snapshot.stats(), indent=2))
+    except (OSError, ContentError) as e:
+        print(f"📝 {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
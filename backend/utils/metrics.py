@@ -0,0 +1,235 @@
+"""
+Request and stage latency metrics in Prometheus text format.
+
+install_metrics(app) times every /api/* request and records
+  interview_http_request_seconds{route, method, status}   histogram
+  interview_http_request_bytes / _response_bytes{route}    histograms
+  interview_http_errors_total{route, status}               counter (4xx/5xx)
+and code marks its stages with `with stage('question_generation'):`, which
+feeds interview_stage_seconds{stage}. Stages that run on executor threads
+are attributed to the request that submitted them.
+
+GET /api/metrics serves the registry. Metrics are per process: with several
+gunicorn workers each scrape sees one worker (the pid label tells them apart).
+
+SERVER_TIMING=1 adds a Server-Timing header with the stage breakdown of each
+request (visible in the browser's network panel). For streamed responses
+the request latency covers the time until the first byte.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Stage timings of the current request: a list shared with executor threads
+_request_stages = contextvars.ContextVar('request_stages', default=None)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        name + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._histograms = {}  # name -> {labels tuple: Histogram}
+        self._buckets = {}
+        self._counters = {}  # name -> {labels tuple: value}
+        self._gauges = {}  # name -> callable returning {labels tuple: value}
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            self._help[name] = help_text
+            self._buckets[name] = buckets
+            self._histograms.setdefault(name, {})
+
+    def counter(self, name, help_text):
+        with self._lock:
+            self._help[name] = help_text
+            self._counters.setdefault(name, {})
+
+    def gauge(self, name, help_text, collect):
+        """collect() -> {labels tuple: value}, called at scrape time"""
+        with self._lock:
+            self._help[name] = help_text
+            self._gauges[name] = collect
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def render(self):
+        """Prometheus text exposition format"""
+        pid = ('pid', os.getpid())
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series.items():
+                    labels = labels + (pid,)
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels + (pid,))} {value}")
+            gauges = list(self._gauges.items())
+
+        # Gauges are collected outside the lock; they call into other components
+        for name, collect in gauges:
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in collect().items():
+                lines.append(f"{name}{_format_labels(tuple(labels) + (pid,))} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+registry.histogram('interview_stage_seconds', 'Time spent in each request stage')
+registry.histogram('interview_http_request_seconds', 'API request latency until the response starts')
+registry.histogram('interview_http_request_bytes', 'API request body size', SIZE_BUCKETS)
+registry.histogram('interview_http_response_bytes', 'API response body size (unstreamed responses)', SIZE_BUCKETS)
+registry.counter('interview_http_errors_total', 'API responses with a 4xx or 5xx status')
+
+
+def observe_stage(name, seconds):
+    """Record a stage duration (also added to the current request's Server-Timing)"""
+    registry.observe('interview_stage_seconds', seconds, stage=name)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+
+@contextmanager
+def stage(name):
+    """Time a block of code as one stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started)
+
+
+def timed_iter(iterable, name):
+    """Yield from iterable, recording the time spent producing items as one stage"""
+    spent = 0.0
+    iterator = iter(iterable)
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                spent += time.perf_counter() - started
+                return
+            spent += time.perf_counter() - started
+            yield item
+    finally:
+        observe_stage(name, spent)
+
+
+def server_timing(stages, total):
+    """Build a Server-Timing header value; repeated stages are summed"""
+    durations = {}
+    for name, seconds in stages:
+        durations[name] = durations.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in durations.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ', '.join(parts)
+
+
+def install_metrics(app, server_timing_header=None):
+    """Time every /api/* request of a Flask app and serve /api/metrics"""
+    from flask import Response, g, request
+
+    if server_timing_header is None:
+        server_timing_header = os.environ.get('SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+
+    @app.before_request
+    def start_timer():
+        if request.path.startswith('/api/'):
+            g.metrics_started = time.perf_counter()
+            g.metrics_stages = []
+            g.metrics_token = _request_stages.set(g.metrics_stages)
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+        registry.observe(
+            'interview_http_request_seconds', elapsed,
+            route=route, method=request.method, status=response.status_code
+        )
+        if request.content_length:
+            registry.observe('interview_http_request_bytes', request.content_length, route=route)
+        if not response.is_streamed and response.content_length is not None:
+            registry.observe('interview_http_response_bytes', response.content_length, route=route)
+        if response.status_code >= 400:
+            registry.inc('interview_http_errors_total', route=route, status=response.status_code)
+
+        if server_timing_header:
+            response.headers['Server-Timing'] = server_timing(g.metrics_stages, elapsed)
+        return response
+
+    @app.teardown_request
+    def reset_stages(error=None):
+        token = g.pop('metrics_token', None)
+        if token is not None:
+            _request_stages.reset(token)
+
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    return registry
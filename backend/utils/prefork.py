@@ -0,0 +1,73 @@
+"""
+Helpers for running under a preforking server (gunicorn with preload_app,
+see gunicorn.conf.py).
+
+In preload mode the master imports the app once and forks the workers from
+it, so the question bank, compiled matchers, caches and loaded libraries are
+shared copy-on-write instead of being built in every worker. Anything that
+must not cross a fork - sqlite and Redis connections - registers with
+close_before_fork and is reopened lazily by whichever process uses it next;
+background threads register with restart_after_fork.
+"""
+import os
+import resource
+import weakref
+
+
+def close_before_fork(close):
+    """
+    Call the bound method close() in the parent right before every os.fork().
+    Only a weak reference is kept, so registering doesn't keep the owner alive.
+    """
+    method = weakref.WeakMethod(close)
+
+    def before():
+        close = method()
+        if close is not None:
+            close()
+
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(before=before)
+
+
+def memory_usage(pid='self'):
+    """
+    Memory of a process in KB: rss, plus pss / shared / private on Linux
+    (from smaps_rollup). Shared pages are counted once per process in rss but
+    split between the processes sharing them in pss.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1])
+        return {
+            'rss_kb': fields.get('Rss', 0),
+            'pss_kb': fields.get('Pss', 0),
+            'shared_kb': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+            'private_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+        }
+    except OSError:
+        if pid != 'self':
+            return {}
+        # Peak rather than current RSS; KB on Linux, bytes on macOS
+        return {'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def restart_after_fork(start):
+    """
+    Call the bound method start() in every child right after os.fork(), for
+    background threads (which don't survive a fork). Weakly referenced, like
+    close_before_fork.
+    """
+    method = weakref.WeakMethod(start)
+
+    def after_in_child():
+        start = method()
+        if start is not None:
+            start()
+
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=after_in_child)
@@ -0,0 +1,355 @@
+"""
+Resume-aware retrieval over a large question bank.
+
+Questions are loaded once from QUESTION_BANK_PATH and indexed as L2-normalised
+TF-IDF vectors, stored column-wise (for each term: the questions containing
+it and their weights). A query is built from the candidate's resume (skills,
+projects, summary) and their most recent answers; scoring every question is
+then one sparse matrix-vector product - the posting lists of the query's
+terms, weighted and summed with np.bincount - plus a per-role bias row.
+Questions already asked in the session are masked out by index.
+
+To keep a query well under a millisecond on tens of thousands of questions,
+each posting list keeps only its MAX_POSTINGS highest weights, queries use
+at most MAX_QUERY_TERMS terms, and terms found in more than MAX_DF_RATIO of
+the bank (near stop words) are left out of queries.
+
+Bank files:
+  .jsonl  one {"question": "...", "roles": ["Data Scientist", ...]} per line
+          (no roles = suitable for every role)
+  .txt    one question per line, for every role
+The role questions from the interview content file are always part of the
+index. A content build (utils/interview_content.py) saves the index arrays,
+and QuestionBank.from_arrays maps them back without re-indexing.
+
+  QUESTION_BANK_PATH  bank file (default unset: no bank, built-in questions only)
+"""
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+
+import numpy as np
+
+from utils.metrics import observe_stage
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset(
+    "a about an and are as at be been but by can could did do does for from had has have how i if in into is it "
+    "its me my of on or our so than that the their them then there these they this to us was we were what when "
+    "where which while who why will with would you your".split()
+)
+
+ROLE_MATCH_BONUS = 0.15  # Role-specific questions win ties against generic ones
+# Weight of each query source; answers decay from the most recent one
+RESUME_WEIGHTS = {'skills': 1.0, 'projects': 0.5, 'summary': 0.3}
+ANSWER_WEIGHTS = (0.8, 0.4, 0.2)
+# Turns a query reads at most: the weighted answers and the questions between them
+QUERY_TURNS = 2 * len(ANSWER_WEIGHTS)
+TOP_CHOICES = 3  # Pick randomly among the best few, so interviews don't repeat
+MAX_QUERY_TERMS = 16
+MAX_POSTINGS = 2048
+MAX_DF_RATIO = 0.1
+MIN_MAX_DF = 50
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def text_hash(text):
+    """64-bit hash of a question's text, for finding it in the bank without a dict of every text"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class QuestionBank:
+    # Array attributes that make up the index; saved and mapped back by utils/interview_content.py
+    ARRAYS = ('role_ptr', 'role_ids', 'text_hashes', 'hash_docs', 'idf', 'df', 'term_ptr',
+              'posting_docs', 'posting_weights')
+    # Cache key of the bias shared by every role the bank has no questions for
+    UNKNOWN_ROLE = None
+
+    def __init__(self, questions):
+        """questions: iterable of (text, roles) where roles is a tuple (empty = any role)"""
+        started = time.perf_counter()
+        self.texts = []
+        self.role_names = []
+        role_ids, role_counts, seen = [], [], set()
+        role_index = {}
+        for text, roles in questions:
+            text = text.strip()
+            if text and text not in seen:
+                seen.add(text)
+                self.texts.append(text)
+                roles = tuple(dict.fromkeys(roles))
+                role_counts.append(len(roles))
+                for role in roles:
+                    if role not in role_index:
+                        role_index[role] = len(self.role_names)
+                        self.role_names.append(role)
+                    role_ids.append(role_index[role])
+
+        # Roles per question, CSR style: roles of question q are role_ids[role_ptr[q]:role_ptr[q + 1]]
+        self.role_ptr = np.zeros(len(self.texts) + 1, dtype=np.int64)
+        np.cumsum(role_counts, out=self.role_ptr[1:])
+        self.role_ids = np.asarray(role_ids, dtype=np.int32)
+        # Sorted text hashes, so asked questions are found with one searchsorted
+        hashes = np.fromiter((text_hash(text) for text in self.texts), dtype=np.uint64, count=len(self.texts))
+        self.hash_docs = np.argsort(hashes, kind='stable').astype(np.int32)
+        self.text_hashes = hashes[self.hash_docs]
+
+        # Term frequencies per question, then document frequencies
+        self.vocab = {}
+        term_ids, doc_ids, counts = [], [], []
+        for doc, text in enumerate(self.texts):
+            tf = {}
+            for token in tokenize(text):
+                term = self.vocab.setdefault(token, len(self.vocab))
+                tf[term] = tf.get(term, 0) + 1
+            term_ids.extend(tf)
+            doc_ids.extend([doc] * len(tf))
+            counts.extend(tf.values())
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        n_docs = max(len(self.texts), 1)
+        df = np.bincount(term_ids, minlength=len(self.vocab))
+        self.idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+
+        # Sublinear tf-idf, L2-normalised per question
+        weights = (1 + np.log(np.asarray(counts, dtype=np.float32))) * self.idf[term_ids]
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights * weights, minlength=len(self.texts)))
+        weights = (weights / np.maximum(norms[doc_ids], 1e-12)).astype(np.float32)
+
+        # Column-compressed layout: postings of term t are [term_ptr[t], term_ptr[t + 1]),
+        # highest weight first and cut at MAX_POSTINGS, which bounds the work per query term
+        order = np.lexsort((-weights, term_ids))
+        term_ids, doc_ids, weights = term_ids[order], doc_ids[order], weights[order]
+        starts = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=starts[1:])
+        keep = np.arange(len(term_ids)) - starts[term_ids] < MAX_POSTINGS
+        self.posting_docs = doc_ids[keep]
+        self.posting_weights = weights[keep].astype(np.float64)
+        self.term_ptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.minimum(df, MAX_POSTINGS), out=self.term_ptr[1:])
+        # Terms in a large share of the bank barely separate questions, so queries skip them
+        self.max_df = max(int(n_docs * MAX_DF_RATIO), MIN_MAX_DF)
+        self.df = df
+
+        self._role_index = {role: index for index, role in enumerate(self.role_names)}
+        self._role_bias = {}
+        self._role_candidates = {}
+        self.build_seconds = time.perf_counter() - started
+
+    @classmethod
+    def from_arrays(cls, texts, terms, role_names, max_df, arrays):
+        """
+        A bank over an index saved earlier (see ARRAYS). texts and terms may be
+        any sequences, e.g. string tables over a memory-mapped file, and the
+        arrays are used as they are, so nothing is rebuilt or copied.
+        """
+        started = time.perf_counter()
+        bank = cls.__new__(cls)
+        bank.texts = texts
+        bank.role_names = list(role_names)
+        bank.vocab = {term: index for index, term in enumerate(terms)}
+        bank.max_df = max_df
+        for name in cls.ARRAYS:
+            setattr(bank, name, arrays[name])
+        bank._role_index = {role: index for index, role in enumerate(bank.role_names)}
+        bank._role_bias = {}
+        bank._role_candidates = {}
+        bank.build_seconds = time.perf_counter() - started
+        return bank
+
+    def terms(self):
+        """Vocabulary in term id order"""
+        terms = [None] * len(self.vocab)
+        for term, index in self.vocab.items():
+            terms[index] = term
+        return terms
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _role_key(self, role):
+        # Roles come from clients; only the bank's own roles get arrays of their own,
+        # so the cache is bounded by the bank, not by the names clients send
+        return role if role in self._role_index else self.UNKNOWN_ROLE
+
+    def role_bias(self, role):
+        """Per-question score offset for a role: bonus if targeted, -inf if meant for other roles"""
+        key = self._role_key(role)
+        bias = self._role_bias.get(key)
+        if bias is None:
+            counts = np.diff(self.role_ptr)
+            bias = np.where(counts > 0, -np.inf, 0.0)
+            if key is not self.UNKNOWN_ROLE:
+                owners = np.repeat(np.arange(len(counts)), counts)
+                bias[owners[self.role_ids == self._role_index[key]]] = ROLE_MATCH_BONUS
+            self._role_bias[key] = bias
+            self._role_candidates[key] = np.flatnonzero(np.isfinite(bias))
+        return bias
+
+    def query_vector(self, resume_data=None, conversation=()):
+        """{term id: weight} from the resume and the latest answers, idf-weighted and normalised"""
+        weights = {}
+
+        def add(text, weight):
+            for token in tokenize(text):
+                term = self.vocab.get(token)
+                if term is not None and self.df[term] <= self.max_df:
+                    weights[term] = weights.get(term, 0.0) + weight
+
+        if resume_data:
+            for field, weight in RESUME_WEIGHTS.items():
+                value = resume_data.get(field)
+                if isinstance(value, str):
+                    value = [value]
+                for item in value or ():
+                    add(item, weight)
+
+        answers = 0
+        for turn in reversed(conversation):
+            if answers == len(ANSWER_WEIGHTS):
+                break
+            if turn.type == 'answer':
+                add(turn.content, ANSWER_WEIGHTS[answers])
+                answers += 1
+
+        if not weights:
+            return {}
+        for term in weights:
+            weights[term] *= float(self.idf[term])
+        if len(weights) > MAX_QUERY_TERMS:
+            weights = dict(sorted(weights.items(), key=lambda item: item[1], reverse=True)[:MAX_QUERY_TERMS])
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {term: w / norm for term, w in weights.items()}
+
+    def index_of(self, text):
+        """Bank index of a question, or None if it isn't in the bank"""
+        found = self.lookup([text])
+        return found[0] if found else None
+
+    def asked(self, conversation):
+        """Bank indexes of the questions in a conversation (one vectorised hash lookup)"""
+        return self.lookup([turn.content for turn in conversation if turn.type == 'question'])
+
+    def lookup(self, texts):
+        """Bank indexes of those texts that are bank questions"""
+        if not texts or not len(self.text_hashes):
+            return []
+        hashes = np.fromiter((text_hash(text) for text in texts), dtype=np.uint64, count=len(texts))
+        slots = np.minimum(np.searchsorted(self.text_hashes, hashes), len(self.text_hashes) - 1)
+        # The slot's question is the asked one only if its text matches (not in the bank, or a collision)
+        return [doc for text, doc in zip(texts, self.hash_docs[slots].tolist()) if self.texts[doc] == text]
+
+    def scores(self, role, query, exclude=()):
+        """Score of every question: sparse matrix-vector product plus the role bias"""
+        scores = self.role_bias(role).copy()
+        ptr, docs, weights = self.term_ptr, self.posting_docs, self.posting_weights
+        for term, weight in query.items():
+            # A question appears at most once per posting list, so plain fancy-index += is exact
+            start, end = ptr[term], ptr[term + 1]
+            scores[docs[start:end]] += weights[start:end] * weight
+        if len(exclude):
+            scores[exclude] = -np.inf
+        return scores
+
+    def _top(self, scores, k):
+        """Indexes of the k best finite scores, best first (k argmax passes beat a full partition for small k)"""
+        top = []
+        for _ in range(min(k, len(scores))):
+            doc = int(scores.argmax())
+            if not np.isfinite(scores[doc]):
+                break
+            top.append((doc, scores[doc]))
+            scores[doc] = -np.inf
+        for doc, score in top:
+            scores[doc] = score
+        return [doc for doc, _ in top]
+
+    def rank(self, role, resume_data=None, conversation=(), k=TOP_CHOICES, exclude=None):
+        """Up to k (score, question) pairs, best first"""
+        if exclude is None:
+            exclude = self.asked(conversation)
+        scores = self.scores(role, self.query_vector(resume_data, conversation), list(exclude))
+        return [(float(scores[doc]), self.texts[doc]) for doc in self._top(scores, k)]
+
+    def pick(self, role, resume_data=None, conversation=(), rng=random, exclude=None):
+        """
+        A question for the next turn: one of the best matches for the resume
+        and answers, or a random unasked question for the role when nothing
+        matches. None if every question for the role has been asked.
+        exclude is the bank indexes already asked, as the session keeps them;
+        without it they are looked up from the conversation's questions.
+        """
+        started = time.perf_counter()
+        try:
+            bias = self.role_bias(role)
+            query = self.query_vector(resume_data, conversation)
+            if exclude is None:
+                exclude = self.asked(conversation)
+            excluded = exclude if isinstance(exclude, (set, frozenset)) else set(exclude)
+            exclude = list(excluded)
+            if query:
+                scores = self.scores(role, query, exclude)
+                # Only questions sharing at least one term score above their bias
+                matched = [doc for doc in self._top(scores, TOP_CHOICES) if scores[doc] > bias[doc]]
+                if matched:
+                    return self.texts[rng.choice(matched)]
+
+            # No overlap with the resume/answers: any unasked question for this role
+            candidates = self._role_candidates[self._role_key(role)]
+            for _ in range(8):
+                if not len(candidates):
+                    break
+                doc = int(candidates[rng.randrange(len(candidates))])
+                if doc not in excluded:
+                    return self.texts[doc]
+            remaining = [int(doc) for doc in candidates if doc not in excluded]
+            return self.texts[rng.choice(remaining)] if remaining else None
+        finally:
+            observe_stage('question_retrieval', time.perf_counter() - started)
+
+    def stats(self):
+        return {
+            'questions': len(self.texts),
+            'terms': len(self.vocab),
+            'postings': int(len(self.posting_docs)),
+            'max_query_df': self.max_df,
+            'build_seconds': round(self.build_seconds, 3)
+        }
+
+
+def load_questions(path):
+    """Yield (text, roles) from a .jsonl or .txt bank file"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    yield entry['question'], tuple(entry.get('roles') or ())
+        else:
+            for line in f:
+                yield line, ()
+
+
+def build_question_bank(role_questions, path=None):
+    """Index the bank file at path / QUESTION_BANK_PATH plus the role questions (None if unset)"""
+    path = path or os.environ.get('QUESTION_BANK_PATH')
+    if not path:
+        return None
+
+    def questions():
+        for role, texts in role_questions.items():
+            for text in texts:
+                yield text, (role,)
+        yield from load_questions(path)
+
+    bank = QuestionBank(questions())
+    print(f"❓ Question bank: {len(bank)} questions, {len(bank.vocab)} terms in {bank.build_seconds:.2f}s")
+    return bank
@@ -0,0 +1,224 @@
+"""
+Bulk resume ingestion.
+
+Files (or zip archives of files) are parsed in parallel on a process pool,
+since PDF extraction is CPU-bound and holds the GIL. Results are yielded as
+each file finishes, one dict per file, and a failure in one file never
+stops the batch.
+
+Uploads are read lazily: the batch is checked up front against
+MAX_BATCH_FILES and MAX_BATCH_BYTES using file sizes and the sizes declared
+in zip directories (which zipfile enforces while inflating), and each file
+is only read, or inflated, when it is handed to the pool.
+
+  RESUME_BATCH_MAX_FILES       files per batch, zip members included (default 500)
+  RESUME_BATCH_MAX_FILE_BYTES  largest single file (default 10 MB)
+  RESUME_BATCH_MAX_BYTES       all files of a batch together, uncompressed (default 100 MB)
+  RESUME_BATCH_WORKERS         parser processes (default: CPU count)
+
+CLI (from the backend directory), prints one JSON object per line:
+  python -m utils.resume_batch resumes.zip more/*.pdf [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+from io import BytesIO
+
+from werkzeug.datastructures import FileStorage
+
+MAX_BATCH_FILES = int(os.environ.get('RESUME_BATCH_MAX_FILES', 500))
+MAX_FILE_BYTES = int(os.environ.get('RESUME_BATCH_MAX_FILE_BYTES', 10 * 1024 * 1024))
+MAX_BATCH_BYTES = int(os.environ.get('RESUME_BATCH_MAX_BYTES', 100 * 1024 * 1024))
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def parse_resume_bytes(filename, data):
+    """Parse one resume in a worker process; never raises"""
+    # Imported in the worker so the parent doesn't pay for it until needed
+    from utils.resume_parser import parse_resume
+
+    try:
+        resume_data = parse_resume(FileStorage(stream=BytesIO(data), filename=filename))
+        return {'filename': filename, 'success': True, 'resume_data': resume_data}
+    except Exception as e:
+        return {'filename': filename, 'success': False, 'error': str(e)}
+
+
+def _file_size(file):
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def _read_file(file):
+    def read():
+        file.seek(0)
+        return file.read()
+    return read
+
+
+def _read_member(archive, info):
+    def read():
+        return archive.read(info)
+    return read
+
+
+def expand_uploads(uploads):
+    """
+    Turn (filename, seekable file) uploads into (filename, entry) pairs,
+    listing the members of zip archives. An entry is a callable that reads
+    the file's bytes when called, or an error string for oversized or
+    unreadable files so they are reported per file. Nothing is read or
+    inflated here; raises ValueError if the batch has too many files or
+    too many bytes in total.
+    """
+    entries = []
+    total_bytes = 0
+    for filename, file in uploads:
+        if filename.lower().endswith('.zip'):
+            try:
+                # The archive stays open until its members have been read
+                archive = zipfile.ZipFile(file)
+            except zipfile.BadZipFile as e:
+                entries.append((filename, f"Invalid zip archive: {e}"))
+                continue
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or os.path.basename(name).startswith('.'):
+                    continue
+                if not name.lower().endswith(RESUME_EXTENSIONS):
+                    continue
+                label = f"{filename}/{name}"
+                if info.file_size > MAX_FILE_BYTES:
+                    entries.append((label, f"File exceeds {MAX_FILE_BYTES} bytes"))
+                else:
+                    entries.append((label, _read_member(archive, info)))
+                    total_bytes += info.file_size
+        else:
+            size = _file_size(file)
+            if size > MAX_FILE_BYTES:
+                entries.append((filename, f"File exceeds {MAX_FILE_BYTES} bytes"))
+            else:
+                entries.append((filename, _read_file(file)))
+                total_bytes += size
+
+        if len(entries) > MAX_BATCH_FILES:
+            raise ValueError(f"Batch exceeds {MAX_BATCH_FILES} files")
+        if total_bytes > MAX_BATCH_BYTES:
+            raise ValueError(f"Batch exceeds {MAX_BATCH_BYTES} bytes")
+    return entries
+
+
+def get_pool():
+    """Process pool shared by every batch in this worker, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.environ.get('RESUME_BATCH_WORKERS', os.cpu_count() or 2))
+            # spawn avoids forking a multi-threaded server process
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _reset_pool(broken):
+    """Discard the shared pool if it is still the broken one (another batch may have replaced it)"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def parse_batch(entries, pool=None, window=32):
+    """
+    Yield a result dict per entry as soon as it is parsed (completion order).
+    Only `window` files are in flight at once, and each is read just before
+    it is submitted, so a large batch is never in memory (or pickled to the
+    workers) all at the same time.
+    """
+    shared = pool is None
+    pending = {}
+    queue = iter(enumerate(entries))
+
+    def submit(filename, data):
+        nonlocal pool
+        if shared:
+            pool = get_pool()
+        try:
+            return pool.submit(parse_resume_bytes, filename, data)
+        except BrokenProcessPool:
+            if not shared:
+                raise
+            # A previous crash took the shared pool down; start a fresh one
+            _reset_pool(pool)
+            pool = get_pool()
+            return pool.submit(parse_resume_bytes, filename, data)
+
+    def refill():
+        for index, (filename, data) in queue:
+            if isinstance(data, str):
+                # Already failed during expansion
+                yield {'index': index, 'filename': filename, 'success': False, 'error': data}
+                continue
+            if callable(data):
+                try:
+                    data = data()
+                except (zipfile.BadZipFile, OSError, EOFError, RuntimeError, NotImplementedError) as e:
+                    # Damaged member, wrong declared size, encrypted or unsupported compression
+                    yield {'index': index, 'filename': filename, 'success': False, 'error': f"Unreadable file: {e}"}
+                    continue
+            try:
+                pending[submit(filename, data)] = (index, filename)
+            except BrokenProcessPool as e:
+                yield {'index': index, 'filename': filename, 'success': False, 'error': str(e)}
+                continue
+            if len(pending) >= window:
+                return
+
+    yield from refill()
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, filename = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                # A crashed worker (e.g. a PDF that kills the parser) only fails its in-flight files
+                result = {'filename': filename, 'success': False, 'error': f"Worker failed: {e}"}
+            result['index'] = index
+            yield result
+        yield from refill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parse many resumes and print NDJSON results')
+    parser.add_argument('paths', nargs='+', help='Resume files or zip archives')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args(argv)
+
+    failed = 0
+    with ExitStack() as files, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        uploads = [(os.path.basename(path), files.enter_context(open(path, 'rb'))) for path in args.paths]
+        for result in parse_batch(expand_uploads(uploads), pool=pool):
+            failed += not result['success']
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
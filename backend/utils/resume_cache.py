@@ -0,0 +1,145 @@
+"""
+Cache of parsed resumes keyed by the SHA-256 of the uploaded bytes.
+
+Entries are namespaced by the parser fingerprint (parser version, extractor
+source code, skill taxonomy and extraction budget), so any change to those
+makes old entries unreachable and they are pruned on startup.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from utils.prefork import close_before_fork
+
+
+class ResumeCache:
+    """Bounded in-memory LRU in front of an optional SQLite table"""
+
+    def __init__(self, namespace, max_entries=256, db_path=None, max_rows=10000):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self._entries = OrderedDict()  # key -> JSON string (immutable, so callers can't mutate cached data)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        close_before_fork(self._close_connection)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = self._conn()
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS resume_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS resume_cache_created ON resume_cache (created_at)')
+            # Entries from an older parser or taxonomy can never be hit again
+            conn.execute('DELETE FROM resume_cache WHERE namespace != ?', (self.namespace,))
+
+    def _close_connection(self):
+        # Before a fork: the child must open its own connection, never share this one
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def make_key(self, data, filename=''):
+        # The extension decides which parser runs, so it is part of the key
+        extension = os.path.splitext(filename.lower())[1]
+        digest = hashlib.sha256(data).hexdigest()
+        return f"{self.namespace}:{extension}:{digest}"
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+
+        payload = None
+        if self.db_path:
+            try:
+                row = self._conn().execute(
+                    'SELECT data FROM resume_cache WHERE key = ?', (key,)
+                ).fetchone()
+                payload = row[0] if row else None
+            except sqlite3.Error as e:
+                print(f"Resume cache read failed: {e}")
+
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_memory(key, payload)
+        return json.loads(payload)
+
+    def put(self, key, resume_data):
+        payload = json.dumps(resume_data)
+        with self._lock:
+            self._store_memory(key, payload)
+        if not self.db_path:
+            return
+        try:
+            conn = self._conn()
+            conn.execute(
+                'INSERT OR REPLACE INTO resume_cache (key, namespace, data, created_at) VALUES (?, ?, ?, ?)',
+                (key, self.namespace, payload, time.time())
+            )
+            # Keep the table bounded by dropping the oldest rows
+            conn.execute(
+                '''DELETE FROM resume_cache WHERE key IN (
+                       SELECT key FROM resume_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                   )''',
+                (self.max_rows,)
+            )
+        except sqlite3.Error as e:
+            print(f"Resume cache write failed: {e}")
+
+    def _store_memory(self, key, payload):
+        # Caller must hold the lock
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk_enabled': bool(self.db_path)
+            }
+
+
+def create_resume_cache(namespace):
+    """Build the process-wide cache from environment settings"""
+    return ResumeCache(
+        namespace,
+        max_entries=int(os.environ.get('RESUME_CACHE_ENTRIES', 256)),
+        # Set RESUME_CACHE_PATH='' to keep the cache in memory only
+        db_path=os.environ.get('RESUME_CACHE_PATH', os.path.join('instance', 'resume_cache.db')) or None,
+        max_rows=int(os.environ.get('RESUME_CACHE_MAX_ROWS', 10000))
+    )
@@ -1,58 +1,229 @@
-import PyPDF2
-from docx import Document
 import re
 import os
+import sys
+import time
+import types
+import codecs
+import hashlib
+from utils.skill_matcher import build_skill_matcher
+from utils.resume_cache import create_resume_cache
+from utils.metrics import observe_stage, stage, timed_iter
+from utils.resume_sections import PREAMBLE, heading_of, iter_normalized_lines, normalize_text, segment_sections
+
+# Compiled once at import; see utils/skill_matcher.py for loading a larger taxonomy
+skill_matcher = build_skill_matcher()
+
+# Streaming extraction reads files and scans for skills in blocks of about this many characters
+STREAM_CHUNK_SIZE = 4096
+
+JOB_TITLES = [
+    'developer', 'engineer', 'analyst', 'manager', 'director', 'specialist',
+    'consultant', 'architect', 'designer', 'scientist'
+]
+
+# Every extraction pattern is compiled once here. Quantifiers are bounded
+# (or cover single-character classes only), so no pattern can backtrack
+# super-linearly on long or adversarial input.
+PATTERNS = {
+    'years': re.compile(r'(?<!\d)(\d{1,2}\+?[ \t]{0,3}(?:years?|yrs?))(?!\w)', re.IGNORECASE),
+    'job_title': re.compile(r'\b(' + '|'.join(JOB_TITLES) + r')\b', re.IGNORECASE),
+    'education': re.compile(
+        r'\b(?:university|college|institute|school|bachelor|master|mba|phd|doctorate'
+        r'|associate|diploma|certificate|ph\.?d\.?|[bm]\.?[sa]\.?(?!\w))',
+        re.IGNORECASE
+    ),
+    'project_separator': re.compile(r'\n[ \t]*[•\-*][ \t]*|\n[ \t]*\d{1,3}\.[ \t]*'),
+    'contact': re.compile(r'name|address|phone|email', re.IGNORECASE)
+}
+
+# Bump when extraction output changes in a way the source hash below wouldn't catch
+# (e.g. a library upgrade)
+PARSER_VERSION = '3'
+
+def extraction_modules():
+    """
+    Source files of this module and of every utils module it uses, directly or
+    through another one (sections, skill matcher, ...), found by following
+    imports rather than kept as a list that has to be remembered. Catching a
+    module that doesn't shape the output only costs a re-parse.
+    """
+    pending, seen = [__name__], set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        for value in vars(sys.modules[name]).values():
+            module = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+            if isinstance(module, str) and module.startswith('utils.') and module in sys.modules:
+                pending.append(module)
+    return sorted(sys.modules[name].__file__ for name in seen)
+
+def parser_fingerprint():
+    """Identifies everything that shapes parse output: code, taxonomy and budget"""
+    digest = hashlib.sha256(PARSER_VERSION.encode('utf-8'))
+    for module_path in extraction_modules():
+        with open(module_path, 'rb') as f:
+            digest.update(f.read())
+    digest.update(skill_matcher.fingerprint.encode('utf-8'))
+    budget = ExtractionBudget.from_env()
+    digest.update(f"{budget.max_pages}:{budget.max_bytes}".encode('utf-8'))
+    return digest.hexdigest()[:16]
 
 def parse_resume(file):
     """
     Parse resume file and extract key information
     Supports PDF, DOCX, and TXT files
+    Re-uploads of the same file are answered from the resume cache
     """
+    with stage('resume_cache_lookup'):
+        file.seek(0)
+        data = file.read()
+        key = resume_cache.make_key(data, file.filename)
+        cached = resume_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    file.seek(0)
+    budget = ExtractionBudget.from_env()
+    with stage('resume_parse'):
+        resume_data = parse_resume_uncached(file, budget)
+    # A parse cut short by the time budget depends on load, not on the file: don't keep it
+    if budget.stop_reason != 'time':
+        with stage('resume_cache_store'):
+            resume_cache.put(key, resume_data)
+    return resume_data
+
+def parse_resume_uncached(file, budget=None):
+    """Parse resume file without consulting the cache"""
     filename = file.filename.lower()
     
     if filename.endswith('.pdf'):
-        return parse_pdf(file)
+        return parse_pdf(file, budget)
     elif filename.endswith('.docx'):
-        return parse_docx(file)
+        return parse_docx(file, budget)
     elif filename.endswith('.txt'):
-        return parse_txt(file)
+        return parse_txt(file, budget)
     else:
         # Try to parse as text if format not recognized
         try:
-            return parse_txt(file)
+            return parse_txt(file, budget)
         except:
             raise ValueError("Unsupported file format. Please use PDF, DOCX, or TXT.")
 
-def parse_pdf(file):
+class ExtractionBudget:
+    """
+    Limits for streaming extraction. Any limit can be None (unlimited).
+    max_pages only applies to PDFs; max_bytes counts extracted characters.
+    """
+    
+    def __init__(self, max_pages=None, max_bytes=None, max_seconds=None):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.stop_reason = None
+    
+    @classmethod
+    def from_env(cls):
+        def limit(name, default):
+            value = int(os.environ.get(name, default))
+            return value if value > 0 else None
+        return cls(
+            max_pages=limit('RESUME_MAX_PAGES', 10),
+            max_bytes=limit('RESUME_MAX_BYTES', 200000),
+            max_seconds=limit('RESUME_MAX_SECONDS', 5)
+        )
+    
+    def limit(self, chunks):
+        """Pass chunks through until the byte or time budget runs out"""
+        started = time.monotonic()
+        consumed = 0
+        for chunk in chunks:
+            if self.max_seconds is not None and time.monotonic() - started > self.max_seconds:
+                self.stop_reason = 'time'
+                return
+            if self.max_bytes is not None and consumed + len(chunk) > self.max_bytes:
+                # Keep the part of the chunk that still fits
+                chunk = chunk[:self.max_bytes - consumed]
+                self.stop_reason = 'bytes'
+                if chunk:
+                    yield chunk
+                return
+            consumed += len(chunk)
+            yield chunk
+
+def load_document_libraries():
+    """
+    Import the PDF and DOCX libraries now. They are otherwise imported on the
+    first upload of each type, so workers that never parse a resume don't pay
+    for them; a preforking server calls this once before forking instead.
+    """
+    import PyPDF2
+    import docx
+
+def iter_pdf_chunks(file, max_pages=None):
+    """Yield the text of one PDF page at a time"""
+    import PyPDF2
+    
+    file.seek(0)  # Reset file pointer
+    pdf_reader = PyPDF2.PdfReader(file)
+    for i, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and i >= max_pages:
+            return
+        yield (page.extract_text() or "") + "\n"
+
+def iter_docx_chunks(file, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield DOCX paragraph text, grouped into chunks of roughly chunk_size characters"""
+    from docx import Document
+    
+    file.seek(0)  # Reset file pointer
+    doc = Document(file)
+    parts = []
+    size = 0
+    for paragraph in doc.paragraphs:
+        parts.append(paragraph.text)
+        size += len(paragraph.text) + 1
+        if size >= chunk_size:
+            yield "\n".join(parts) + "\n"
+            parts = []
+            size = 0
+    if parts:
+        yield "\n".join(parts) + "\n"
+
+def iter_txt_chunks(file, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield UTF-8 text in blocks without reading the whole file up front"""
+    file.seek(0)  # Reset file pointer
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        block = file.read(chunk_size)
+        if not block:
+            break
+        text = decoder.decode(block)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def parse_pdf(file, budget=None):
     """Parse PDF resume"""
     try:
-        file.seek(0)  # Reset file pointer
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return extract_key_info(text)
+        budget = budget or ExtractionBudget.from_env()
+        return extract_key_info_stream(iter_pdf_chunks(file, budget.max_pages), budget)
     except Exception as e:
         raise Exception(f"Error parsing PDF: {str(e)}")
 
-def parse_docx(file):
+def parse_docx(file, budget=None):
     """Parse DOCX resume"""
     try:
-        file.seek(0)  # Reset file pointer
-        doc = Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return extract_key_info(text)
+        return extract_key_info_stream(iter_docx_chunks(file), budget)
     except Exception as e:
         raise Exception(f"Error parsing DOCX: {str(e)}")
 
-def parse_txt(file):
+def parse_txt(file, budget=None):
     """Parse TXT resume"""
     try:
-        file.seek(0)  # Reset file pointer
-        text = file.read().decode('utf-8')
-        return extract_key_info(text)
+        return extract_key_info_stream(iter_txt_chunks(file), budget)
     except Exception as e:
         raise Exception(f"Error parsing TXT: {str(e)}")
 
@@ -60,151 +231,308 @@ def extract_key_info(text):
     """
     Extract key information from resume text
     """
-    # Clean the text
-    text = re.sub(r'\s+', ' ', text)
+    # Clean the text, keeping line breaks so sections can be found
+    text = normalize_text(text)
+    sections = segment_sections(text)
     
     info = {
-        'skills': extract_skills(text),
-        'experience': extract_experience(text),
-        'education': extract_education(text),
-        'projects': extract_projects(text),
-        'summary': extract_summary(text),
-        'raw_text': text[:1000]  # First 1000 chars for context
+        'skills': extract_skills(text, sections),
+        'experience': extract_experience(text, sections),
+        'education': extract_education(text, sections),
+        'projects': extract_projects(text, sections),
+        'summary': extract_summary(text, sections),
+        'raw_text': ' '.join(text[:2000].split())[:1000]  # First 1000 chars for context
     }
     
     return info
 
-def extract_skills(text):
-    """Extract technical and professional skills"""
-    # Common skills database
-    technical_skills = [
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust',
-        'react', 'angular', 'vue', 'node.js', 'django', 'flask', 'spring', 'express',
-        'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'oracle',
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'ci/cd',
-        'machine learning', 'ai', 'data analysis', 'tableau', 'power bi', 'excel',
-        'photoshop', 'figma', 'sketch', 'adobe xd', 'ui/ux design',
-        'salesforce', 'hubspot', 'seo', 'sem', 'google analytics', 'wordpress'
-    ]
-    
-    professional_skills = [
-        'project management', 'agile', 'scrum', 'kanban', 'leadership', 'team management',
-        'communication', 'problem solving', 'critical thinking', 'public speaking',
-        'client relations', 'negotiation', 'strategic planning', 'budget management'
-    ]
-    
-    all_skills = technical_skills + professional_skills
-    found_skills = []
-    
-    for skill in all_skills:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
-            found_skills.append(skill.title())
-    
-    return list(set(found_skills))[:15]  # Remove duplicates and limit
-
-def extract_experience(text):
+class _StreamingExtraction:
+    """
+    extract_key_info one normalized line at a time. Each field keeps only
+    the state it needs, so reading a document is linear in its length, and
+    settled() says when no further text could change any field. Fields that
+    come from a section (years in Experience, Education lines, Projects
+    items, the Summary) only settle on text from that section. finish()
+    always equals extract_key_info on the lines added.
+    """
+    
+    def __init__(self):
+        self.section = PREAMBLE
+        self.filled = set()  # Sections with a non-blank line
+        self.head = []  # Leading lines, for raw_text
+        self.head_size = 0
+        # Skills: text not scanned yet, after one character of context for the word boundary
+        self.skill_text = []
+        self.skill_start = 0
+        self.skill_size = 0
+        self.skill_guard = 2 * skill_matcher.max_length + 1
+        self.skills = {}
+        self.section_years = None
+        self.text_years = None
+        self.titles = set()
+        # [line, next line or None] for lines with an education keyword
+        self.section_education = []
+        self.text_education = []
+        self.projects = []
+        self.project_item = None  # Lines of the item being read
+        self.summary = ''
+        self.preamble_head = []
+        self.text_head = []
+    
+    def add(self, line):
+        if self.head_size <= 2000:
+            self.head.append(line)
+            self.head_size += len(line) + 1
+        if len(self.text_head) < 5:
+            self.text_head.append(line)
+        
+        if len(self.skills) < 15:
+            piece = '\n' + line if self.skill_text else line
+            self.skill_text.append(piece)
+            self.skill_size += len(piece)
+            if self.skill_size >= STREAM_CHUNK_SIZE + self.skill_guard:
+                self._scan_skills()
+        
+        # Whole-text fallbacks, used when a field's section is missing
+        if self.text_years is None:
+            match = PATTERNS['years'].search(line)
+            if match:
+                self.text_years = match.group(1).lower().title()
+        if len(self.titles) < len(JOB_TITLES):
+            self.titles.update(match.group(1).lower() for match in PATTERNS['job_title'].finditer(line))
+        self._add_education(self.text_education, line)
+        
+        heading = heading_of(line)
+        if heading:
+            self.section, line = heading
+            if not line:
+                return
+        self._add_to_section(line)
+    
+    def _add_to_section(self, line):
+        section = self.section
+        if line:
+            self.filled.add(section)
+        if section == 'experience':
+            if self.section_years is None:
+                match = PATTERNS['years'].search(line)
+                if match:
+                    self.section_years = match.group(1).lower().title()
+        elif section == 'education':
+            self._add_education(self.section_education, line)
+        elif section == 'projects':
+            self._add_project_line(line)
+        elif section == 'summary':
+            if len(self.summary) < 300 and line:
+                self.summary = ' '.join([self.summary, *line.split()] if self.summary else line.split())
+        elif section == PREAMBLE and len(self.preamble_head) < 5:
+            self.preamble_head.append(line)
+    
+    def _add_education(self, entries, line):
+        # The line after a keyword line is shown with it
+        if entries and entries[-1][1] is None:
+            entries[-1][1] = line
+        if len(entries) < 3 and PATTERNS['education'].search(line):
+            entries.append([line, None])
+    
+    def _add_project_line(self, line):
+        if len(self.projects) == 5:
+            return
+        # Same items as splitting '\n' + section on PATTERNS['project_separator']
+        match = PATTERNS['project_separator'].match('\n' + line)
+        if match:
+            self._finish_project()
+            self.project_item = [('\n' + line)[match.end():]]
+        elif self.project_item is None:
+            self.project_item = [line]
+        else:
+            self.project_item.append(line)
+    
+    def _finish_project(self):
+        if self.project_item is not None:
+            item = '\n'.join(self.project_item).strip()
+            if len(item) > 20 and len(self.projects) < 5:  # Meaningful project description
+                self.projects.append(item[:200])  # Limit length
+            self.project_item = None
+    
+    def _scan_skills(self, final=False):
+        text = ''.join(self.skill_text)
+        # A match starting in the last skill_guard characters could still grow with the next line
+        end = len(text) if final else len(text) - self.skill_guard
+        if end <= self.skill_start:
+            return
+        for name in skill_matcher.find(text, self.skill_start, end):
+            if len(self.skills) == 15:
+                break
+            self.skills[name] = True
+        self.skill_text = [text[end - 1:]]
+        self.skill_start = 1
+        self.skill_size = len(text) - end
+    
+    def settled(self):
+        """True once more text could no longer change any field"""
+        return (
+            len(self.skills) == 15
+            and self.section_years is not None
+            and len(self.section_education) == 3 and self.section_education[-1][1] is not None
+            and len(self.projects) == 5
+            and len(self.summary) >= 300
+            and self.head_size > 2000
+        )
+    
+    def finish(self):
+        """The extracted fields, once every line has been added"""
+        if len(self.skills) < 15:
+            self._scan_skills(final=True)
+        
+        experience = self.section_years or self.text_years
+        if experience is None:
+            experience = [title.title() for title in JOB_TITLES if title in self.titles][:3] or "Experience details found"
+        
+        entries = self.section_education if 'education' in self.filled else self.text_education
+        education = [line + (" | " + following if following is not None and len(following) > 10 else "")
+                     for line, following in entries]
+        
+        projects = []
+        if 'projects' in self.filled:
+            self._finish_project()
+            projects = self.projects
+        
+        summary = None
+        if len(self.summary) > 10:
+            summary = self.summary[:300]  # Limit length
+        else:
+            # Fallback: first few lines that seem like a summary
+            lines = self.preamble_head if PREAMBLE in self.filled else self.text_head
+            for line in lines:
+                if len(line) > 20 and not PATTERNS['contact'].search(line):
+                    summary = line[:200]
+                    break
+        
+        return {
+            'skills': list(self.skills),
+            'experience': experience,
+            'education': education or ["Education information found"],
+            'projects': projects or ["Project experience detailed in resume"],
+            'summary': summary or "Professional summary available in resume",
+            'raw_text': ' '.join('\n'.join(self.head)[:2000].split())[:1000]  # First 1000 chars for context
+        }
+
+def extract_key_info_stream(chunks, budget=None):
+    """
+    Extract key information from an iterator of text chunks (pages/paragraphs).
+    The text is normalized and split into sections line by line as it arrives,
+    and reading stops as soon as every field is settled or the budget is spent,
+    so later pages of a long resume are never extracted. The result is the
+    same as extract_key_info on the text that was read.
+    """
+    budget = budget or ExtractionBudget.from_env()
+    extraction = _StreamingExtraction()
+    field_seconds = 0.0
+    
+    # Text extraction (PDF/DOCX decoding) and field extraction are timed as separate stages
+    for line in iter_normalized_lines(timed_iter(budget.limit(chunks), 'resume_text_extraction')):
+        started = time.perf_counter()
+        extraction.add(line)
+        settled = extraction.settled()
+        field_seconds += time.perf_counter() - started
+        if settled:
+            budget.stop_reason = 'complete'
+            break
+    
+    started = time.perf_counter()
+    result = extraction.finish()
+    observe_stage('resume_field_extraction', field_seconds + time.perf_counter() - started)
+    
+    return result
+
+def extract_skills(text, sections=None):
+    """Extract technical and professional skills (single pass over the text)"""
+    return skill_matcher.skills(text, limit=15)
+
+def extract_experience(text, sections=None):
     """Extract work experience information"""
-    # Look for experience patterns
-    experience_patterns = [
-        r'(\d+[\+\+]?\s*(?:years?|yrs?))',
-        r'experience.*?(\d+[\+\+]?\s*(?:years?|yrs?))',
-        r'(\d+[\+\+]?\s*(?:years?|yrs?)).*?experience'
-    ]
-    
-    for pattern in experience_patterns:
-        matches = re.findall(pattern, text.lower())
-        if matches:
-            return matches[0].title()
-    
-    # Look for job titles and companies
-    job_titles = [
-        'developer', 'engineer', 'analyst', 'manager', 'director', 'specialist',
-        'consultant', 'architect', 'designer', 'scientist'
-    ]
-    
-    found_titles = []
-    for title in job_titles:
-        if re.search(r'\b' + title + r'\b', text.lower()):
-            found_titles.append(title.title())
+    sections = sections if sections is not None else segment_sections(text)
+    
+    # Prefer a years-of-experience figure from the experience section
+    for source in (sections.get('experience'), text):
+        if source:
+            match = PATTERNS['years'].search(source)
+            if match:
+                return match.group(1).lower().title()
+    
+    # Look for job titles, reported in the order of JOB_TITLES
+    found = {match.group(1).lower() for match in PATTERNS['job_title'].finditer(text)}
+    found_titles = [title.title() for title in JOB_TITLES if title in found]
     
     return found_titles[:3] if found_titles else "Experience details found"
 
-def extract_education(text):
+def extract_education(text, sections=None):
     """Extract education information"""
-    # FIXED: Use raw strings for regex patterns
-    education_keywords = [
-        'university', 'college', 'institute', 'school',
-        'bachelor', r'b\.?s\.?', r'b\.?a\.?',
-        'master', r'm\.?s\.?', r'm\.?a\.?', 'mba',
-        'phd', r'ph\.?d\.?', 'doctorate',
-        'associate', 'diploma', 'certificate'
-    ]
-    
-    # Look for education section
-    lines = text.split('\n')
+    sections = sections if sections is not None else segment_sections(text)
+    
+    # Only scan the education section when the resume has one; a single
+    # finditer pass locates keyword lines instead of one search per line
+    source = sections.get('education') or text
     education_lines = []
+    line_end = -1
+    
+    for match in PATTERNS['education'].finditer(source):
+        if match.start() <= line_end:
+            continue  # Keyword on a line we already took
+        line_start = source.rfind('\n', 0, match.start()) + 1
+        line_end = source.find('\n', match.start())
+        line_end = len(source) if line_end == -1 else line_end
+        education_line = source[line_start:line_end].strip()
+        
+        next_end = source.find('\n', line_end + 1)
+        next_line = source[line_end + 1:len(source) if next_end == -1 else next_end].strip()
+        if len(next_line) > 10:
+            education_line += " | " + next_line
+        education_lines.append(education_line)
+        if len(education_lines) == 3:
+            break
     
-    for i, line in enumerate(lines):
-        line_lower = line.lower()
-        if any(re.search(keyword, line_lower) for keyword in education_keywords if '.' in keyword):
-            education_line = line.strip()
-            if i + 1 < len(lines) and len(lines[i + 1].strip()) > 10:
-                education_line += " | " + lines[i + 1].strip()
-            education_lines.append(education_line)
-        elif any(keyword in line_lower for keyword in education_keywords if '.' not in keyword):
-            education_line = line.strip()
-            if i + 1 < len(lines) and len(lines[i + 1].strip()) > 10:
-                education_line += " | " + lines[i + 1].strip()
-            education_lines.append(education_line)
-    
-    return education_lines[:3] if education_lines else ["Education information found"]
-
-def extract_projects(text):
+    return education_lines if education_lines else ["Education information found"]
+
+def extract_projects(text, sections=None):
     """Extract project information"""
-    # Look for project sections
-    project_sections = re.findall(
-        r'projects?:(.*?)(?:\n\s*\n|\n[A-Z]|$)',
-        text, 
-        re.IGNORECASE | re.DOTALL
-    )
-    
-    if project_sections:
+    sections = sections if sections is not None else segment_sections(text)
+    section = sections.get('projects')
+    
+    if section:
         projects = []
-        for section in project_sections:
-            # Split by likely project separators
-            project_items = re.split(r'\n\s*[•\-*]\s*|\n\s*\d+\.\s*', section)
-            for item in project_items:
-                item = item.strip()
-                if len(item) > 20:  # Meaningful project description
-                    projects.append(item[:200])  # Limit length
-        return projects[:5]
+        # Split by likely project separators
+        for item in PATTERNS['project_separator'].split('\n' + section):
+            item = item.strip()
+            if len(item) > 20:  # Meaningful project description
+                projects.append(item[:200])  # Limit length
+                if len(projects) == 5:
+                    break
+        if projects:
+            return projects
     
     return ["Project experience detailed in resume"]
 
-def extract_summary(text):
+def extract_summary(text, sections=None):
     """Extract summary or objective section"""
-    # Look for summary/objective sections
-    summary_patterns = [
-        r'summary[:\s]*(.*?)(?:\n\s*\n|\n[A-Z]|$)',
-        r'objective[:\s]*(.*?)(?:\n\s*\n|\n[A-Z]|$)',
-        r'profile[:\s]*(.*?)(?:\n\s*\n|\n[A-Z]|$)'
-    ]
-    
-    for pattern in summary_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-        if matches:
-            summary = matches[0].strip()
-            if len(summary) > 10:
-                return summary[:300]  # Limit length
+    sections = sections if sections is not None else segment_sections(text)
+    
+    summary = ' '.join(sections.get('summary', '').split())
+    if len(summary) > 10:
+        return summary[:300]  # Limit length
     
     # Fallback: first few lines that seem like a summary
-    lines = text.split('\n')
+    lines = sections[PREAMBLE].split('\n') if sections.get(PREAMBLE) else text.split('\n')
     for line in lines[:5]:
-        if len(line.strip()) > 20 and not any(keyword in line.lower() for keyword in ['name', 'address', 'phone', 'email']):
+        if len(line.strip()) > 20 and not PATTERNS['contact'].search(line):
             return line.strip()[:200]
     
     return "Professional summary available in resume"
 
+# Created last so parser_fingerprint can see the whole module
+resume_cache = create_resume_cache(parser_fingerprint())
+
 # Test function
 if __name__ == '__main__':
     # Test with sample text
@@ -0,0 +1,130 @@
+"""
+Single-scan resume section segmenter.
+
+The text is split into lines once; each line is tested against one
+precompiled heading pattern. Everything under a heading (plus any inline
+text after "Heading:") belongs to that section until the next heading.
+Text before the first heading is kept as the preamble.
+
+iter_normalized_lines and heading_of do the same line by line, for
+extraction that reads a document as it streams in.
+"""
+import re
+
+# Section name -> heading spellings (matched case-insensitively)
+SECTION_HEADINGS = {
+    'summary': [
+        'summary', 'professional summary', 'career summary', 'objective',
+        'career objective', 'profile', 'professional profile', 'about me'
+    ],
+    'experience': [
+        'experience', 'work experience', 'professional experience', 'employment',
+        'employment history', 'work history', 'career history'
+    ],
+    'education': [
+        'education', 'academic background', 'academics', 'qualifications',
+        'education and training', 'certifications'
+    ],
+    'projects': [
+        'projects', 'project', 'personal projects', 'key projects', 'selected projects'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'core skills', 'core competencies', 'competencies',
+        'tools', 'technologies'
+    ]
+}
+
+PREAMBLE = 'preamble'
+
+_HEADING_TO_SECTION = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+# A heading is the whole line ("EXPERIENCE") or a line prefix followed by a colon
+# ("Skills: Python, SQL"). Only literal alternatives and single-character classes,
+# so matching is linear in the line length.
+_HEADING_RE = re.compile(
+    r'[ \t]*[#*•\-]?[ \t]*(?P<heading>'
+    + '|'.join(re.escape(h).replace(r'\ ', r'[ \t]+') for h in sorted(_HEADING_TO_SECTION, key=len, reverse=True))
+    + r')[ \t]*(?::[ \t]*(?P<rest>[^\n]*)|[ \t]*$)',
+    re.IGNORECASE
+)
+_INLINE_SPACE_RE = re.compile(r'[^\S\n]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+def normalize_text(text):
+    """
+    Collapse spaces and tabs within lines but keep line breaks
+    (at most one blank line in a row), so line-based extraction still works.
+    """
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    text = _INLINE_SPACE_RE.sub(' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    return _BLANK_LINES_RE.sub('\n\n', text).strip()
+
+
+def iter_normalized_lines(chunks):
+    """
+    Yield the lines of normalize_text(''.join(chunks)) as the chunks arrive,
+    holding back only the line that is still incomplete.
+    """
+    carry = ''
+    blank = False  # A blank line is only kept once a non-blank line follows it
+    started = False
+    for chunk in chunks:
+        text = carry + chunk
+        # A '\r' at the end may be the first half of a '\r\n'
+        held = text.endswith('\r')
+        if held:
+            text = text[:-1]
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        carry = lines.pop() + ('\r' if held else '')
+        for line in lines:
+            line = _INLINE_SPACE_RE.sub(' ', line).strip()
+            if not line:
+                blank = started
+                continue
+            if blank:
+                yield ''
+                blank = False
+            started = True
+            yield line
+    line = _INLINE_SPACE_RE.sub(' ', carry.replace('\r', '\n').split('\n')[0]).strip()
+    if line:
+        if blank:
+            yield ''
+        yield line
+
+
+def heading_of(line):
+    """(section, inline text or '') if a normalized line is a section heading, else None"""
+    match = _HEADING_RE.match(line)
+    if match is None:
+        return None
+    heading = ' '.join(match.group('heading').lower().split())
+    return _HEADING_TO_SECTION[heading], (match.group('rest') or '').strip()
+
+
+def segment_sections(text):
+    """
+    Return {section: text} for every section found, plus 'preamble'.
+    Repeated headings (e.g. two "Projects" blocks) are concatenated.
+    Expects normalized text.
+    """
+    sections = {PREAMBLE: []}
+    current = PREAMBLE
+
+    for line in text.split('\n'):
+        heading = heading_of(line)
+        if heading:
+            current, rest = heading
+            sections.setdefault(current, [])
+            if rest:
+                sections[current].append(rest)
+            continue
+        sections[current].append(line)
+
+    return {name: '\n'.join(lines).strip() for name, lines in sections.items()}
@@ -0,0 +1,661 @@
+"""
+Interview session storage.
+
+A session is {'role': str, 'conversation': [Turn, ...], 'resume_data': dict | None,
+'last_answer_index': int | None, 'content_version': str | None, 'asked': set} where each Turn (utils/transcripts.py) has a
+.type of 'question' or 'answer' and a .content string. last_answer_index points
+at the most recent answer turn, so callers never have to scan the conversation
+for it. content_version is the tag of the interview content snapshot the
+session started on (utils/interview_content.py), so a reload never changes
+the questions mid-interview. asked holds the question bank indexes of the
+questions asked so far (in that snapshot's bank), recorded as they are
+appended, so picking the next question never rereads the transcript.
+Conversations are append-only logs: adding a turn never rewrites the session.
+
+Every backend enforces the same limits:
+  SESSION_MAX_TURNS   turns per conversation (default 200); an answer is only
+                      accepted while there is room for the question after it
+  ANSWER_MAX_CHARS    longer answers are truncated (default 5000)
+
+Backends (selected with SESSION_STORE):
+  memory - bounded TTL/LRU dict, private to one worker (default)
+  sqlite - WAL-mode database file shared by every worker on the host
+  redis  - any server speaking the Redis protocol, shared across hosts
+"""
+import json
+import os
+import select
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from utils.prefork import close_before_fork
+from utils.transcripts import ANSWER, Turn, compact_resume_data
+
+DEFAULT_TTL = 2 * 60 * 60  # Idle sessions expire after two hours
+DEFAULT_MAX_TURNS = 200
+DEFAULT_MAX_ANSWER_CHARS = 5000
+
+
+class ConversationFull(Exception):
+    pass
+
+
+class SessionStore:
+    """Interface shared by all session backends"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_turns=DEFAULT_MAX_TURNS, max_answer_chars=DEFAULT_MAX_ANSWER_CHARS):
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.max_answer_chars = max_answer_chars
+
+    def _admit(self, turn_count, turn_type, content):
+        """Apply the turn limits; returns the content to store or raises ConversationFull"""
+        if turn_count + self._turns_needed(turn_type) > self.max_turns:
+            raise self._full()
+        return self._truncate(turn_type, content)
+
+    def _turns_needed(self, turn_type):
+        # An answer needs room for the question that follows it
+        return 2 if turn_type == ANSWER else 1
+
+    def _truncate(self, turn_type, content):
+        if turn_type == ANSWER and len(content) > self.max_answer_chars:
+            content = content[:self.max_answer_chars]
+        return content
+
+    def _recent_index(self, index, start):
+        # A conversation index as an index into the turns from start on
+        return index - start if index is not None and index >= start else None
+
+    def _full(self):
+        return ConversationFull(f"Interview has reached the limit of {self.max_turns} turns")
+
+    def create(self, session_id, role, content_version=None):
+        """Start a new, empty session (replacing any existing one)"""
+        raise NotImplementedError
+
+    def get(self, session_id):
+        """Return the session dict, or None if missing or expired"""
+        raise NotImplementedError
+
+    def get_recent(self, session_id, turns):
+        """
+        Like get, but 'conversation' holds only the last `turns` (at least 1) turns and
+        'last_answer_index' points into them (None if the last answer is older),
+        so a turn costs the same however long the interview has run.
+        """
+        raise NotImplementedError
+
+    def exists(self, session_id):
+        return self.get(session_id) is not None
+
+    def append_turn(self, session_id, turn_type, content, bank_index=None):
+        """
+        Append one turn to the conversation log; returns False if the session is gone.
+        bank_index is the question bank index of a question turn, added to 'asked'.
+        Raises ConversationFull once the turn limit is reached.
+        """
+        raise NotImplementedError
+
+    def set_resume_data(self, session_id, resume_data):
+        """Attach parsed resume data (without its raw text); returns False if the session is gone"""
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'backend': type(self).__name__}
+
+
+class MemorySessionStore(SessionStore):
+    """In-process store with a session cap (LRU) and idle TTL"""
+
+    def __init__(self, max_sessions=1000, **limits):
+        super().__init__(**limits)
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> (expires_at, session)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _live(self, session_id):
+        # Caller must hold the lock
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        expires_at, session = entry
+        if expires_at < time.monotonic():
+            del self._sessions[session_id]
+            self.expirations += 1
+            return None
+        self._sessions[session_id] = (time.monotonic() + self.ttl, session)
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _purge_expired(self):
+        # Entries are kept in access order, so expired ones sit at the front
+        now = time.monotonic()
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at >= now:
+                break
+            del self._sessions[session_id]
+            self.expirations += 1
+
+    def create(self, session_id, role, content_version=None):
+        session = {'role': role, 'conversation': [], 'resume_data': None, 'last_answer_index': None,
+                   'content_version': content_version, 'asked': set()}
+        with self._lock:
+            self._purge_expired()
+            self._sessions.pop(session_id, None)
+            self._sessions[session_id] = (time.monotonic() + self.ttl, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._live(session_id)
+
+    def get_recent(self, session_id, turns):
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return None
+            conversation = session['conversation']
+            start = max(len(conversation) - turns, 0)
+            return {
+                **session,
+                'conversation': conversation[start:],
+                'last_answer_index': self._recent_index(session['last_answer_index'], start),
+                'asked': set(session['asked'])
+            }
+
+    def append_turn(self, session_id, turn_type, content, bank_index=None):
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return False
+            conversation = session['conversation']
+            content = self._admit(len(conversation), turn_type, content)
+            conversation.append(Turn.make(turn_type, content))
+            if turn_type == ANSWER:
+                session['last_answer_index'] = len(conversation) - 1
+            if bank_index is not None:
+                session['asked'].add(bank_index)
+            return True
+
+    def set_resume_data(self, session_id, resume_data):
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return False
+            session['resume_data'] = compact_resume_data(resume_data)
+            return True
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite store in WAL mode, so every gunicorn worker on one host can
+    read and append concurrently. Turns live in their own table.
+    """
+
+    def __init__(self, path, **limits):
+        super().__init__(**limits)
+        self.path = path
+        self._local = threading.local()
+        close_before_fork(self._close_connection)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                role TEXT NOT NULL,
+                resume_data TEXT,
+                expires_at REAL NOT NULL,
+                last_answer_seq INTEGER,
+                content_version TEXT
+            );
+            CREATE TABLE IF NOT EXISTS turns (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                content TEXT NOT NULL,
+                bank_index INTEGER,
+                PRIMARY KEY (session_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires_at);
+        ''')
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(sessions)')]
+        if 'last_answer_seq' not in columns:
+            # Databases created before last_answer_seq existed
+            conn.execute('ALTER TABLE sessions ADD COLUMN last_answer_seq INTEGER')
+        if 'content_version' not in columns:
+            conn.execute('ALTER TABLE sessions ADD COLUMN content_version TEXT')
+        if 'bank_index' not in [row[1] for row in conn.execute('PRAGMA table_info(turns)')]:
+            conn.execute('ALTER TABLE turns ADD COLUMN bank_index INTEGER')
+
+    def _close_connection(self):
+        # Before a fork: the child must open its own connection, never share this one
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _conn(self):
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _touch(self, conn, session_id):
+        cursor = conn.execute(
+            'UPDATE sessions SET expires_at = ? WHERE id = ? AND expires_at >= ?',
+            (time.time() + self.ttl, session_id, time.time())
+        )
+        return cursor.rowcount > 0
+
+    def purge_expired(self):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'DELETE FROM turns WHERE session_id IN (SELECT id FROM sessions WHERE expires_at < ?)',
+                (time.time(),)
+            )
+            cursor = conn.execute('DELETE FROM sessions WHERE expires_at < ?', (time.time(),))
+        return cursor.rowcount
+
+    def create(self, session_id, role, content_version=None):
+        # New sessions are rare next to turns, so clean up expired ones here
+        self.purge_expired()
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM turns WHERE session_id = ?', (session_id,))
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (id, role, resume_data, expires_at, content_version) '
+                'VALUES (?, ?, NULL, ?, ?)',
+                (session_id, role, time.time() + self.ttl, content_version)
+            )
+        return {'role': role, 'conversation': [], 'resume_data': None, 'last_answer_index': None,
+                'content_version': content_version, 'asked': set()}
+
+    def get(self, session_id):
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT role, resume_data, last_answer_seq, content_version FROM sessions WHERE id = ? AND expires_at >= ?',
+            (session_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        turns = conn.execute(
+            'SELECT type, content, bank_index FROM turns WHERE session_id = ? ORDER BY seq', (session_id,)
+        ).fetchall()
+        return {
+            'role': row[0],
+            'conversation': [Turn.make(t, c) for t, c, _ in turns],
+            'resume_data': json.loads(row[1]) if row[1] else None,
+            'last_answer_index': row[2],
+            'content_version': row[3],
+            'asked': {index for _, _, index in turns if index is not None}
+        }
+
+    def get_recent(self, session_id, turns):
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT role, resume_data, last_answer_seq, content_version FROM sessions WHERE id = ? AND expires_at >= ?',
+            (session_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        # Both reads walk the (session_id, seq) key: the newest turns, then just the asked indexes
+        recent = conn.execute(
+            'SELECT seq, type, content FROM turns WHERE session_id = ? ORDER BY seq DESC LIMIT ?',
+            (session_id, turns)
+        ).fetchall()[::-1]
+        asked = conn.execute(
+            'SELECT bank_index FROM turns WHERE session_id = ? AND bank_index IS NOT NULL', (session_id,)
+        ).fetchall()
+        return {
+            'role': row[0],
+            'conversation': [Turn.make(t, c) for _, t, c in recent],
+            'resume_data': json.loads(row[1]) if row[1] else None,
+            'last_answer_index': self._recent_index(row[2], recent[0][0] if recent else 0),
+            'content_version': row[3],
+            'asked': {index for index, in asked}
+        }
+
+    def exists(self, session_id):
+        row = self._conn().execute(
+            'SELECT 1 FROM sessions WHERE id = ? AND expires_at >= ?', (session_id, time.time())
+        ).fetchone()
+        return row is not None
+
+    def append_turn(self, session_id, turn_type, content, bank_index=None):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if not self._touch(conn, session_id):
+                return False
+            # seq starts at 0 with no gaps, so it doubles as the conversation index
+            seq = conn.execute(
+                'SELECT COALESCE(MAX(seq), -1) + 1 FROM turns WHERE session_id = ?', (session_id,)
+            ).fetchone()[0]
+            # Raising inside the transaction rolls back the expiry touch too
+            content = self._admit(seq, turn_type, content)
+            conn.execute(
+                'INSERT INTO turns (session_id, seq, type, content, bank_index) VALUES (?, ?, ?, ?, ?)',
+                (session_id, seq, turn_type, content, bank_index)
+            )
+            if turn_type == ANSWER:
+                conn.execute('UPDATE sessions SET last_answer_seq = ? WHERE id = ?', (seq, session_id))
+        return True
+
+    def set_resume_data(self, session_id, resume_data):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if not self._touch(conn, session_id):
+                return False
+            conn.execute(
+                'UPDATE sessions SET resume_data = ? WHERE id = ?',
+                (json.dumps(compact_resume_data(resume_data)), session_id)
+            )
+        return True
+
+    def delete(self, session_id):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM turns WHERE session_id = ?', (session_id,))
+            conn.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def stats(self):
+        row = self._conn().execute(
+            'SELECT COUNT(*) FROM sessions WHERE expires_at >= ?', (time.time(),)
+        ).fetchone()
+        return {'backend': 'sqlite', 'sessions': row[0], 'path': self.path}
+
+
+class RedisError(Exception):
+    pass
+
+
+class _RespConnection:
+    """Minimal Redis protocol (RESP2) client - just enough for the session store"""
+
+    def __init__(self, host, port, password=None, db=0, timeout=5):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands):
+        """
+        Send several commands in one round trip and return their replies.
+        Every reply is read before an error reply is raised, so the next
+        pipeline on this connection starts in step with the server.
+        """
+        out = bytearray()
+        for args in commands:
+            out += b'*%d\r\n' % len(args)
+            for arg in args:
+                if not isinstance(arg, bytes):
+                    arg = str(arg).encode('utf-8')
+                out += b'$%d\r\n%s\r\n' % (len(arg), arg)
+        self.sock.sendall(out)
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def stale(self):
+        """
+        True if the idle connection has something to read: the server closed
+        it (EOF) or sent data nobody asked for. Either way it can't be used.
+        """
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def _read_reply(self):
+        """One reply; error replies are returned as RedisError, not raised"""
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError('Redis connection closed')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            return RedisError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f'Unexpected Redis reply: {line!r}')
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+# KEYS: session hash, turn list, asked set. ARGV: ttl, max turns, turns needed, turn JSON,
+# 1 if an answer, bank index of a question or ''.
+# Returns the new list length, -1 if the session is gone, -2 if the conversation is full.
+APPEND_TURN_SCRIPT = """
+if redis.call('EXPIRE', KEYS[1], ARGV[1]) == 0 then
+    return -1
+end
+local length = redis.call('LLEN', KEYS[2])
+if length + tonumber(ARGV[3]) > tonumber(ARGV[2]) then
+    return -2
+end
+length = redis.call('RPUSH', KEYS[2], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+if ARGV[5] == '1' then
+    redis.call('HSET', KEYS[1], 'last_answer_index', length - 1)
+end
+if ARGV[6] ~= '' then
+    redis.call('SADD', KEYS[3], ARGV[6])
+    redis.call('EXPIRE', KEYS[3], ARGV[1])
+end
+return length
+"""
+
+
+def _turn_from_json(data):
+    turn = json.loads(data)
+    return Turn.make(turn['type'], turn['content'])
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store backed by a Redis-protocol server.
+    Session fields live in a hash, turns in a list (RPUSH) and asked bank
+    indexes in a set, all with an idle TTL.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='interview:session:', **limits):
+        super().__init__(**limits)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.ttl = int(self.ttl)
+        self.prefix = prefix
+        self._local = threading.local()
+        close_before_fork(self._close_connection)
+
+    def _close_connection(self):
+        # Before a fork: the child must open its own connection, never share this one
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = _RespConnection(self.host, self.port, self.password, self.db)
+            self._local.conn = conn
+        return conn
+
+    def _run(self, commands):
+        # Reconnect, before sending anything, if the server dropped the idle connection
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and conn.stale():
+            self._close_connection()
+        try:
+            return self._conn().pipeline(commands)
+        except OSError:
+            # The commands may or may not have run, so they are never replayed
+            # (an RPUSH twice would duplicate a turn); the next call reconnects
+            self._close_connection()
+            raise
+
+    def _keys(self, session_id):
+        key = self.prefix + session_id
+        return key, key + ':turns', key + ':asked'
+
+    def create(self, session_id, role, content_version=None):
+        key, turns_key, asked_key = self._keys(session_id)
+        self._run([
+            ('DEL', key, turns_key, asked_key),
+            ('HSET', key, 'role', role, 'resume_data', '', 'content_version', content_version or ''),
+            ('EXPIRE', key, self.ttl)
+        ])
+        return {'role': role, 'conversation': [], 'resume_data': None, 'last_answer_index': None,
+                'content_version': content_version, 'asked': set()}
+
+    def get(self, session_id):
+        return self._read(session_id, 0)
+
+    def get_recent(self, session_id, turns):
+        return self._read(session_id, -turns)
+
+    def _read(self, session_id, first):
+        """The session with the turns from list index first on (negative counts from the end)"""
+        key, turns_key, asked_key = self._keys(session_id)
+        fields, length, turns, asked, _, _, _ = self._run([
+            ('HGETALL', key),
+            ('LLEN', turns_key),
+            ('LRANGE', turns_key, first, -1),
+            ('SMEMBERS', asked_key),
+            ('EXPIRE', key, self.ttl),
+            ('EXPIRE', turns_key, self.ttl),
+            ('EXPIRE', asked_key, self.ttl)
+        ])
+        if not fields:
+            return None
+        data = dict(zip(fields[::2], fields[1::2]))
+        resume_data = data.get(b'resume_data')
+        last_answer_index = data.get(b'last_answer_index')
+        content_version = data.get(b'content_version')
+        return {
+            'role': data[b'role'].decode('utf-8'),
+            'conversation': [_turn_from_json(turn) for turn in turns],
+            'resume_data': json.loads(resume_data) if resume_data else None,
+            'last_answer_index': self._recent_index(
+                int(last_answer_index) if last_answer_index else None, length - len(turns)
+            ),
+            'content_version': content_version.decode('utf-8') if content_version else None,
+            'asked': {int(index) for index in asked}
+        }
+
+    def exists(self, session_id):
+        key = self._keys(session_id)[0]
+        return self._run([('EXISTS', key)])[0] == 1
+
+    def append_turn(self, session_id, turn_type, content, bank_index=None):
+        # Cap check, push, last_answer_index and asked set in one script: atomic across workers
+        turn = json.dumps({'type': turn_type, 'content': self._truncate(turn_type, content)})
+        length = self._run([(
+            'EVAL', APPEND_TURN_SCRIPT, 3, *self._keys(session_id),
+            self.ttl, self.max_turns, self._turns_needed(turn_type), turn, int(turn_type == ANSWER),
+            '' if bank_index is None else bank_index
+        )])[0]
+        if length == -2:
+            raise self._full()
+        return length > 0
+
+    def set_resume_data(self, session_id, resume_data):
+        key = self._keys(session_id)[0]
+        if not self._run([('EXPIRE', key, self.ttl)])[0]:
+            return False
+        self._run([('HSET', key, 'resume_data', json.dumps(compact_resume_data(resume_data)))])
+        return True
+
+    def delete(self, session_id):
+        self._run([('DEL', *self._keys(session_id))])
+
+    def stats(self):
+        return {'backend': 'redis', 'server': f'{self.host}:{self.port}'}
+
+
+def create_session_store():
+    """Build the session store selected by environment settings"""
+    backend = os.environ.get('SESSION_STORE', 'memory').lower()
+    limits = {
+        'ttl': int(os.environ.get('SESSION_TTL', DEFAULT_TTL)),
+        'max_turns': int(os.environ.get('SESSION_MAX_TURNS', DEFAULT_MAX_TURNS)),
+        'max_answer_chars': int(os.environ.get('ANSWER_MAX_CHARS', DEFAULT_MAX_ANSWER_CHARS))
+    }
+
+    if backend == 'sqlite':
+        path = os.environ.get('SESSION_DB_PATH', os.path.join('instance', 'sessions.db'))
+        return SQLiteSessionStore(path, **limits)
+    if backend == 'redis':
+        return RedisSessionStore(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'), **limits)
+    if backend != 'memory':
+        raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
+    return MemorySessionStore(
+        max_sessions=int(os.environ.get('SESSION_MAX', 1000)),
+        **limits
+    )
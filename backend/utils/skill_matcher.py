@@ -0,0 +1,141 @@
+"""
+Single-pass skill matcher for resume text.
+
+All skill names and synonyms are compiled once into one trie-shaped regex,
+so a resume is scanned a single time no matter how many skills the taxonomy
+holds. Matching is case-insensitive, treats any run of whitespace as a space,
+and uses explicit boundaries so tokens like c++, c# and node.js match as
+whole words.
+
+A larger taxonomy can be loaded from a JSON file (SKILL_TAXONOMY):
+  {"skills": [{"name": "Python", "synonyms": ["py", "python3"]}, "Docker", ...]}
+"""
+import hashlib
+import json
+import os
+import re
+
+TECHNICAL_SKILLS = [
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust',
+    'react', 'angular', 'vue', 'node.js', 'django', 'flask', 'spring', 'express',
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'oracle',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'ci/cd',
+    'machine learning', 'ai', 'data analysis', 'tableau', 'power bi', 'excel',
+    'photoshop', 'figma', 'sketch', 'adobe xd', 'ui/ux design',
+    'salesforce', 'hubspot', 'seo', 'sem', 'google analytics', 'wordpress'
+]
+
+PROFESSIONAL_SKILLS = [
+    'project management', 'agile', 'scrum', 'kanban', 'leadership', 'team management',
+    'communication', 'problem solving', 'critical thinking', 'public speaking',
+    'client relations', 'negotiation', 'strategic planning', 'budget management'
+]
+
+
+def normalize_term(term):
+    return ' '.join(term.lower().split())
+
+
+def _trie_regex(terms):
+    """Compile terms into a prefix-factored alternation (longest alternatives tried first)"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node):
+        terminal = '' in node
+        branches = []
+        for char in sorted(k for k in node if k):
+            piece = r'\s+' if char == ' ' else re.escape(char)
+            branches.append(piece + emit(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Optional continuation is greedy, so longer skills win over their prefixes
+        return '(?:' + body + ')?' if terminal else body
+
+    return emit(trie)
+
+
+class SkillMatcher:
+    def __init__(self, skills):
+        """
+        skills maps a display name to its synonyms, e.g. {'Python': ['py']}.
+        The display name itself is always matched.
+        """
+        self.lookup = {}
+        for name, synonyms in skills.items():
+            for term in [name, *synonyms]:
+                term = normalize_term(term)
+                if term:
+                    self.lookup.setdefault(term, name)
+
+        # Longest term; a match can't span more than twice that (normalized text has
+        # at most two whitespace characters in a row)
+        self.max_length = max(map(len, self.lookup), default=0)
+        body = _trie_regex(self.lookup) if self.lookup else '(?!)'
+        # Lookahead capture reports a match at every word start, so skills that
+        # start inside a longer skill phrase are found too
+        self.pattern = re.compile(r'(?<![\w])(?=(' + body + r')(?![\w]))', re.IGNORECASE)
+
+    def __len__(self):
+        return len(self.lookup)
+
+    @property
+    def fingerprint(self):
+        """Stable hash of the taxonomy, used to invalidate cached parse results"""
+        payload = json.dumps(sorted(self.lookup.items()))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def find(self, text, start=0, end=None):
+        """
+        Return {skill: {'count': n, 'offsets': [(start, end), ...]}}
+        in order of first appearance, for matches starting in text[start:end]
+        (the text before start still counts as context for the word boundary).
+        """
+        found = {}
+        for match in self.pattern.finditer(text, start):
+            if end is not None and match.start(1) >= end:
+                break
+            name = self.lookup.get(normalize_term(match.group(1)))
+            if name is None:
+                continue
+            entry = found.setdefault(name, {'count': 0, 'offsets': []})
+            entry['count'] += 1
+            entry['offsets'].append((match.start(1), match.end(1)))
+        return found
+
+    def skills(self, text, limit=None):
+        """Skill names in order of first appearance"""
+        names = list(self.find(text))
+        return names[:limit] if limit is not None else names
+
+
+def load_taxonomy(path):
+    """Read a JSON taxonomy file into {name: [synonyms]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data.get('skills', []) if isinstance(data, dict) else data
+
+    skills = {}
+    for entry in entries:
+        if isinstance(entry, str):
+            skills.setdefault(entry, [])
+        else:
+            skills.setdefault(entry['name'], []).extend(entry.get('synonyms', []))
+    return skills
+
+
+def default_taxonomy():
+    # Display names keep the title-casing the parser has always returned
+    return {skill.title(): [skill] for skill in TECHNICAL_SKILLS + PROFESSIONAL_SKILLS}
+
+
+def build_skill_matcher(path=None):
+    """Build the matcher from path / SKILL_TAXONOMY, falling back to the built-in list"""
+    path = path or os.environ.get('SKILL_TAXONOMY')
+    skills = load_taxonomy(path) if path else default_taxonomy()
+    return SkillMatcher(skills)
@@ -0,0 +1,334 @@
+"""
+Offline speech-to-text.
+
+Recognizers share one interface: transcribe_pcm(pcm) takes a sample rate
+followed by 16-bit mono PCM chunks and returns a Transcript; transcribe(chunks,
+content_type) decodes raw upload bytes first. Audio is decoded and recognized
+while chunks are still arriving, so a long answer is never held in memory as
+a whole clip:
+  - WAV (16-bit mono PCM) is read directly with the wave module
+  - anything else (the browser's webm/ogg) is piped through one ffmpeg
+    process that converts it to 16 kHz mono PCM on the fly
+Uploads from the app are checked and transcoded by utils/audio_uploads.py,
+which bounds the number of ffmpeg processes.
+
+Backends (selected with STT_BACKEND):
+  none - no recognition; voice answers get a placeholder (default)
+  vosk - offline Kaldi models on the CPU (pip install vosk, then point
+         STT_MODEL_PATH at an unpacked model, e.g. vosk-model-small-en-us-0.15)
+
+The model is loaded lazily on the first request and shared by every thread
+of the worker.
+"""
+import json
+import os
+import subprocess
+import threading
+import time
+import wave
+
+from utils.metrics import observe_stage
+
+SAMPLE_RATE = 16000
+PCM_CHUNK_BYTES = 8000  # 0.25 s of 16 kHz 16-bit mono audio
+PLACEHOLDER_TEXT = "[Voice answer recorded - please use text mode for accurate transcription]"
+
+
+class SpeechToTextError(Exception):
+    pass
+
+
+class Transcript:
+    __slots__ = ('text', 'audio_seconds', 'decode_seconds', 'backend')
+
+    def __init__(self, text, audio_seconds, decode_seconds, backend):
+        self.text = text
+        self.audio_seconds = audio_seconds
+        self.decode_seconds = decode_seconds
+        self.backend = backend
+
+    @property
+    def real_time_factor(self):
+        """Processing time per second of audio (below 1.0 is faster than real time)"""
+        if not self.audio_seconds:
+            return None
+        return self.decode_seconds / self.audio_seconds
+
+    def metrics(self):
+        rtf = self.real_time_factor
+        return {
+            'backend': self.backend,
+            'audio_seconds': round(self.audio_seconds, 3),
+            'decode_seconds': round(self.decode_seconds, 3),
+            'real_time_factor': round(rtf, 3) if rtf is not None else None
+        }
+
+
+def iter_file_chunks(file, chunk_size=64 * 1024):
+    """Read an open file or stream in chunks"""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class _ChunkReader:
+    """File-like view over an iterator of byte chunks (for the wave module)"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def iter_wav_pcm(chunks):
+    """Yield PCM frames from a 16-bit mono WAV stream, plus its sample rate first"""
+    try:
+        reader = wave.open(_ChunkReader(chunks), 'rb')
+    except (wave.Error, EOFError) as e:
+        raise SpeechToTextError(f"Invalid WAV audio: {e}")
+    if reader.getsampwidth() != 2 or reader.getnchannels() != 1:
+        raise SpeechToTextError("WAV audio must be 16-bit mono")
+    yield reader.getframerate()
+    frames = PCM_CHUNK_BYTES // 2
+    while True:
+        data = reader.readframes(frames)
+        if not data:
+            break
+        yield data
+
+
+def iter_ffmpeg_pcm(chunks, ffmpeg='ffmpeg', sample_rate=SAMPLE_RATE, max_seconds=None):
+    """
+    Convert any container/codec to 16-bit mono PCM with one ffmpeg process.
+    Upload chunks are written to ffmpeg on a helper thread while PCM is read
+    back here, so decoding overlaps with the upload. With max_seconds, ffmpeg
+    stops converting after that much audio.
+    """
+    limit = ['-t', str(max_seconds)] if max_seconds else []
+    try:
+        process = subprocess.Popen(
+            [ffmpeg, '-loglevel', 'error', '-i', 'pipe:0', *limit,
+             '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        raise SpeechToTextError(f"ffmpeg is not available: {e}")
+
+    feed_error = []
+
+    def feed():
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its stderr explains why
+        except Exception as e:
+            feed_error.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        yield sample_rate
+        while True:
+            data = process.stdout.read(PCM_CHUNK_BYTES)
+            if not data:
+                break
+            yield data
+        feeder.join()
+        stderr = process.stderr.read().decode('utf-8', 'replace').strip()
+        if process.wait() != 0:
+            raise SpeechToTextError(f"Could not decode audio: {stderr or 'ffmpeg failed'}")
+        if feed_error:
+            raise feed_error[0]
+    finally:
+        # Stop ffmpeg if the consumer gave up early (e.g. duration limit)
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+class SpeechRecognizer:
+    """Interface shared by all STT backends"""
+
+    name = 'none'
+    decodes_audio = True  # False: the audio is never looked at, so don't spend time decoding it
+
+    def __init__(self, ffmpeg='ffmpeg', max_seconds=None):
+        self.ffmpeg = ffmpeg
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    @property
+    def available(self):
+        return False
+
+    def preload(self):
+        """Load the model before a preforking server forks, so workers share it"""
+
+    def transcribe(self, chunks, content_type=''):
+        """Transcribe an iterator of upload chunks; returns a Transcript"""
+        if 'wav' in (content_type or '').lower():
+            return self.transcribe_pcm(iter_wav_pcm(chunks))
+        return self.transcribe_pcm(iter_ffmpeg_pcm(chunks, self.ffmpeg, max_seconds=self.max_seconds))
+
+    def transcribe_pcm(self, pcm):
+        """Transcribe a sample rate followed by PCM chunks; returns a Transcript"""
+        started = time.perf_counter()
+        try:
+            sample_rate = next(pcm)
+            text, audio_seconds = self._recognize(pcm, sample_rate)
+        finally:
+            pcm.close()
+
+        transcript = Transcript(text, audio_seconds, time.perf_counter() - started, self.name)
+        observe_stage('stt_transcribe', transcript.decode_seconds)
+        with self._lock:
+            self.requests += 1
+            self.audio_seconds += transcript.audio_seconds
+            self.decode_seconds += transcript.decode_seconds
+        return transcript
+
+    def _limited(self, pcm, sample_rate):
+        """Pass PCM through up to max_seconds of audio"""
+        limit = self.max_seconds * sample_rate * 2 if self.max_seconds else None
+        consumed = 0
+        for data in pcm:
+            if limit is not None and consumed + len(data) > limit:
+                data = data[:limit - consumed]
+                if data:
+                    yield data
+                return
+            consumed += len(data)
+            yield data
+
+    def _recognize(self, pcm, sample_rate):
+        raise NotImplementedError
+
+    def stats(self):
+        with self._lock:
+            rtf = self.decode_seconds / self.audio_seconds if self.audio_seconds else None
+            return {
+                'backend': self.name,
+                'available': self.available,
+                'requests': self.requests,
+                'audio_seconds': round(self.audio_seconds, 3),
+                'real_time_factor': round(rtf, 3) if rtf is not None else None
+            }
+
+
+class NullRecognizer(SpeechRecognizer):
+    """No STT configured: the answer is recorded as a placeholder"""
+
+    decodes_audio = False
+
+    def transcribe(self, chunks, content_type=''):
+        # Drain the upload so the client isn't cut off mid-request
+        for _ in chunks:
+            pass
+        return Transcript(PLACEHOLDER_TEXT, 0.0, 0.0, self.name)
+
+    def transcribe_pcm(self, pcm):
+        pcm.close()
+        return Transcript(PLACEHOLDER_TEXT, 0.0, 0.0, self.name)
+
+
+class VoskRecognizer(SpeechRecognizer):
+    """Offline recognition with a Vosk (Kaldi) model, loaded once per process"""
+
+    name = 'vosk'
+
+    def __init__(self, model_path, **kwargs):
+        super().__init__(**kwargs)
+        self.model_path = model_path
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def available(self):
+        return os.path.isdir(self.model_path)
+
+    def preload(self):
+        if self.available:
+            self.model()
+
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        from vosk import Model, SetLogLevel
+                    except ImportError:
+                        raise SpeechToTextError("STT_BACKEND=vosk needs the vosk package (pip install vosk)")
+                    if not self.available:
+                        raise SpeechToTextError(f"Vosk model not found at {self.model_path}")
+                    SetLogLevel(-1)
+                    print(f"🎤 Loading Vosk model from {self.model_path}")
+                    self._model = Model(self.model_path)
+        return self._model
+
+    def _recognize(self, pcm, sample_rate):
+        from vosk import KaldiRecognizer
+
+        # The model is shared and read-only; each request gets its own decoder
+        recognizer = KaldiRecognizer(self.model(), sample_rate)
+        segments = []
+        audio_bytes = 0
+        for data in self._limited(pcm, sample_rate):
+            audio_bytes += len(data)
+            if recognizer.AcceptWaveform(data):
+                segments.append(json.loads(recognizer.Result()).get('text', ''))
+        segments.append(json.loads(recognizer.FinalResult()).get('text', ''))
+
+        text = ' '.join(segment for segment in segments if segment)
+        return text, audio_bytes / (2.0 * sample_rate)
+
+
+_recognizer = None
+_recognizer_lock = threading.Lock()
+
+
+def create_recognizer():
+    """Build the recognizer selected by environment settings"""
+    backend = os.environ.get('STT_BACKEND', 'none').lower()
+    options = {
+        'ffmpeg': os.environ.get('FFMPEG_BINARY', 'ffmpeg'),
+        'max_seconds': int(os.environ.get('STT_MAX_SECONDS', 300)) or None
+    }
+    if backend == 'vosk':
+        model_path = os.environ.get('STT_MODEL_PATH', os.path.join('models', 'vosk'))
+        return VoskRecognizer(model_path, **options)
+    if backend != 'none':
+        raise ValueError(f"Unknown STT_BACKEND: {backend}")
+    return NullRecognizer(**options)
+
+
+def get_recognizer():
+    """Recognizer shared by every request in this worker, created on first use"""
+    global _recognizer
+    with _recognizer_lock:
+        if _recognizer is None:
+            _recognizer = create_recognizer()
+        return _recognizer
@@ -0,0 +1,41 @@
+"""
+Server-Sent Events helpers.
+
+Endpoints return an event-stream body that the browser reads incrementally
+(fetch + ReadableStream, since EventSource cannot POST). Each event is
+written as soon as it is produced:
+  event: question
+  data: {"question": "..."}
+"""
+import json
+
+from flask import Response, stream_with_context
+
+
+def format_event(event, data):
+    """Encode one SSE event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events):
+    """
+    Stream (event, data) pairs from a generator. Errors raised while
+    streaming are sent as an 'error' event, since the status is already sent.
+    """
+    def generate():
+        # Comment line so the client sees the stream open before the first event
+        yield ': stream open\n\n'
+        try:
+            for event, data in events:
+                yield format_event(event, data)
+        except Exception as e:
+            yield format_event('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable nginx response buffering
+        }
+    )
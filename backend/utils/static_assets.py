@@ -0,0 +1,221 @@
+"""
+Precompressed, fingerprinted frontend assets.
+
+The build step copies frontend/ into a build directory:
+  - every .js and .css file gets a content hash in its name (app.js ->
+    app.3f9c2a7d10.js) and index.html is rewritten to point at those names
+  - compressible files get .gz and .br (when the brotli package is installed)
+    variants, compressed once at the highest level
+  - manifest.json lists what was built
+
+At startup the app loads the whole build (a few tens of KB) into memory and
+serves each request without touching the disk: the best variant for the
+client's Accept-Encoding, immutable year-long caching for fingerprinted
+files, and ETag/304 revalidation for everything else (index.html).
+Without a build the app falls back to sending frontend/ files as they are.
+
+  python -m utils.static_assets [--source ../frontend] [--output static_build]
+  STATIC_BUILD_DIR  build directory the app serves from (default backend/static_build)
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCE_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'frontend')
+DEFAULT_BUILD_DIR = os.path.join(BACKEND_DIR, 'static_build')
+MANIFEST_VERSION = 1
+FINGERPRINTED_EXTENSIONS = ('.js', '.css')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+REFERENCE_RE = re.compile(r'''((?:src|href)=["'])([^"'#?]+)(["'])''')
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def fingerprinted_name(path, data):
+    base, extension = os.path.splitext(path)
+    return f"{base}.{fingerprint(data)}{extension}"
+
+
+def _compressible(path):
+    mimetype = mimetypes.guess_type(path)[0] or ''
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _compress(data):
+    """{encoding: bytes} for every encoding that actually saves space"""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(data)}
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_assets(source_dir=DEFAULT_SOURCE_DIR, output_dir=DEFAULT_BUILD_DIR):
+    """Build the fingerprinted, precompressed copy of source_dir; returns the manifest"""
+    sources = {}
+    for root, _, names in os.walk(source_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                sources[os.path.relpath(path, source_dir).replace(os.sep, '/')] = f.read()
+
+    renamed = {
+        path: fingerprinted_name(path, data)
+        for path, data in sources.items() if path.endswith(FINGERPRINTED_EXTENSIONS)
+    }
+
+    def rewrite_references(html, page):
+        directory = os.path.dirname(page)
+
+        def replace(match):
+            target = os.path.normpath(os.path.join(directory, match.group(2))).replace(os.sep, '/')
+            if target not in renamed:
+                return match.group(0)
+            new_target = os.path.relpath(renamed[target], directory or '.').replace(os.sep, '/')
+            return match.group(1) + new_target + match.group(3)
+
+        return REFERENCE_RE.sub(replace, html)
+
+    files = {}
+    for path, data in sorted(sources.items()):
+        if path.endswith('.html'):
+            data = rewrite_references(data.decode('utf-8'), path).encode('utf-8')
+        served = renamed.get(path, path)
+        _write_atomic(os.path.join(output_dir, served), data)
+        encodings = _compress(data) if _compressible(served) else {}
+        for encoding, body in encodings.items():
+            _write_atomic(os.path.join(output_dir, served + ENCODING_SUFFIXES[encoding]), body)
+        files[served] = {'immutable': path in renamed, 'encodings': sorted(encodings)}
+
+    manifest = {'version': MANIFEST_VERSION, 'assets': renamed, 'files': files}
+    # Written last, so a server never sees a manifest naming files that aren't there yet
+    _write_atomic(os.path.join(output_dir, 'manifest.json'), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+class _Asset:
+    __slots__ = ('mimetype', 'etag', 'immutable', 'variants')
+
+    def __init__(self, mimetype, etag, immutable, variants):
+        self.mimetype = mimetype
+        self.etag = etag
+        self.immutable = immutable
+        self.variants = variants  # encoding ('identity', 'gzip', 'br') -> bytes
+
+
+class StaticAssets:
+    """A built asset directory held in memory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported static manifest version in {directory}")
+
+        self.assets = {}
+        for served, entry in manifest['files'].items():
+            with open(os.path.join(directory, served), 'rb') as f:
+                variants = {'identity': f.read()}
+            for encoding in entry['encodings']:
+                with open(os.path.join(directory, served + ENCODING_SUFFIXES[encoding]), 'rb') as f:
+                    variants[encoding] = f.read()
+            self.assets[served] = _Asset(
+                mimetype=mimetypes.guess_type(served)[0] or 'application/octet-stream',
+                etag=fingerprint(variants['identity']),
+                immutable=entry['immutable'],
+                variants=variants
+            )
+        # Unhashed names still work (e.g. for a page cached before a deploy) but must revalidate
+        for logical, served in manifest['assets'].items():
+            asset = self.assets[served]
+            self.assets[logical] = _Asset(asset.mimetype, asset.etag, False, asset.variants)
+
+    def __contains__(self, path):
+        return path in self.assets
+
+    def response(self, path, request):
+        """Flask response for one asset, or None if it isn't part of the build"""
+        from flask import Response
+
+        asset = self.assets.get(path)
+        if asset is None:
+            return None
+
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and request.accept_encodings[candidate] > 0:
+                encoding = candidate
+                break
+
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if len(asset.variants) > 1:
+            response.vary.add('Accept-Encoding')
+        # Each encoding is a different representation, so it needs its own ETag
+        response.set_etag(asset.etag if encoding == 'identity' else f"{asset.etag}-{encoding}")
+        if asset.immutable:
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    def stats(self):
+        return {
+            'directory': self.directory,
+            'files': len(self.assets)
+        }
+
+
+def load_static_assets():
+    """The build selected by STATIC_BUILD_DIR, or None if it hasn't been built"""
+    directory = os.environ.get('STATIC_BUILD_DIR', DEFAULT_BUILD_DIR)
+    if not directory or not os.path.exists(os.path.join(directory, 'manifest.json')):
+        return None
+    return StaticAssets(directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build fingerprinted, precompressed frontend assets')
+    parser.add_argument('--source', default=DEFAULT_SOURCE_DIR)
+    parser.add_argument('--output', default=os.environ.get('STATIC_BUILD_DIR') or DEFAULT_BUILD_DIR)
+    args = parser.parse_args(argv)
+
+    if brotli is None:
+        print("📦 brotli is not installed; building gzip variants only (pip install brotli)")
+    manifest = build_assets(args.source, args.output)
+    for path, entry in manifest['files'].items():
+        size = os.path.getsize(os.path.join(args.output, path))
+        variants = ', '.join(
+            f"{encoding} {os.path.getsize(os.path.join(args.output, path + ENCODING_SUFFIXES[encoding]))}"
+            for encoding in entry['encodings']
+        )
+        print(f"📦 {path}: {size} bytes" + (f" ({variants})" if variants else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,328 @@
+"""
+Append-only SQLite archive of finished interviews, for historical analytics.
+
+end_interview writes each transcript once; rows are never updated. Every
+question/answer pair is stored as an exchange row carrying the role, the
+day and a stable question id (a hash of the question text, so ids survive
+restarts and question bank changes), with indexes on each of them:
+
+  transcripts(id, session_id, role, ended_at, day, turns, answers, resume_data)
+  exchanges(transcript_id, seq, role, day, question_id, answer, answer_words)
+  questions(id, text)
+
+Reports aggregate in SQL or in one ordered pass over a cursor, so they run in
+constant memory however large the archive grows. WAL mode lets every
+gunicorn worker append while reports run.
+
+  TRANSCRIPT_DB_PATH  archive file (default instance/transcripts.db, '' disables)
+
+  python -m utils.transcript_archive roles [--since 2024-01-01] [--until ...]
+  python -m utils.transcript_archive questions [--role 'Data Scientist'] [--min-asked 5]
+  python -m utils.transcript_archive export [--role ...] > transcripts.jsonl
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from itertools import groupby
+
+from utils.prefork import close_before_fork
+
+DEFAULT_DB_PATH = os.path.join('instance', 'transcripts.db')
+DETAILED_ANSWER_WORDS = 20  # Same threshold the feedback report uses for "good detail"
+
+
+def question_id(text):
+    """Stable id of a question text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _day(timestamp):
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+
+def _where(role=None, since=None, until=None, question=None, prefix=''):
+    """SQL filter on the indexed columns; since/until are inclusive YYYY-MM-DD days"""
+    clauses, params = [], []
+    if role is not None:
+        clauses.append(f'{prefix}role = ?')
+        params.append(role)
+    if since is not None:
+        clauses.append(f'{prefix}day >= ?')
+        params.append(since)
+    if until is not None:
+        clauses.append(f'{prefix}day <= ?')
+        params.append(until)
+    if question is not None:
+        clauses.append(f'{prefix}question_id = ?')
+        params.append(question)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _median(sorted_values):
+    if not sorted_values:
+        return None
+    middle = len(sorted_values) // 2
+    if len(sorted_values) % 2:
+        return sorted_values[middle]
+    return (sorted_values[middle - 1] + sorted_values[middle]) / 2
+
+
+class TranscriptArchive:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        close_before_fork(self._close_connection)
+        self.archived = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS transcripts (
+                id INTEGER PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                ended_at REAL NOT NULL,
+                day TEXT NOT NULL,
+                turns INTEGER NOT NULL,
+                answers INTEGER NOT NULL,
+                resume_data TEXT
+            );
+            CREATE TABLE IF NOT EXISTS questions (
+                id TEXT PRIMARY KEY,
+                text TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS exchanges (
+                transcript_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                day TEXT NOT NULL,
+                question_id TEXT,
+                answer TEXT,
+                answer_words INTEGER,
+                PRIMARY KEY (transcript_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS transcripts_role_day ON transcripts (role, day);
+            CREATE INDEX IF NOT EXISTS transcripts_day ON transcripts (day);
+            CREATE INDEX IF NOT EXISTS exchanges_question_day ON exchanges (question_id, day);
+            CREATE INDEX IF NOT EXISTS exchanges_role_day ON exchanges (role, day);
+        ''')
+
+    def _close_connection(self):
+        # Before a fork: the child must open its own connection, never share this one
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def append(self, session_id, session, ended_at=None):
+        """Archive one finished session (turns are Turn records or {type, content} dicts)"""
+        ended_at = time.time() if ended_at is None else ended_at
+        day = _day(ended_at)
+        role = session['role']
+        turns = [
+            (turn['type'], turn['content']) if isinstance(turn, dict) else (turn.type, turn.content)
+            for turn in session['conversation']
+        ]
+
+        # Pair each question with the answer that follows it
+        exchanges, questions = [], {}
+        for seq, (turn_type, content) in enumerate(turns):
+            if turn_type == 'question':
+                qid = question_id(content)
+                questions[qid] = content
+                exchanges.append([seq, qid, None, None])
+            elif exchanges and exchanges[-1][2] is None:
+                exchanges[-1][2:] = [content, len(content.split())]
+            else:
+                exchanges.append([seq, None, content, len(content.split())])
+
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute(
+                'INSERT INTO transcripts (session_id, role, ended_at, day, turns, answers, resume_data) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (session_id, role, ended_at, day, len(turns), sum(1 for t, _ in turns if t == 'answer'),
+                 json.dumps(session['resume_data']) if session.get('resume_data') else None)
+            )
+            transcript_id = cursor.lastrowid
+            conn.executemany('INSERT OR IGNORE INTO questions (id, text) VALUES (?, ?)', questions.items())
+            conn.executemany(
+                'INSERT INTO exchanges (transcript_id, seq, role, day, question_id, answer, answer_words) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(transcript_id, seq, role, day, qid, answer, words) for seq, qid, answer, words in exchanges]
+            )
+        self.archived += 1
+        return transcript_id
+
+    def iter_transcripts(self, role=None, since=None, until=None):
+        """Yield archived transcripts one at a time, oldest first"""
+        where, params = _where(role, since, until, prefix='t.')
+        rows = self._conn().execute(
+            'SELECT t.id, t.session_id, t.role, t.ended_at, t.resume_data, e.question_id, q.text, e.answer '
+            'FROM transcripts t JOIN exchanges e ON e.transcript_id = t.id '
+            'LEFT JOIN questions q ON q.id = e.question_id' + where + ' ORDER BY t.id, e.seq',
+            params
+        )
+        for _, group in groupby(rows, key=lambda row: row[0]):
+            conversation = []
+            for row in group:
+                if row[6] is not None:
+                    conversation.append({'type': 'question', 'content': row[6], 'question_id': row[5]})
+                if row[7] is not None:
+                    conversation.append({'type': 'answer', 'content': row[7]})
+            yield {
+                'session_id': row[1],
+                'role': row[2],
+                'ended_at': row[3],
+                'resume_data': json.loads(row[4]) if row[4] else None,
+                'conversation': conversation
+            }
+
+    def role_report(self, since=None, until=None):
+        """Interviews, answers per interview and answer length for each role"""
+        where, params = _where(None, since, until)
+        report = {}
+        for role, interviews, avg_answers in self._conn().execute(
+            'SELECT role, COUNT(*), AVG(answers) FROM transcripts' + where + ' GROUP BY role', params
+        ):
+            report[role] = {'interviews': interviews, 'avg_answers': avg_answers}
+        connector = ' AND ' if where else ' WHERE '
+        for role, answers, avg_words, detailed in self._conn().execute(
+            'SELECT role, COUNT(*), AVG(answer_words), SUM(answer_words > ?) FROM exchanges' + where + connector +
+            'answer IS NOT NULL GROUP BY role',
+            [DETAILED_ANSWER_WORDS] + params
+        ):
+            report.setdefault(role, {'interviews': 0, 'avg_answers': None}).update({
+                'answers': answers,
+                'avg_answer_words': avg_words,
+                'detailed_rate': detailed / answers
+            })
+        return report
+
+    def question_report(self, role=None, since=None, until=None, min_asked=1, question=None):
+        """
+        Yield effectiveness stats per question, in question id order. One ordered
+        pass over the exchanges index; only the current question's answer
+        lengths are held in memory.
+        """
+        where, params = _where(role, since, until, question, prefix='e.')
+        connector = ' AND ' if where else ' WHERE '
+        rows = self._conn().execute(
+            'SELECT e.question_id, q.text, e.answer_words FROM exchanges e '
+            'LEFT JOIN questions q ON q.id = e.question_id' + where + connector +
+            'e.question_id IS NOT NULL ORDER BY e.question_id',
+            params
+        )
+        for (qid, text), group in groupby(rows, key=lambda row: row[:2]):
+            asked = 0
+            words = []
+            for _, _, answer_words in group:
+                asked += 1
+                if answer_words is not None:
+                    words.append(answer_words)
+            if asked < min_asked:
+                continue
+            words.sort()
+            yield {
+                'question_id': qid,
+                'question': text,
+                'asked': asked,
+                'answer_rate': len(words) / asked,
+                'avg_answer_words': sum(words) / len(words) if words else None,
+                'median_answer_words': _median(words),
+                'detailed_rate': sum(1 for w in words if w > DETAILED_ANSWER_WORDS) / len(words) if words else None
+            }
+
+    def stats(self):
+        row = self._conn().execute('SELECT COUNT(*) FROM transcripts').fetchone()
+        return {'path': self.path, 'transcripts': row[0], 'archived': self.archived}
+
+
+def create_transcript_archive():
+    """Build the archive selected by environment settings (None when disabled)"""
+    path = os.environ.get('TRANSCRIPT_DB_PATH', DEFAULT_DB_PATH)
+    if not path:
+        return None
+    return TranscriptArchive(path)
+
+
+def _fmt(value, digits=1):
+    if value is None:
+        return '-'
+    return f"{value:.{digits}f}" if isinstance(value, float) else str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Reports over the interview transcript archive')
+    parser.add_argument('--db', default=os.environ.get('TRANSCRIPT_DB_PATH') or DEFAULT_DB_PATH)
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('roles', 'Answer statistics per role'),
+                            ('questions', 'Effectiveness of each question'),
+                            ('export', 'Stream transcripts as JSON lines')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('--since', help='First day (YYYY-MM-DD), inclusive')
+        command.add_argument('--until', help='Last day (YYYY-MM-DD), inclusive')
+        if name != 'roles':
+            command.add_argument('--role')
+        if name == 'questions':
+            command.add_argument('--min-asked', type=int, default=1)
+            command.add_argument('--question', help='Only this question id')
+            command.add_argument('--limit', type=int, default=0, help='Show only the N most asked questions')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No transcript archive at {args.db}", file=sys.stderr)
+        return 1
+    archive = TranscriptArchive(args.db)
+
+    if args.command == 'export':
+        for transcript in archive.iter_transcripts(args.role, args.since, args.until):
+            sys.stdout.write(json.dumps(transcript) + '\n')
+        return 0
+
+    if args.command == 'roles':
+        report = archive.role_report(args.since, args.until)
+        if args.json:
+            print(json.dumps(report, indent=2))
+            return 0
+        print(f"{'role':24} {'interviews':>10} {'answers':>8} {'avg ans':>8} {'avg words':>10} {'detailed':>9}")
+        for role, stats in sorted(report.items()):
+            print(f"{role:24} {stats['interviews']:10d} {stats.get('answers', 0):8d} "
+                  f"{_fmt(stats['avg_answers']):>8} {_fmt(stats.get('avg_answer_words')):>10} "
+                  f"{_fmt(stats.get('detailed_rate'), 2):>9}")
+        return 0
+
+    questions = sorted(
+        archive.question_report(args.role, args.since, args.until, args.min_asked, args.question),
+        key=lambda q: q['asked'], reverse=True
+    )
+    if args.limit:
+        questions = questions[:args.limit]
+    if args.json:
+        print(json.dumps(questions, indent=2))
+        return 0
+    print(f"{'question id':16} {'asked':>6} {'answered':>8} {'avg words':>10} {'median':>7} {'detailed':>9}  question")
+    for q in questions:
+        print(f"{q['question_id']:16} {q['asked']:6d} {_fmt(q['answer_rate'], 2):>8} {_fmt(q['avg_answer_words']):>10} "
+              f"{_fmt(q['median_answer_words']):>7} {_fmt(q['detailed_rate'], 2):>9}  {q['question']}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
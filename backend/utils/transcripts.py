@@ -0,0 +1,89 @@
+"""
+Compact conversation turns.
+
+A turn is a two-slot Turn record instead of a dict. The type tag is one of
+two interned strings, and a question the agent asks from its fixed bank is
+stored as a small integer id into question_catalog instead of another copy
+of the text. Answers and one-off questions (e.g. the resume-personalised
+opener) keep their text.
+
+When an interview ends its transcript moves to the on-disk archive
+(utils/transcript_archive.py) and the session is dropped from the store,
+so only live interviews take memory.
+"""
+import sys
+import threading
+
+QUESTION = sys.intern('question')
+ANSWER = sys.intern('answer')
+TURN_TYPES = {QUESTION: QUESTION, ANSWER: ANSWER}
+
+
+class QuestionCatalog:
+    """Two-way mapping between fixed question texts and small integer ids"""
+
+    def __init__(self):
+        self._ids = {}
+        self._texts = []
+        self._lock = threading.Lock()
+
+    def register(self, texts):
+        with self._lock:
+            for text in texts:
+                if text not in self._ids:
+                    self._ids[text] = len(self._texts)
+                    self._texts.append(text)
+
+    def id_for(self, text):
+        return self._ids.get(text)
+
+    def text(self, question_id):
+        return self._texts[question_id]
+
+    def __len__(self):
+        return len(self._texts)
+
+
+question_catalog = QuestionCatalog()
+
+
+class Turn:
+    __slots__ = ('type', 'ref')
+
+    def __init__(self, turn_type, ref):
+        self.type = turn_type
+        self.ref = ref  # catalog id (int) or the text itself
+
+    @classmethod
+    def make(cls, turn_type, content):
+        turn_type = TURN_TYPES.get(turn_type)
+        if turn_type is None:
+            raise ValueError("Turn type must be 'question' or 'answer'")
+        if turn_type is QUESTION:
+            question_id = question_catalog.id_for(content)
+            if question_id is not None:
+                return cls(QUESTION, question_id)
+        return cls(turn_type, content)
+
+    @property
+    def content(self):
+        ref = self.ref
+        return question_catalog.text(ref) if ref.__class__ is int else ref
+
+    def to_dict(self):
+        return {'type': self.type, 'content': self.content}
+
+    def __repr__(self):
+        return f"Turn({self.type!r}, {self.content!r})"
+
+
+def conversation_dicts(conversation):
+    """JSON-ready form of a list of turns"""
+    return [turn.to_dict() for turn in conversation]
+
+
+def compact_resume_data(resume_data):
+    """The parsed fields a session needs; the raw text excerpt is only useful in the upload response"""
+    if not resume_data:
+        return resume_data
+    return {key: value for key, value in resume_data.items() if key != 'raw_text'}
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+DEFAULT_DISK_DIR = os.path.join(tempfile.gettempdir(), 'interview-tts-cache')
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+# Trimming removes the least recently used files down to this share of the cap
+DISK_TRIM_RATIO = 0.9
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different strings share a cache entry"""
+    return ' '.join(text.split())
+
+
+def make_cache_key(text, lang='en', slow=False, codec='mp3', engine='gtts'):
+    """
+    Build a content-addressed key for a synthesis request.
+    The key is a SHA-256 of the normalized text, language, speed, output
+    codec and the engine that renders it, so audio from a fallback engine
+    or an earlier TTS_CODEC is never served in place of the configured one.
+    """
+    payload = f"{lang}\x00{int(bool(slow))}\x00{codec}\x00{engine}\x00{normalize_text(text)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-tier cache for synthesized audio.
+    Memory tier is a bounded LRU (by entry count and total bytes).
+    Disk tier is optional and survives worker restarts. It is shared by every
+    worker on the host and bounded by disk_max_bytes: a worker rescans the
+    directory once it has written a tenth of the cap (or the last scan says
+    the cap is reached) and deletes the least recently used files, so the
+    tier overshoots by at most a tenth of the cap per worker.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, disk_dir=None,
+                 disk_max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._trim_lock = threading.Lock()
+        self._disk_bytes = None  # As of the last scan (None until the first write)
+        self._disk_written = 0  # By this worker since then
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key):
+        """Return cached audio bytes for key, or None"""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return audio
+
+        audio = self._read_disk(key)
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_memory(key, audio)
+        return audio
+
+    def put(self, key, audio):
+        """Store audio bytes in both tiers"""
+        with self._lock:
+            self._store_memory(key, audio)
+        self._write_disk(key, audio)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_enabled': bool(self.disk_dir),
+                'disk_bytes': self._disk_bytes,
+                'disk_evictions': self.disk_evictions
+            }
+
+    def clear(self):
+        """Drop the memory tier (disk files are left in place)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _store_memory(self, key, audio):
+        # Caller must hold the lock
+        if len(audio) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = audio
+        self._size += len(audio)
+
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        # Shard by prefix so one directory never holds every file
+        return os.path.join(self.disk_dir, key[:2], key + '.mp3')
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                audio = f.read()
+            # Trimming evicts by mtime, so a hit marks the file as recently used
+            os.utime(path)
+            return audio
+        except OSError:
+            return None
+
+    def _write_disk(self, key, audio):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so concurrent workers never see partial audio
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"🔊 TTS cache write failed: {e}")
+            return
+        with self._disk_lock:
+            self._disk_written += len(audio)
+            due = (self._disk_bytes is None or self._disk_written > self.disk_max_bytes // 10
+                   or self._disk_bytes + self._disk_written > self.disk_max_bytes)
+        if due:
+            self.trim_disk()
+
+    def trim_disk(self):
+        """Delete the least recently used disk files until the tier is back under its cap"""
+        if not self.disk_dir or not self._trim_lock.acquire(blocking=False):
+            return  # Another thread is already trimming
+        try:
+            files, total = [], 0
+            for shard in os.scandir(self.disk_dir):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Removed by another worker meanwhile
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total > self.disk_max_bytes:
+                files.sort()
+                for _, size, path in files:
+                    if total <= self.disk_max_bytes * DISK_TRIM_RATIO:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    self.disk_evictions += 1
+            with self._disk_lock:
+                self._disk_bytes = total
+                self._disk_written = 0
+        except OSError as e:
+            print(f"🔊 TTS cache trim failed: {e}")
+        finally:
+            self._trim_lock.release()
+
+
+def create_tts_cache():
+    """Build the process-wide cache from environment settings"""
+    return TTSCache(
+        max_entries=int(os.environ.get('TTS_CACHE_ENTRIES', 256)),
+        max_bytes=int(os.environ.get('TTS_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+        # On by default so every worker on the host can serve /api/tts/<id>; set to '' to disable
+        disk_dir=os.environ.get('TTS_CACHE_DIR', DEFAULT_DISK_DIR) or None,
+        disk_max_bytes=int(os.environ.get('TTS_CACHE_DISK_MAX_BYTES', DEFAULT_DISK_MAX_BYTES))
+    )
@@ -0,0 +1,449 @@
+"""
+Text-to-speech engines and the fallback chain that picks between them.
+
+Engines share one interface: synthesize(text, lang, slow) -> audio bytes and
+synthesize_batch(texts, lang, slow) -> [bytes | Exception]. Each engine
+renders in its native format and converts to the configured codec
+(mp3 | ogg | wav) with ffmpeg when needed; if ffmpeg is missing the native
+format is returned, and /api/tts sniffs the real type from the bytes.
+
+  gtts   - Google TTS over the network (MP3)
+  espeak - espeak-ng subprocess per request, fully offline (WAV)
+  piper  - Piper neural TTS; a pool of long-lived processes keeps the voice
+           model loaded, and a batch is pipelined through one process (WAV)
+  stub   - silent audio after TTS_STUB_DELAY_MS, for load tests and offline dev
+
+TTS_BACKENDS sets the fallback order, e.g. "piper,espeak,gtts". An engine
+that fails is skipped for TTS_ENGINE_COOLDOWN seconds, so a network outage
+costs one timeout rather than one per question.
+"""
+import json
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from utils.metrics import stage
+
+CODEC_MIMETYPES = {
+    'mp3': 'audio/mpeg',
+    'ogg': 'audio/ogg',
+    'wav': 'audio/wav'
+}
+
+
+class TTSEngineError(Exception):
+    pass
+
+
+def audio_mimetype(data):
+    """Sniff the container from the first bytes (audio can come from any engine)"""
+    head = bytes(data[:12])
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'audio/wav'
+    if head[:4] == b'OggS':
+        return 'audio/ogg'
+    return 'audio/mpeg'
+
+
+def transcode(audio, source_codec, codec, ffmpeg='ffmpeg', timeout=15):
+    """Convert audio between codecs with ffmpeg; returns the input unchanged if that isn't possible"""
+    if codec == source_codec or not shutil.which(ffmpeg):
+        return audio
+    encoders = {'mp3': ['-f', 'mp3'], 'ogg': ['-c:a', 'libopus', '-f', 'ogg'], 'wav': ['-f', 'wav']}
+    with stage('tts_encode'):
+        result = subprocess.run(
+            [ffmpeg, '-loglevel', 'error', '-i', 'pipe:0', *encoders[codec], 'pipe:1'],
+            input=audio, capture_output=True, timeout=timeout
+        )
+    if result.returncode != 0 or not result.stdout:
+        print(f"🔊 Transcode to {codec} failed, sending {source_codec}: {result.stderr[:200]!r}")
+        return audio
+    return result.stdout
+
+
+class TTSEngine:
+    """Interface shared by all TTS engines"""
+
+    name = 'base'
+    native_codec = 'wav'
+
+    def __init__(self, codec='mp3', ffmpeg='ffmpeg', timeout=15, concurrency=4):
+        self.codec = codec
+        self.ffmpeg = ffmpeg
+        self.timeout = timeout
+        self.concurrency = concurrency
+
+    @property
+    def available(self):
+        return True
+
+    def warm(self):
+        """Start anything slow up front (models, processes); optional"""
+
+    def preload(self):
+        """Import libraries before a preforking server forks; must not start processes or threads"""
+
+    def render(self, text, lang, slow):
+        """Return audio in native_codec"""
+        raise NotImplementedError
+
+    def synthesize(self, text, lang='en', slow=False):
+        with stage('tts_synthesis'):
+            audio = self.render(text, lang, slow)
+        return transcode(audio, self.native_codec, self.codec, self.ffmpeg, self.timeout)
+
+    def synthesize_batch(self, texts, lang='en', slow=False):
+        """Render several texts; failures are returned in place as exceptions"""
+        def one(text):
+            try:
+                return self.synthesize(text, lang, slow)
+            except Exception as e:
+                return e
+
+        if len(texts) <= 1:
+            return [one(text) for text in texts]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(texts))) as pool:
+            return list(pool.map(one, texts))
+
+
+class GTTSEngine(TTSEngine):
+    name = 'gtts'
+    native_codec = 'mp3'
+
+    def preload(self):
+        try:
+            import gtts
+        except ImportError:
+            pass  # render() reports it, and the chain falls back to the next engine
+
+    def render(self, text, lang, slow):
+        from gtts import gTTS
+
+        # Timed by the tts_synthesis stage, and counted per engine in FallbackSynthesizer.stats()
+        tts = gTTS(text=text, lang=lang, slow=slow, lang_check=True, timeout=self.timeout)
+        audio_buffer = BytesIO()
+        tts.write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+
+class EspeakEngine(TTSEngine):
+    """espeak-ng is small and starts in milliseconds, so each request runs its own process"""
+
+    name = 'espeak'
+
+    def __init__(self, binary='espeak-ng', voice=None, **kwargs):
+        super().__init__(**kwargs)
+        self.binary = binary
+        self.voice = voice
+
+    @property
+    def available(self):
+        return shutil.which(self.binary) is not None
+
+    def render(self, text, lang, slow):
+        # Text goes in on stdin so it can never be parsed as an option
+        result = subprocess.run(
+            [self.binary, '--stdout', '--stdin', '-v', self.voice or lang, '-s', '120' if slow else '165'],
+            input=text.encode('utf-8'), capture_output=True, timeout=self.timeout
+        )
+        if result.returncode != 0 or not result.stdout:
+            raise TTSEngineError(f"espeak-ng failed: {result.stderr.decode('utf-8', 'replace')[:200]}")
+        return result.stdout
+
+
+class _PiperProcess:
+    """One long-lived piper process reading JSON lines and writing WAV files"""
+
+    def __init__(self, binary, model, workdir):
+        self.workdir = workdir
+        self.process = subprocess.Popen(
+            [binary, '--model', model, '--json-input', '--output_dir', workdir, '--quiet'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1
+        )
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def render_many(self, texts, timeout):
+        # All requests are written first so piper works through them back to back
+        paths = [os.path.join(self.workdir, f"{uuid.uuid4().hex}.wav") for _ in texts]
+        timer = threading.Timer(timeout * len(texts), self.process.kill)
+        timer.start()
+        try:
+            for text, path in zip(texts, paths):
+                self.process.stdin.write(json.dumps({'text': text, 'output_file': path}) + '\n')
+            self.process.stdin.flush()
+            results = []
+            for path in paths:
+                # piper prints each output path once the file is written
+                if not self.process.stdout.readline():
+                    raise TTSEngineError('piper exited while synthesizing')
+                with open(path, 'rb') as f:
+                    results.append(f.read())
+            return results
+        except (OSError, ValueError) as e:
+            raise TTSEngineError(f"piper failed: {e}")
+        finally:
+            timer.cancel()
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def close(self):
+        if self.alive:
+            self.process.kill()
+            self.process.wait()
+
+
+class PiperEngine(TTSEngine):
+    """Piper voices on a pool of warm processes (the model loads once per process)"""
+
+    name = 'piper'
+
+    def __init__(self, binary='piper', model=None, pool_size=2, **kwargs):
+        super().__init__(concurrency=pool_size, **kwargs)
+        self.binary = binary
+        self.model = model
+        self.pool_size = pool_size
+        self._pool = queue.Queue()
+        self._started = False
+        self._owner = None  # pid that started the pool
+        self._start_lock = threading.Lock()
+        self._workdir = tempfile.mkdtemp(prefix='interview-piper-')
+
+    @property
+    def available(self):
+        return bool(self.model) and os.path.exists(self.model) and shutil.which(self.binary) is not None
+
+    def warm(self):
+        with self._start_lock:
+            if self._started and self._owner != os.getpid():
+                # Forked after warming: those processes belong to the parent, so start our own
+                self._pool = queue.Queue()
+                self._started = False
+            if not self._started:
+                for _ in range(self.pool_size):
+                    self._pool.put(_PiperProcess(self.binary, self.model, self._workdir))
+                self._owner = os.getpid()
+                self._started = True
+
+    def _render_many(self, texts):
+        self.warm()
+        worker = self._pool.get(timeout=self.timeout)
+        try:
+            if not worker.alive:
+                worker = _PiperProcess(self.binary, self.model, self._workdir)
+            return worker.render_many(texts, self.timeout)
+        except TTSEngineError:
+            # Replace a process that died or hung rather than returning it to the pool
+            worker.close()
+            worker = _PiperProcess(self.binary, self.model, self._workdir)
+            raise
+        finally:
+            self._pool.put(worker)
+
+    def render(self, text, lang, slow):
+        return self._render_many([text])[0]
+
+    def synthesize_batch(self, texts, lang='en', slow=False):
+        if not texts:
+            return []
+        # Split the batch across the pool; each share is pipelined through one process
+        shares = [texts[i::self.pool_size] for i in range(self.pool_size) if texts[i::self.pool_size]]
+
+        def run(share):
+            try:
+                return [transcode(a, self.native_codec, self.codec, self.ffmpeg, self.timeout)
+                        for a in self._render_many(share)]
+            except Exception as e:
+                return [e] * len(share)
+
+        with ThreadPoolExecutor(max_workers=len(shares)) as pool:
+            rendered = list(pool.map(run, shares))
+        results = [None] * len(texts)
+        for i, share in enumerate(rendered):
+            results[i::self.pool_size] = share
+        return results
+
+
+class StubEngine(TTSEngine):
+    """Silent WAV sized to the text, after a fixed delay that stands in for a real engine"""
+
+    name = 'stub'
+
+    def __init__(self, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def render(self, text, lang, slow):
+        if self.delay:
+            time.sleep(self.delay)
+        # Roughly 60 ms of 8 kHz silence per character
+        frames = b'\0\0' * (480 * len(text))
+        audio = BytesIO()
+        with wave.open(audio, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(8000)
+            writer.writeframes(frames)
+        return audio.getvalue()
+
+    def synthesize(self, text, lang='en', slow=False):
+        # Always WAV; transcoding would measure ffmpeg rather than the service
+        with stage('tts_synthesis'):
+            return self.render(text, lang, slow)
+
+
+class FallbackSynthesizer:
+    """Try engines in order, skipping any that failed within the cooldown window"""
+
+    def __init__(self, engines, cooldown=30):
+        if not engines:
+            raise ValueError('At least one TTS engine is required')
+        self.engines = engines
+        self.primary = engines[0]
+        self.codec = engines[0].codec
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._down_until = {}
+        self._stats = {engine.name: {'ok': 0, 'failed': 0, 'seconds': 0.0} for engine in engines}
+
+    def _candidates(self):
+        now = time.monotonic()
+        with self._lock:
+            up = [e for e in self.engines if self._down_until.get(e.name, 0) <= now]
+        # If every engine is cooling down, still try them all rather than fail outright
+        return up or list(self.engines)
+
+    def _record(self, engine, ok, seconds, count=1):
+        with self._lock:
+            stats = self._stats[engine.name]
+            stats['ok' if ok else 'failed'] += count
+            stats['seconds'] += seconds
+            if ok:
+                self._down_until.pop(engine.name, None)
+            else:
+                self._down_until[engine.name] = time.monotonic() + self.cooldown
+
+    def synthesize(self, text, lang='en', slow=False):
+        return self.synthesize_with_engine(text, lang, slow)[0]
+
+    def synthesize_with_engine(self, text, lang='en', slow=False):
+        """(audio, engine) from the first engine that succeeds"""
+        error = None
+        for engine in self._candidates():
+            started = time.perf_counter()
+            try:
+                audio = engine.synthesize(text, lang, slow)
+            except Exception as e:
+                self._record(engine, False, time.perf_counter() - started)
+                print(f"🔊 {engine.name} TTS failed, trying next engine: {e}")
+                error = e
+                continue
+            self._record(engine, True, time.perf_counter() - started)
+            return audio, engine
+        raise TTSEngineError(f"All TTS engines failed: {error}")
+
+    def synthesize_batch(self, texts, lang='en', slow=False):
+        """Batch through each engine in turn; only the items that failed move on"""
+        results = [None] * len(texts)
+        pending = list(range(len(texts)))
+        for engine in self._candidates():
+            if not pending:
+                break
+            started = time.perf_counter()
+            rendered = engine.synthesize_batch([texts[i] for i in pending], lang, slow)
+            elapsed = time.perf_counter() - started
+            still_pending = []
+            for index, audio in zip(pending, rendered):
+                if isinstance(audio, Exception):
+                    results[index] = audio
+                    still_pending.append(index)
+                else:
+                    results[index] = audio
+            done = len(pending) - len(still_pending)
+            if done:
+                self._record(engine, True, elapsed, done)
+            if still_pending:
+                self._record(engine, False, 0.0, len(still_pending))
+            pending = still_pending
+        return results
+
+    def preload(self):
+        for engine in self.engines:
+            engine.preload()
+
+    def warm(self):
+        """Start every engine's slow parts (e.g. the Piper pool) now rather than on the first request"""
+        for engine in self.engines:
+            try:
+                engine.warm()
+            except Exception as e:
+                print(f"🔊 Could not warm the {engine.name} TTS engine: {e}")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'order': [e.name for e in self.engines],
+                'codec': self.codec,
+                'engines': {
+                    name: dict(stats, cooling_down=self._down_until.get(name, 0) > now)
+                    for name, stats in self._stats.items()
+                }
+            }
+
+
+def create_tts_synthesizer():
+    """Build the engine chain from environment settings"""
+    options = {
+        'codec': os.environ.get('TTS_CODEC', 'mp3').lower(),
+        'ffmpeg': os.environ.get('FFMPEG_BINARY', 'ffmpeg'),
+        'timeout': float(os.environ.get('TTS_ENGINE_TIMEOUT', 15))
+    }
+    if options['codec'] not in CODEC_MIMETYPES:
+        raise ValueError(f"Unknown TTS_CODEC: {options['codec']}")
+
+    engines = []
+    for name in os.environ.get('TTS_BACKENDS', 'gtts').split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name == 'gtts':
+            engine = GTTSEngine(**options)
+        elif name == 'espeak':
+            engine = EspeakEngine(
+                binary=os.environ.get('ESPEAK_BINARY', 'espeak-ng'),
+                voice=os.environ.get('ESPEAK_VOICE'),
+                **options
+            )
+        elif name == 'piper':
+            engine = PiperEngine(
+                binary=os.environ.get('PIPER_BINARY', 'piper'),
+                model=os.environ.get('PIPER_MODEL'),
+                pool_size=int(os.environ.get('PIPER_POOL_SIZE', 2)),
+                **options
+            )
+        elif name == 'stub':
+            engine = StubEngine(delay=float(os.environ.get('TTS_STUB_DELAY_MS', 0)) / 1000, **options)
+        else:
+            raise ValueError(f"Unknown TTS backend: {name}")
+
+        if engine.available:
+            engines.append(engine)
+        else:
+            print(f"🔊 TTS backend '{name}' is not installed, skipping it")
+
+    if not engines:
+        engines.append(GTTSEngine(**options))
+    return FallbackSynthesizer(engines, cooldown=float(os.environ.get('TTS_ENGINE_COOLDOWN', 30)))
@@ -0,0 +1,186 @@
+"""
+Ahead-of-time TTS pre-rendering for the question bank.
+
+Every fixed question is synthesized once and packed into a bundle:
+  <path>       - all audio blobs concatenated
+  <path>.json  - index of cache key -> [offset, length], plus the codec and
+                 engine the audio was rendered with (both part of every key)
+
+Only the first engine in TTS_BACKENDS renders the bundle, since it is looked
+up under that engine's keys; strings it fails on are left to the TTS cache.
+
+Run from the backend directory:
+  python -m utils.tts_prerender [--output PATH] [--workers N] [--force] [--strict]
+"""
+import argparse
+import json
+import mmap
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.tts_cache import make_cache_key
+
+BUNDLE_VERSION = 2
+DEFAULT_BUNDLE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tts_bundle', 'questions.bin'
+)
+
+
+class AudioBundle:
+    """Read-only view over a pre-rendered bundle (memory-mapped, shared between workers)"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported bundle version: {index.get('version')}")
+        self.entries = index['entries']
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return audio bytes for key, or None if it was not pre-rendered"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._data[offset:offset + length]
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+def load_audio_bundle(path=None):
+    """Open the bundle at path (or TTS_BUNDLE_PATH); returns None if it has not been built"""
+    path = path or os.environ.get('TTS_BUNDLE_PATH') or DEFAULT_BUNDLE_PATH
+    if not os.path.exists(path) or not os.path.exists(path + '.json'):
+        return None
+    try:
+        return AudioBundle(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🔊 Could not load TTS bundle {path}: {e}")
+        return None
+
+
+def build_bundle(texts, path, synthesize, lang='en', slow=False, workers=8, force=False, synthesize_batch=None,
+                 codec='mp3', engine='gtts'):
+    """
+    Synthesize texts into the bundle at path.
+
+    synthesize(text, lang, slow) -> bytes is the pluggable TTS backend.
+    If synthesize_batch(texts, lang, slow) -> [bytes | Exception] is given,
+    all missing texts are sent to it in one batch instead.
+    codec and engine name what synthesize produces; they are part of each key.
+    Entries already in an existing bundle are copied over instead of re-synthesized
+    (only when the codec and engine match, since the keys differ otherwise),
+    and entries for strings no longer in texts are dropped.
+    Returns a summary dict.
+    """
+    wanted = {}
+    for text in texts:
+        wanted.setdefault(make_cache_key(text, lang, slow, codec, engine), text)
+
+    existing = None if force else load_audio_bundle(path)
+    reused = {key for key in wanted if existing is not None and key in existing}
+    missing = [key for key in wanted if existing is None or key not in existing]
+
+    rendered = {}
+    failed = {}
+    if missing and synthesize_batch is not None:
+        results = synthesize_batch([wanted[key] for key in missing], lang, slow)
+        for key, result in zip(missing, results):
+            if isinstance(result, Exception):
+                failed[key] = str(result)
+                print(f"🔊 Failed: {wanted[key][:60]} ({result})")
+            else:
+                rendered[key] = result
+                print(f"🔊 Rendered: {wanted[key][:60]}")
+    elif missing:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(synthesize, wanted[key], lang, slow): key for key in missing}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    rendered[key] = future.result()
+                    print(f"🔊 Rendered: {wanted[key][:60]}")
+                except Exception as e:
+                    failed[key] = str(e)
+                    print(f"🔊 Failed: {wanted[key][:60]} ({e})")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    # Write blob and index to temp files, then rename so readers never see a half-built bundle
+    entries = {}
+    fd, tmp_blob = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as blob:
+        offset = 0
+        for key in wanted:
+            audio = existing.get(key) if key in reused else rendered.get(key)
+            if audio is None:
+                continue
+            blob.write(audio)
+            entries[key] = [offset, len(audio)]
+            offset += len(audio)
+
+    fd, tmp_index = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'version': BUNDLE_VERSION, 'lang': lang, 'slow': slow, 'codec': codec, 'engine': engine,
+                   'entries': entries}, f)
+
+    if existing is not None:
+        existing.close()
+    os.replace(tmp_blob, path)
+    os.replace(tmp_index, path + '.json')
+
+    return {
+        'total': len(wanted),
+        'reused': len(reused),
+        'rendered': len(rendered),
+        'failed': len(failed),
+        'dropped': (len(existing.entries) - len(reused)) if existing is not None else 0,
+        'bytes': offset
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-render interview questions to a TTS bundle')
+    parser.add_argument('--output', default=os.environ.get('TTS_BUNDLE_PATH') or DEFAULT_BUNDLE_PATH)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--force', action='store_true', help='Re-render every string')
+    parser.add_argument('--strict', action='store_true', help='Exit non-zero if any string failed')
+    args = parser.parse_args(argv)
+
+    # Imported here so the bundle reader stays usable without the Flask app
+    from app import interview_agent
+    from utils.voice_processor import tts_synthesizer
+
+    # The first engine only: audio from a fallback engine must not be stored under its keys
+    engine = tts_synthesizer.primary
+    summary = build_bundle(
+        interview_agent.all_question_texts(),
+        args.output,
+        engine.synthesize,
+        workers=args.workers,
+        force=args.force,
+        synthesize_batch=engine.synthesize_batch,
+        codec=engine.codec,
+        engine=engine.name
+    )
+    print(f"🔊 Bundle written to {args.output}: {summary}")
+    return 1 if args.strict and summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,69 +1,113 @@
 import base64
-from io import BytesIO
-from gtts import gTTS
-import requests
-import json
+from utils.audio_uploads import (
+    capped_chunks, create_audio_policy, create_transcode_pool, head_of_chunks, head_of_file, pcm_stream, probe_audio
+)
+from utils.metrics import stage
+from utils.speech_to_text import get_recognizer, iter_file_chunks
+from utils.tts_cache import create_tts_cache, make_cache_key
+from utils.tts_engines import create_tts_synthesizer
+from utils.tts_prerender import load_audio_bundle
+
+# Shared by every request in this worker
+tts_cache = create_tts_cache()
+# Engine fallback chain (gTTS by default; offline espeak-ng / Piper when configured)
+tts_synthesizer = create_tts_synthesizer()
+# Pre-rendered question audio (None until `python -m utils.tts_prerender` has run)
+audio_bundle = load_audio_bundle()
+# Accepted codecs/durations for voice answers, and the bounded ffmpeg pool that normalizes them
+audio_policy = create_audio_policy()
+transcode_pool = create_transcode_pool()
 
 def speech_to_text(audio_file):
     """
-    SIMPLIFIED VOICE PROCESSING
-    Since speech_recognition has dependency issues, we'll use a different approach.
-    In production, you could use:
-    - Google Cloud Speech-to-Text API (free tier available)
-    - Azure Speech Services (free tier available)  
-    - Mozilla DeepSpeech (open source)
-    - Or implement a custom solution
+    Transcribe an uploaded audio file (FileStorage or seekable binary file)
+    with the configured offline STT backend. The header is checked first
+    (SpeechToTextError / UploadTooLarge); the audio is then streamed from the
+    spooled upload as 16 kHz mono PCM. Returns a Transcript with the text and
+    its real-time-factor metrics; without a backend the text is a placeholder.
+    """
+    stream = getattr(audio_file, 'stream', audio_file)
+    info = audio_policy.check(probe_audio(head_of_file(stream)))
+    recognizer = get_recognizer()
+    if not recognizer.decodes_audio:
+        return recognizer.transcribe((), '')
+    return recognizer.transcribe_pcm(pcm_stream(iter_file_chunks(stream), info, transcode_pool))
+
+def speech_to_text_stream(chunks, max_bytes):
+    """
+    Transcribe a raw audio body while it uploads; like speech_to_text, but
+    the header is checked on the first chunks and the upload is cut off
+    past max_bytes (UploadTooLarge).
+    """
+    head, chunks = head_of_chunks(capped_chunks(chunks, max_bytes))
+    info = audio_policy.check(probe_audio(head))
+    recognizer = get_recognizer()
+    if not recognizer.decodes_audio:
+        return recognizer.transcribe(chunks, '')
+    return recognizer.transcribe_pcm(pcm_stream(chunks, info, transcode_pool))
+
+def speech_key(text, lang='en', slow=False, engine=None):
+    """Cache key for text as rendered by engine (the first configured engine by default) in TTS_CODEC"""
+    engine = engine or tts_synthesizer.primary
+    return make_cache_key(text, lang, slow, tts_synthesizer.codec, engine.name)
+
+def _speech(text, lang, slow):
+    """(audio ID, audio bytes) for text, from the bundle, the TTS cache or the engines"""
+    if not text or len(text.strip()) == 0:
+        raise ValueError("No text provided for speech synthesis")
     
-    For now, we'll return a placeholder and focus on Text-to-Speech which works reliably.
+    # Limit text length to avoid very long processing
+    if len(text) > 500:
+        text = text[:500] + "..."
+    
+    key = speech_key(text, lang, slow)
+    with stage('tts_cache_lookup'):
+        audio = audio_bundle.get(key) if audio_bundle is not None else None
+        if audio is None:
+            audio = tts_cache.get(key)
+    if audio is not None:
+        return key, audio
+    
+    audio, engine = tts_synthesizer.synthesize_with_engine(text, lang, slow)
+    # A fallback engine's audio is cached under its own key: /api/tts/<id> can serve it,
+    # but it never answers a lookup for the first engine's audio once that engine is back
+    key = speech_key(text, lang, slow, engine)
+    tts_cache.put(key, audio)
+    return key, audio
+
+def synthesize_speech(text, lang='en', slow=False):
     """
-    try:
-        # For demonstration purposes, we'll simulate speech recognition
-        # In a real application, you would integrate with a proper speech-to-text service
-        
-        # You can implement actual speech recognition by:
-        # 1. Using Google Cloud Speech-to-Text (free tier available)
-        # 2. Using Azure Cognitive Services Speech-to-Text (free tier available)
-        # 3. Using Mozilla DeepSpeech (open source)
-        
-        # Placeholder implementation
-        return "[Voice answer recorded - speech-to-text would convert this to text]"
-        
-    except Exception as e:
-        return f"[Voice processing would happen here. Error: {str(e)}]"
+    Return audio bytes for text (TTS_CODEC, MP3 by default).
+    Checks the pre-rendered bundle, then the TTS cache; only misses go to the
+    TTS engines (tried in TTS_BACKENDS order, see utils/tts_engines.py).
+    """
+    return _speech(text, lang, slow)[1]
+
+def prepare_speech(text, lang='en', slow=False):
+    """
+    Make sure audio for text is available and return its audio ID.
+    The ID is the content-addressed cache key served by /api/tts/<id>.
+    """
+    return _speech(text, lang, slow)[0]
 
-def text_to_speech(text):
+def get_audio(audio_id):
+    """Return audio bytes for a previously prepared audio ID, or None"""
+    if audio_bundle is not None:
+        audio = audio_bundle.get(audio_id)
+        if audio is not None:
+            return audio
+    return tts_cache.get(audio_id)
+
+def text_to_speech(text, lang='en', slow=False):
     """
-    Convert text to speech using free gTTS (Google Text-to-Speech)
-    This works reliably and doesn't have dependency issues
+    Convert text to speech with the configured TTS engines (gTTS by default)
+    Repeated questions are served from the TTS cache instead of re-synthesized
     """
     try:
-        if not text or len(text.strip()) == 0:
-            raise ValueError("No text provided for speech synthesis")
-        
-        # Limit text length to avoid very long processing
-        if len(text) > 500:
-            text = text[:500] + "..."
-        
-        print(f"🔊 Generating speech for: {text[:100]}...")
-        
-        # Create gTTS object with better parameters
-        tts = gTTS(
-            text=text, 
-            lang='en', 
-            slow=False,
-            lang_check=True
-        )
-        
-        # Save to bytes buffer
-        audio_buffer = BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
+        audio = synthesize_speech(text, lang, slow)
         
         # Convert to base64 for JSON response
-        audio_base64 = base64.b64encode(audio_buffer.read()).decode('utf-8')
-        
-        print("🔊 Speech generated successfully")
-        return audio_base64
+        return base64.b64encode(audio).decode('utf-8')
         
     except Exception as e:
         print(f"🔊 TTS Error: {e}")
@@ -75,9 +119,12 @@ def get_voice_capabilities():
     """
     return {
         'text_to_speech': True,
-        'speech_to_text': False,  # Disabled due to dependency issues
-        'reason': 'Speech-to-text requires additional setup due to library dependencies',
-        'alternative': 'Use text input mode for now, or implement cloud-based speech-to-text'
+        'tts_cache': tts_cache.stats(),
+        'tts_engines': tts_synthesizer.stats(),
+        'prerendered_questions': len(audio_bundle) if audio_bundle is not None else 0,
+        'speech_to_text': get_recognizer().available,
+        'stt': get_recognizer().stats(),
+        'transcoding': transcode_pool.stats()
     }
 
 # Test function
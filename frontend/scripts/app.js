@@ -171,26 +171,18 @@ class InterviewApp {
 
     async processVoiceAnswer(audioBlob) {
         try {
-            const formData = new FormData();
-            formData.append('audio', audioBlob, 'recording.webm');
-            formData.append('session_id', this.sessionId);
-
-            const response = await fetch('/api/process-voice-answer', {
-                method: 'POST',
-                body: formData
+            // The raw recording is the request body, so the server transcribes it while it uploads.
+            // The question is shown as soon as it arrives; audio follows when ready
+            await this.streamEvents(`/api/sessions/${this.sessionId}/turns`, audioBlob, (event, data) => {
+                if (event === 'question') {
+                    this.addMessage(data.answer, 'answer');
+                    this.addMessage(data.question, 'question');
+                    this.recordingStatus.textContent = '✅ Answer recorded!';
+                } else if (event === 'audio') {
+                    this.playAudio(data.audio_url);
+                }
             });
 
-            const data = await response.json();
-            
-            if (data.success) {
-                this.addMessage(data.answer_text, 'answer');
-                this.addMessage(data.next_question, 'question');
-                await this.speakText(data.next_question);
-                this.recordingStatus.textContent = '✅ Answer recorded!';
-            } else {
-                throw new Error(data.error);
-            }
-
         } catch (error) {
             this.showError('Voice processing error: ' + error.message);
             this.recordingStatus.textContent = '❌ Processing failed';
@@ -213,17 +205,20 @@ class InterviewApp {
         this.disableInput(true);
 
         try {
-            const response = await this.apiCall('/api/submit_answer', {
-                session_id: this.sessionId,
-                answer: answer
+            const body = JSON.stringify({
+                answer: answer,
+                audio: this.currentMode === 'voice'
             });
 
-            if (response.success) {
-                this.addMessage(response.question, 'question');
-                if (this.currentMode === 'voice') {
-                    await this.speakText(response.question);
+            await this.streamEvents(`/api/sessions/${this.sessionId}/turns`, body, (event, data) => {
+                if (event === 'question') {
+                    this.addMessage(data.question, 'question');
+                    // The next answer can be typed while the audio is still rendering
+                    this.disableInput(false);
+                } else if (event === 'audio') {
+                    this.playAudio(data.audio_url);
                 }
-            }
+            });
         } catch (error) {
             this.showError('Failed to submit answer: ' + error.message);
         } finally {
@@ -245,13 +240,17 @@ class InterviewApp {
         this.disableInput(true);
 
         try {
-            const response = await this.apiCall('/api/end_interview', {
-                session_id: this.sessionId
+            let started = false;
+            await this.streamEvents(`/api/sessions/${this.sessionId}/feedback`, null, (event, data) => {
+                if (event === 'feedback') {
+                    // Render each section as soon as it arrives
+                    if (!started) {
+                        this.showFeedback('');
+                        started = true;
+                    }
+                    this.appendFeedback(data.text);
+                }
             });
-
-            if (response.success) {
-                this.showFeedback(response.feedback);
-            }
         } catch (error) {
             this.showError('Failed to end interview: ' + error.message);
         } finally {
@@ -264,6 +263,11 @@ class InterviewApp {
         this.showSection(this.feedbackSection);
     }
 
+    appendFeedback(text) {
+        const current = this.feedbackContent.textContent;
+        this.feedbackContent.textContent = current ? current + '\n\n' + text : text;
+    }
+
     async uploadResume() {
         const formData = new FormData();
         formData.append('resume', this.resumeUpload.files[0]);
@@ -282,18 +286,32 @@ class InterviewApp {
     async speakText(text) {
         try {
             const response = await this.apiCall('/api/text-to-speech', {
-                text: text
+                text: text,
+                session_id: this.sessionId
             });
 
-            if (response.success && response.audio) {
-                const audio = new Audio('data:audio/wav;base64,' + response.audio);
-                await audio.play();
+            if (response.success && response.audio_url) {
+                await this.playAudio(response.audio_url);
             }
         } catch (error) {
             console.warn('Text-to-speech failed:', error);
         }
     }
 
+    async playAudio(url) {
+        if (!url) {
+            return;
+        }
+        try {
+            // The browser streams the MP3 and starts playback before the download finishes
+            const audio = new Audio(url);
+            audio.preload = 'auto';
+            await audio.play();
+        } catch (error) {
+            console.warn('Audio playback failed:', error);
+        }
+    }
+
     addMessage(content, type) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${type}`;
@@ -331,6 +349,57 @@ class InterviewApp {
         return await response.json();
     }
 
+    async streamEvents(endpoint, body, onEvent) {
+        // Server-Sent Events over a POST request (EventSource only supports GET)
+        const options = { method: 'POST', body: body };
+        if (typeof body === 'string') {
+            options.headers = { 'Content-Type': 'application/json' };
+        }
+        const response = await fetch(endpoint, options);
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+
+            // Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                const dataLines = [];
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) {
+                        event = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        dataLines.push(line.slice(5).trim());
+                    }
+                });
+                if (!dataLines.length) {
+                    continue; // Comment or keep-alive
+                }
+
+                const data = JSON.parse(dataLines.join('\n'));
+                if (event === 'error') {
+                    throw new Error(data.error);
+                }
+                onEvent(event, data);
+            }
+        }
+    }
+
     showError(message) {
         alert('❌ Error: ' + message);
     }